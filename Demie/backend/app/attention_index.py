@@ -0,0 +1,250 @@
+import datetime
+import json
+import os
+import shutil
+import numpy as np
+
+
+def top_k_per_target(dst, src, alpha, k):
+    """
+    The k highest-alpha (src, alpha) entries of every dst, vectorized.
+    Returns (dst, rank, src, alpha) for the kept entries.
+    """
+    order = np.lexsort((src, -alpha, dst))
+    dst, src, alpha = dst[order], src[order], alpha[order]
+    first = np.ones(len(dst), dtype=bool)
+    np.not_equal(dst[1:], dst[:-1], out=first[1:])
+    starts = np.flatnonzero(first)
+    counts = np.diff(np.append(starts, len(dst)))
+    rank = np.arange(len(dst)) - np.repeat(starts, counts)
+    keep = rank < k
+    return dst[keep], rank[keep], src[keep], alpha[keep]
+
+
+class TopKAttention:
+    """
+    Attention collector for NeighborSampledInference: keeps the k
+    strongest incoming conv1 edges (head-averaged) of every row.
+    """
+
+    def __init__(self, num_rows, k):
+        self.k = k
+        self.neighbors = np.full((num_rows, k), -1, dtype=np.int64)
+        self.weights = np.zeros((num_rows, k), dtype=np.float32)
+
+    def add(self, dst, src, alpha):
+        rows, rank, src, alpha = top_k_per_target(dst, src, alpha, self.k)
+        self.neighbors[rows, rank] = src
+        self.weights[rows, rank] = alpha
+
+
+class EdgeAttention:
+    """Attention collector that keeps every incoming edge (single-address explanations)."""
+
+    def __init__(self):
+        self._parts = []
+
+    def add(self, dst, src, alpha):
+        self._parts.append((dst, src, alpha))
+
+    def arrays(self):
+        """(dst, src, alpha) over everything collected."""
+        if not self._parts:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float32)
+        return tuple(np.concatenate(column) for column in zip(*self._parts))
+
+
+class AttentionIndex:
+    """
+    Per-address top-k attention edges from the latest analysis run.
+
+    neighbors.npy  int32 [rows, k], row of each counterparty (-1 = empty slot)
+    weights.npy    float32 [rows, k], head-averaged conv1 attention
+    addresses.npy  address of each row
+    keys.npy / key_rows.npy   sorted address dictionary
+    meta.json      k, row count, run timestamp
+    delta-*.npz    rows replaced by incremental runs since the last build,
+                   keyed by address and applied in order on load
+
+    A lookup is one binary search plus k reads, so explanations never
+    re-run the model. An incremental upsert writes only its own rows; once
+    the overlay outgrows `compact_ratio` of the base it is folded into a
+    full rewrite.
+    """
+
+    FILES = ("neighbors", "weights", "addresses", "keys", "key_rows")
+
+    def __init__(self, directory, k=8, compact_ratio=0.25):
+        self.directory = directory
+        self.k = k
+        self.compact_ratio = compact_ratio
+        self.meta = None
+        self.arrays = None
+        # address -> [(counterparty, weight), ...] from delta segments
+        self.overlay = {}
+        self._segments = 0
+
+    def load(self):
+        meta_path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode="r") for name in self.FILES
+        }
+        segments = sorted(name for name in os.listdir(self.directory) if name.startswith("delta-"))
+        overlay = {}
+        for name in segments:
+            with np.load(os.path.join(self.directory, name), allow_pickle=False) as delta:
+                _apply_delta(overlay, delta["addresses"], delta["neighbors"], delta["weights"])
+        self.arrays, self.overlay, self._segments = arrays, overlay, len(segments)
+        self.k = self.meta["k"]
+        return True
+
+    @property
+    def available(self):
+        return self.arrays is not None
+
+    def lookup(self, addresses):
+        """Returns (rows, found) for each address."""
+        needles = np.array([str(a).lower() for a in addresses], dtype=str)
+        keys = self.arrays["keys"] if self.available else np.array([], dtype=str)
+        if len(keys) == 0 or len(needles) == 0:
+            return np.zeros(len(needles), dtype=np.int64), np.zeros(len(needles), dtype=bool)
+        pos = np.minimum(np.searchsorted(keys, needles), len(keys) - 1)
+        return np.asarray(self.arrays["key_rows"][pos], dtype=np.int64), keys[pos] == needles
+
+    def top(self, address, limit=None):
+        """Most influential counterparties of `address`, strongest first (None if not indexed)."""
+        limit = self.k if limit is None else min(limit, self.k)
+        overlay = self.overlay
+        key = str(address).lower()
+        if key in overlay:
+            return [{"address": a, "attention": round(float(w), 6)} for a, w in overlay[key][:limit]]
+
+        arrays = self.arrays
+        rows, found = self.lookup([address])
+        if not found[0]:
+            return None
+        neighbors = arrays["neighbors"][rows[0]]
+        weights = arrays["weights"][rows[0]]
+        addresses = arrays["addresses"]
+        return [
+            {"address": str(addresses[n]), "attention": round(float(w), 6)}
+            for n, w in zip(neighbors[:limit], weights[:limit]) if n >= 0
+        ]
+
+    def build(self, addresses, collector):
+        """Replaces the index with a full run's collector (rows aligned with `addresses`)."""
+        self._save(np.asarray(addresses).astype(str), collector.neighbors, collector.weights)
+
+    def upsert(self, addresses, neighbor_addresses, weights):
+        """
+        Replaces the rows of `addresses` (incremental runs). Counterparties
+        are given as addresses ([M, k] object array, None for empty slots).
+        Only these rows are written, as a delta segment; counterparties the
+        index has never seen become known addresses without attention of
+        their own.
+        """
+        lowered = np.char.lower(np.asarray(addresses).astype(str))
+        filled = np.array([a is not None for a in np.ravel(neighbor_addresses)], dtype=bool).reshape(np.shape(neighbor_addresses))
+        counterparties = np.where(filled, neighbor_addresses, "").astype(str)
+        counterparties = np.char.lower(counterparties)
+        weights = np.asarray(weights, dtype=np.float32)
+
+        # Unseen counterparties are indexed with an empty row
+        unseen = np.unique(counterparties[filled])
+        if len(unseen):
+            _, known = self.lookup(unseen)
+            targets = set(lowered.tolist())
+            unseen = np.array([a for a in unseen[~known] if a not in self.overlay and a not in targets], dtype=str)
+        if len(unseen):
+            lowered = np.concatenate([lowered, unseen])
+            counterparties = np.vstack([counterparties, np.full((len(unseen), self.k), "", dtype=counterparties.dtype)])
+            weights = np.vstack([weights, np.zeros((len(unseen), self.k), dtype=np.float32)])
+
+        if not self.available:
+            self._save(np.array([], dtype=str), np.full((0, self.k), -1, dtype=np.int64), np.zeros((0, self.k), dtype=np.float32))
+
+        overlay = dict(self.overlay)
+        _apply_delta(overlay, lowered, counterparties, weights)
+        if len(overlay) > self.compact_ratio * max(self.meta["rows"], 1):
+            self._compact(overlay)
+            return
+
+        # 1. One segment file per upsert (write-then-rename)
+        name = f"delta-{self._segments + 1:06d}.npz"
+        tmp = os.path.join(self.directory, name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, addresses=lowered, neighbors=counterparties, weights=weights)
+        os.replace(tmp, os.path.join(self.directory, name))
+        self.overlay, self._segments = overlay, self._segments + 1
+
+    def _compact(self, overlay):
+        """Folds the overlay into a full rewrite of the base arrays."""
+        table = np.asarray(self.arrays["addresses"]).astype(str)
+        all_neighbors = np.array(self.arrays["neighbors"], dtype=np.int64)
+        all_weights = np.array(self.arrays["weights"], dtype=np.float32)
+
+        # 1. Resolve every overlay address and counterparty to a row, appending unknown ones
+        targets = np.array(list(overlay), dtype=str)
+        involved = np.unique(np.concatenate([targets] + [np.array([a for a, _ in v], dtype=str) for v in overlay.values()]))
+        rows, found = self.lookup(involved)
+        if not found.all():
+            new = involved[~found]
+            table = np.concatenate([table, new])
+            all_neighbors = np.vstack([all_neighbors, np.full((len(new), self.k), -1, dtype=np.int64)])
+            all_weights = np.vstack([all_weights, np.zeros((len(new), self.k), dtype=np.float32)])
+            rows[~found] = len(table) - len(new) + np.arange(len(new))
+        row_of = dict(zip(involved.tolist(), rows.tolist()))
+
+        # 2. Overwrite the target rows
+        for address, entries in overlay.items():
+            row = row_of[address]
+            all_neighbors[row] = -1
+            all_weights[row] = 0
+            for slot, (counterparty, weight) in enumerate(entries[:self.k]):
+                all_neighbors[row, slot] = row_of[counterparty]
+                all_weights[row, slot] = weight
+        self._save(table, all_neighbors, all_weights)
+
+    def _save(self, addresses, neighbors, weights):
+        tmp = self.directory + ".tmp"
+        old = self.directory + ".old"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        lowered = np.char.lower(addresses)
+        key_order = np.argsort(lowered, kind="stable")
+        columns = {
+            "neighbors": neighbors.astype(np.int32),
+            "weights": weights.astype(np.float32),
+            "addresses": addresses,
+            "keys": lowered[key_order],
+            "key_rows": key_order.astype(np.int64),
+        }
+        for name, array in columns.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), array)
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({
+                "k": self.k,
+                "rows": int(len(addresses)),
+                "created_at": datetime.datetime.utcnow().isoformat() + "Z",
+            }, f)
+
+        # Swap directories (delta segments go with the old one); open
+        # memory maps keep reading the old files
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(self.directory):
+            os.replace(self.directory, old)
+        os.replace(tmp, self.directory)
+        shutil.rmtree(old, ignore_errors=True)
+        self.load()
+
+
+def _apply_delta(overlay, addresses, counterparties, weights):
+    """Sets overlay[address] to its non-empty (counterparty, weight) slots."""
+    for address, row, row_weights in zip(addresses.tolist(), counterparties.tolist(), weights.tolist()):
+        overlay[address] = [(c, w) for c, w in zip(row, row_weights) if c]
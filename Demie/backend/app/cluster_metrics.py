@@ -0,0 +1,64 @@
+from app.score_writer import write_in_chunks
+from app.metrics import cypher
+
+# Per-member SENT volumes, only written when they moved
+MEMBER_VOLUME_QUERY = cypher("cluster_metrics.member_volume", """
+UNWIND $rows AS row
+MATCH (m:Address) WHERE id(m) = row.id
+CALL {
+    WITH m
+    OPTIONAL MATCH (m)-[s:SENT]->()
+    RETURN coalesce(sum(toFloat(s.amount)), 0.0) AS sent
+}
+CALL {
+    WITH m
+    OPTIONAL MATCH (m)<-[r:SENT]-()
+    RETURN coalesce(sum(toFloat(r.amount)), 0.0) AS received
+}
+WITH m, sent, received
+WHERE m.sent_volume IS NULL OR m.sent_volume <> sent
+   OR m.received_volume IS NULL OR m.received_volume <> received
+SET m.sent_volume = sent, m.received_volume = received
+""")
+
+# Cluster totals on the proxy of every cluster the rows belong to
+CLUSTER_TOTALS_QUERY = cypher("cluster_metrics.cluster_totals", """
+UNWIND $rows AS row
+MATCH (m:Address) WHERE id(m) = row.id
+OPTIONAL MATCH (m)-[:FUSED_TO]->(p:Address)
+WITH DISTINCT coalesce(p, m) AS proxy
+OPTIONAL MATCH (x:Address)-[:FUSED_TO]->(proxy)
+WITH proxy, collect(x) + proxy AS members
+SET proxy.cluster_sent_volume = reduce(t = 0.0, n IN members | t + coalesce(n.sent_volume, 0.0)),
+    proxy.cluster_received_volume = reduce(t = 0.0, n IN members | t + coalesce(n.received_volume, 0.0))
+""")
+
+RESOLVE_QUERY = cypher("cluster_metrics.resolve", """
+MATCH (a:Address) WHERE a.address IN $addresses
+RETURN id(a) AS id
+""")
+
+
+class ClusterVolumes:
+    """
+    Keeps SENT volumes as node properties instead of aggregating edges on
+    every read: sent_volume/received_volume on each member and
+    cluster_sent_volume/cluster_received_volume on each cluster proxy.
+    Refreshed for the nodes an analysis run (after fusion) or an ingest
+    batch touched.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+
+    async def refresh(self, session, ids):
+        rows = [{"id": int(i)} for i in ids]
+        await write_in_chunks(session, MEMBER_VOLUME_QUERY, rows, self.chunk_size)
+        await write_in_chunks(session, CLUSTER_TOTALS_QUERY, rows, self.chunk_size)
+        return len(rows)
+
+    async def refresh_addresses(self, session, addresses):
+        """Ingest path: the batch reports addresses, not internal ids."""
+        result = await session.run(RESOLVE_QUERY, addresses=[a.lower() for a in addresses])
+        ids = [record["id"] async for record in result]
+        return await self.refresh(session, ids)
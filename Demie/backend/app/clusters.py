@@ -0,0 +1,132 @@
+from app.pagination import encode_cursor, decode_cursor
+from app.metrics import cypher
+
+# Score bounds of each risk band (same thresholds as the dashboard counters)
+RISK_LEVELS = {
+    "HIGH": "a.integrity_risk_score > 0.75",
+    "MEDIUM": "a.integrity_risk_score >= 0.6 AND a.integrity_risk_score <= 0.75",
+    "LOW": "a.integrity_risk_score < 0.6",
+}
+
+# Search fields: the address, or the community id (compared as text)
+SEARCH_TYPES = ("ADDRESS", "ID")
+
+# Dashboard distribution counter holding the total of each band
+LEVEL_COUNTERS = {"HIGH": "critical", "MEDIUM": "moderate", "LOW": "stable"}
+
+FUSED_COUNT = "COUNT { (a)-[:FUSED_TO]-() } + 1"
+
+# Fields of each page row, in response order
+CLUSTER_FIELDS = ("address", "integrity_risk_score", "risk_level", "amount", "fused_count", "confidence")
+
+PAGE_QUERY = cypher("clusters.page", """
+MATCH (a:Address)
+WHERE {conditions}
+WITH a
+ORDER BY a.integrity_risk_score DESC, a.address ASC
+LIMIT $fetch
+RETURN
+    a.address AS address,
+    toFloat(a.integrity_risk_score) AS integrity_risk_score,
+    CASE
+        WHEN a.integrity_risk_score > 0.75 THEN 'HIGH'
+        WHEN a.integrity_risk_score >= 0.6 AND a.integrity_risk_score <= 0.75 THEN 'MEDIUM'
+        ELSE 'LOW'
+    END AS risk_level,
+    toFloat(a.amount) AS amount,
+    // Only count actual cluster members + the root node itself
+    {fused_count} AS fused_count,
+    toFloat(a.confidence) AS confidence
+""")
+
+COUNT_QUERY = cypher("clusters.count", """
+MATCH (a:Address)
+WHERE {conditions}
+RETURN count(a) AS total
+""")
+
+
+class ClusterPage:
+    """
+    One keyset page of scored addresses, ordered by integrity_risk_score
+    (descending) then address. The cursor carries the sort key of the last
+    row, so every page costs the same however deep the client pages.
+    """
+
+    def __init__(self, risk_level=None, min_score=None, min_fused_count=None, cursor=None, limit=100,
+                 search=None, search_type="ADDRESS"):
+        if risk_level is not None and risk_level.upper() not in RISK_LEVELS:
+            raise ValueError(f"Unknown risk level: {risk_level}")
+        if search_type.upper() not in SEARCH_TYPES:
+            raise ValueError(f"Unknown search type: {search_type}")
+        self.risk_level = risk_level.upper() if risk_level else None
+        self.min_score = min_score
+        self.min_fused_count = min_fused_count
+        self.search = search.strip().lower() if search and search.strip() else None
+        self.search_type = search_type.upper()
+        self.after = decode_cursor(cursor, 2) if cursor else None
+        self.limit = limit
+
+    @property
+    def filter_key(self):
+        """Identifies the filtered set (independent of the page position)."""
+        return (self.risk_level, self.min_score, self.min_fused_count, self.search, self.search_type)
+
+    @property
+    def band_only(self):
+        """True if the total is one of the dashboard's cached band counters."""
+        return self.min_score is None and self.min_fused_count is None and self.search is None
+
+    def _filters(self):
+        conditions = ["a.integrity_risk_score IS NOT NULL"]
+        params = {}
+        if self.risk_level:
+            conditions.append(RISK_LEVELS[self.risk_level])
+        if self.min_score is not None:
+            conditions.append("a.integrity_risk_score >= $min_score")
+            params["min_score"] = self.min_score
+        if self.min_fused_count is not None:
+            conditions.append(f"{FUSED_COUNT} >= $min_fused_count")
+            params["min_fused_count"] = self.min_fused_count
+        if self.search is not None:
+            if self.search_type == "ID":
+                conditions.append("toString(a.community) CONTAINS $search")
+            elif self.search.startswith("0x"):
+                # A pasted address prefix seeks the address uniqueness index
+                conditions.append("a.address STARTS WITH $search")
+            else:
+                conditions.append("a.address CONTAINS $search")
+            params["search"] = self.search
+        return conditions, params
+
+    def page_query(self):
+        conditions, params = self._filters()
+        if self.after is not None:
+            conditions.append(
+                "(a.integrity_risk_score < $after_score"
+                " OR (a.integrity_risk_score = $after_score AND a.address > $after_address))"
+            )
+            params["after_score"], params["after_address"] = self.after
+        # One extra row tells whether another page follows
+        params["fetch"] = self.limit + 1
+        query = PAGE_QUERY.replace("{conditions}", "\n  AND ".join(conditions)).replace("{fused_count}", FUSED_COUNT)
+        return cypher(PAGE_QUERY.name, query), params
+
+    def count_query(self):
+        conditions, params = self._filters()
+        return cypher(COUNT_QUERY.name, COUNT_QUERY.replace("{conditions}", "\n  AND ".join(conditions))), params
+
+    def total_from(self, distribution):
+        """Total of a band-only filter, read from the cached dashboard distribution."""
+        if self.risk_level:
+            return distribution[LEVEL_COUNTERS[self.risk_level]]
+        return sum(distribution[c] for c in LEVEL_COUNTERS.values())
+
+    def shape(self, records):
+        """Response body for the fetched records."""
+        nodes = records[:self.limit]
+        next_cursor = None
+        if len(records) > self.limit and nodes:
+            last = nodes[-1]
+            next_cursor = encode_cursor(last["integrity_risk_score"], last["address"])
+        return {"nodes": nodes, "next_cursor": next_cursor}
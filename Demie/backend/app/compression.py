@@ -0,0 +1,46 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size, quality=4, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body, *, more_body):
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        out = self._compressor.process(body)
+        return out + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Negotiated response compression: brotli when the client accepts it and
+    the `brotli` package is installed, gzip otherwise. Small bodies and
+    event streams (the live feed) are sent as-is.
+    """
+
+    def __init__(self, app, minimum_size=1024, compresslevel=6, brotli_quality=4):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and brotli is not None:
+            accepted = Headers(scope=scope).get("Accept-Encoding", "")
+            if "br" in [part.split(";")[0].strip() for part in accepted.split(",")]:
+                responder = BrotliResponder(
+                    self.app, self.minimum_size, quality=self.brotli_quality,
+                    exclude_content_types=self.exclude_content_types,
+                )
+                await responder(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
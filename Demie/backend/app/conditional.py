@@ -0,0 +1,65 @@
+from app.data_version import data_version
+
+
+def version_etag(*parts):
+    """
+    Weak ETag of a representation derived from the data version. Weak,
+    because the compressed and identity encodings share it.
+    """
+    return 'W/"' + ".".join(str(p) for p in parts) + '"'
+
+
+def etag_matches(header, etag):
+    """If-None-Match comparison (weak: the W/ prefix is ignored)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == wanted for candidate in header.split(","))
+
+
+class ConditionalGetMiddleware:
+    """
+    ETag / If-None-Match for read endpoints whose body only changes with
+    the data version. `routes` maps a path to a callable returning the
+    ETag parts (default: the data version alone). A matching request is
+    answered 304 before the endpoint runs, so it costs no Neo4j work;
+    200 responses get the ETag and a revalidate-always Cache-Control.
+    """
+
+    def __init__(self, app, routes, cache_control="no-cache"):
+        self.app = app
+        self.routes = routes
+        self.cache_control = cache_control.encode()
+
+    async def __call__(self, scope, receive, send):
+        parts = self.routes.get(scope.get("path")) if scope["type"] == "http" else None
+        if parts is None or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        etag = version_etag(*parts())
+        headers = dict(scope["headers"])
+        if etag_matches(headers.get(b"if-none-match", b"").decode("latin-1"), etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", self.cache_control)],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"etag", etag.encode()),
+                    (b"cache-control", self.cache_control),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+def data_version_parts():
+    return (data_version.current(),)
@@ -0,0 +1,120 @@
+import numpy as np
+import torch
+from app.core.graph_builder import build_csr, ragged_arange
+
+
+class NeighborSampledInference:
+    """
+    Mini-batch GATv2 inference over a graph that is too large for one
+    forward pass.
+
+    Target nodes are processed `batch_size` at a time. For each batch the
+    incoming 2-hop neighbourhood is gathered from a CSR index, keeping at
+    most `fanout[k]` in-edges per node at hop k (-1 keeps all of them), and
+    the model runs on that subgraph only. With unlimited fan-out every
+    target sees exactly its full receptive field, so the output matches a
+    full-graph pass. Peak activation memory scales with the batch
+    neighbourhood, not the graph.
+
+    `forward(x, edge_index)` must return per-node logits; when an attention
+    collector is passed it is called with `return_attention=True` and must
+    also return conv1's (edge_index, alpha).
+    `x` is either a [N, F] tensor/array or a callable `rows -> FloatTensor`
+    so that feature rows can be materialized per batch.
+    """
+
+    def __init__(self, forward, batch_size=4096, fanout=(-1, -1), seed=0):
+        self.forward = forward
+        self.batch_size = batch_size
+        self.fanout = tuple(fanout)
+        self.seed = seed
+
+    def predict(self, x, edge_index, num_nodes, csr=None, attention=None):
+        """
+        Returns logits for every node, shape [num_nodes, C]. A prebuilt
+        incoming `csr` (indptr, indices) may be passed instead of edge_index.
+        `attention.add(dst, src, alpha)` receives every target's incoming
+        conv1 attention (global rows, head-averaged, self-loops dropped).
+        """
+        outputs = None
+        for rows, logits in self.iter_batches(x, edge_index, num_nodes, csr, attention):
+            if outputs is None:
+                outputs = torch.empty((num_nodes, logits.shape[1]), dtype=logits.dtype)
+            outputs[torch.from_numpy(rows)] = logits
+        if outputs is None:
+            return torch.zeros((0, 2))
+        return outputs
+
+    def iter_batches(self, x, edge_index, num_nodes, csr=None, attention=None):
+        """Yields (target_rows, logits) per batch."""
+        indptr, indices = csr if csr is not None else build_csr(edge_index, num_nodes)
+        rng = np.random.default_rng(self.seed)
+        gather = x if callable(x) else (lambda rows: _take_rows(x, rows))
+
+        for start in range(0, num_nodes, self.batch_size):
+            targets = np.arange(start, min(start + self.batch_size, num_nodes), dtype=np.int64)
+            yield targets, self.predict_targets(gather, (indptr, indices), targets, rng, attention)
+
+    def predict_targets(self, gather, csr, targets, rng, attention=None):
+        """Logits for one batch of target rows over a prebuilt incoming CSR (indptr, indices)."""
+        nodes, local_edges, target_pos = self._subgraph(csr[0], csr[1], targets, rng)
+        with torch.no_grad():
+            if attention is None:
+                logits = self.forward(gather(nodes), local_edges)
+            else:
+                logits, (att_index, alpha) = self.forward(gather(nodes), local_edges, return_attention=True)
+                self._collect(attention, nodes, target_pos, att_index.numpy(), alpha.mean(dim=1).numpy())
+        return logits[torch.from_numpy(target_pos)]
+
+    def _collect(self, attention, nodes, target_pos, att_index, alpha):
+        """Passes the targets' incoming attention (in global rows) to the collector."""
+        is_target = np.zeros(len(nodes), dtype=bool)
+        is_target[target_pos] = True
+        keep = is_target[att_index[1]] & (att_index[0] != att_index[1])
+        attention.add(nodes[att_index[1, keep]], nodes[att_index[0, keep]], alpha[keep])
+
+    def _subgraph(self, indptr, indices, targets, rng):
+        """Samples the incoming multi-hop neighbourhood of `targets` and relabels it locally."""
+        srcs, dsts = [], []
+        expanded = targets
+        frontier = targets
+        for fanout in self.fanout:
+            s, d = _sample_in_edges(indptr, indices, frontier, fanout, rng)
+            srcs.append(s)
+            dsts.append(d)
+            # Expand each node at most once so no in-edge is duplicated
+            frontier = np.setdiff1d(np.unique(s), expanded, assume_unique=True)
+            expanded = np.union1d(expanded, frontier)
+
+        src = np.concatenate(srcs)
+        dst = np.concatenate(dsts)
+        nodes = np.union1d(targets, src)
+
+        local = np.empty((2, len(src)), dtype=np.int64)
+        local[0] = np.searchsorted(nodes, src)
+        local[1] = np.searchsorted(nodes, dst)
+        return nodes, torch.from_numpy(local), np.searchsorted(nodes, targets)
+
+
+def _sample_in_edges(indptr, indices, frontier, fanout, rng):
+    """In-edges of every frontier node, capped at `fanout` uniformly sampled ones per node."""
+    starts = indptr[frontier]
+    degree = indptr[frontier + 1] - starts
+    positions = ragged_arange(starts, degree)
+    owner = np.repeat(frontier, degree)
+
+    if fanout >= 0 and len(positions) and degree.max() > fanout:
+        # Random order inside each node's segment, then keep the first `fanout`
+        group = np.repeat(np.arange(len(frontier)), degree)
+        order = np.lexsort((rng.random(len(positions)), group))
+        segment_start = np.repeat(np.cumsum(degree) - degree, degree)
+        keep = order[(np.arange(len(order)) - segment_start) < fanout]
+        positions, owner = positions[keep], owner[keep]
+
+    return indices[positions], owner
+
+
+def _take_rows(x, rows):
+    if isinstance(x, torch.Tensor):
+        return x[torch.from_numpy(rows)]
+    return torch.as_tensor(np.asarray(x[rows]), dtype=torch.float)
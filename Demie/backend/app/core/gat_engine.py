@@ -1,4 +1,5 @@
 # app/models/gat_model.py
+import copy
 import torch
 import torch.nn.functional as F
 from torch_geometric.nn import GATv2Conv, BatchNorm
@@ -20,4 +21,49 @@ class DeMIE_GATv2(torch.nn.Module):
         x = F.leaky_relu(x)
         x = self.conv2(x, edge_index)
         x = F.leaky_relu(x)
-        return F.log_softmax(self.out(x), dim=1), alpha
\ No newline at end of file
+        return F.log_softmax(self.out(x), dim=1), alpha
+
+class DeMIE_GATv2Inference(torch.nn.Module):
+    """
+    Frozen, eval-only variant of DeMIE_GATv2 for the scoring path.
+
+    BatchNorm (running stats) and conv1's bias are folded into a single
+    per-channel scale/shift. They cannot go into conv1's weights because
+    GATv2 attention is computed from the same projection. Forward returns
+    log-probabilities; conv1's attention weights are only materialized
+    when `return_attention` is set.
+    """
+
+    def __init__(self, model):
+        super(DeMIE_GATv2Inference, self).__init__()
+        model = copy.deepcopy(model).eval()
+        bn = model.bn1.module
+
+        scale = torch.rsqrt(bn.running_var + bn.eps)
+        if bn.weight is not None:
+            scale = scale * bn.weight
+        shift = -bn.running_mean * scale
+        if bn.bias is not None:
+            shift = shift + bn.bias
+        if model.conv1.bias is not None:
+            shift = shift + model.conv1.bias * scale
+            model.conv1.bias = None
+
+        self.conv1 = model.conv1
+        self.conv2 = model.conv2
+        self.out = model.out
+        self.register_buffer("bn_scale", scale.detach().clone())
+        self.register_buffer("bn_shift", shift.detach().clone())
+
+    def forward(self, x, edge_index, return_attention=False):
+        if return_attention:
+            # attention = (edge_index with self-loops, alpha [E, heads])
+            x, attention = self.conv1(x, edge_index, return_attention_weights=True)
+        else:
+            x = self.conv1(x, edge_index)
+        x = torch.addcmul(self.bn_shift, x, self.bn_scale)
+        x = F.leaky_relu(x)
+        x = self.conv2(x, edge_index)
+        x = F.leaky_relu(x)
+        log_probs = F.log_softmax(self.out(x), dim=1)
+        return (log_probs, attention) if return_attention else log_probs
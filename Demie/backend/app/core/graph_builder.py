@@ -0,0 +1,113 @@
+import numpy as np
+import torch
+
+
+class DenseIdMap:
+    """
+    Maps sparse Neo4j internal ids to dense row indices [0, N).
+
+    Neo4j ids are allocated from a mostly contiguous range, so when the id
+    span is at most `max_span_ratio` times the node count the map is a
+    direct-address table (one gather per lookup). Otherwise it falls back
+    to a sorted copy of the ids and a vectorized searchsorted.
+    """
+
+    def __init__(self, ids, max_span_ratio=8):
+        ids = np.asarray(ids, dtype=np.int64)
+        self._size = len(ids)
+        self._table = None
+        self._min = 0
+
+        if self._size and ids.min() >= 0:
+            self._min = int(ids.min())
+            span = int(ids.max()) - self._min + 1
+            if span <= max_span_ratio * self._size + 1024:
+                self._table = np.full(span, -1, dtype=np.int64)
+                self._table[ids - self._min] = np.arange(self._size, dtype=np.int64)
+
+        if self._table is None:
+            self._order = np.argsort(ids, kind="stable")
+            self._sorted = ids[self._order]
+
+    def __len__(self):
+        return self._size
+
+    def lookup(self, ids):
+        """Returns (dense_index, found_mask). Indices where found is False are meaningless."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if self._size == 0:
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+
+        if self._table is not None:
+            offset = ids - self._min
+            in_range = (offset >= 0) & (offset < len(self._table))
+            idx = self._table[np.where(in_range, offset, 0)]
+            found = in_range & (idx >= 0)
+            return idx, found
+
+        # Probing with sorted needles keeps searchsorted cache-friendly
+        probe = np.argsort(ids, kind="stable")
+        pos = np.empty(len(ids), dtype=np.int64)
+        pos[probe] = np.searchsorted(self._sorted, ids[probe])
+        np.minimum(pos, self._size - 1, out=pos)
+        found = self._sorted[pos] == ids
+        return self._order[pos], found
+
+
+def build_edge_index(id_map, src, dst, dedupe=True, symmetrize=False):
+    """
+    Converts edge endpoints given as Neo4j ids into a GAT edge_index.
+
+    Dangling edges (an endpoint outside `id_map`) are dropped with a mask.
+    With `symmetrize`, every edge is mirrored; with `dedupe`, repeated
+    (src, dst) pairs collapse to one and the result is sorted by source.
+    Returns a contiguous torch.long tensor of shape [2, E].
+    """
+    s, s_ok = id_map.lookup(src)
+    d, d_ok = id_map.lookup(dst)
+    keep = s_ok & d_ok
+    s, d = s[keep], d[keep]
+
+    if symmetrize:
+        s, d = np.concatenate([s, d]), np.concatenate([d, s])
+
+    if dedupe and len(s):
+        n = np.int64(len(id_map))
+        keys = s * n + d
+        keys.sort()
+        first = np.ones(len(keys), dtype=bool)
+        np.not_equal(keys[1:], keys[:-1], out=first[1:])
+        keys = keys[first]
+        s, d = keys // n, keys % n
+
+    edge_index = np.empty((2, len(s)), dtype=np.int64)
+    edge_index[0] = s
+    edge_index[1] = d
+    return torch.from_numpy(edge_index)
+
+
+def build_csr(edge_index, num_nodes):
+    """
+    Incoming-edge CSR of an edge_index: the sources of node v's in-edges
+    are indices[indptr[v]:indptr[v + 1]]. Duplicate edges are kept.
+    """
+    if isinstance(edge_index, torch.Tensor):
+        edge_index = edge_index.numpy()
+    src = np.asarray(edge_index[0], dtype=np.int64)
+    dst = np.asarray(edge_index[1], dtype=np.int64)
+
+    order = np.argsort(dst, kind="stable")
+    indices = src[order]
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(dst, minlength=num_nodes), out=indptr[1:])
+    return indptr, indices
+
+
+def ragged_arange(starts, counts):
+    """Concatenation of arange(s, s + c) for every (s, c) pair, without a Python loop."""
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(np.asarray(starts, dtype=np.int64) - offsets, counts) + np.arange(total, dtype=np.int64)
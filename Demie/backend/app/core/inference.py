@@ -0,0 +1,127 @@
+import copy
+import time
+import torch
+import torch.nn.functional as F
+from torch_geometric.nn.dense.linear import Linear as PyGLinear
+from app.core.gat_engine import DeMIE_GATv2Inference
+
+INFERENCE_BACKENDS = ("eager", "fused", "compile")
+QUANTIZATION_MODES = ("none", "int8", "bf16")
+
+
+class _EagerForward(torch.nn.Module):
+    """The training module as-is, with the attention output dropped unless requested."""
+
+    def __init__(self, model):
+        super(_EagerForward, self).__init__()
+        self.model = model
+
+    def forward(self, x, edge_index, return_attention=False):
+        if not return_attention:
+            logits, _ = self.model(x, edge_index)
+            return logits
+        # Same layers as DeMIE_GATv2.forward, keeping conv1's edge_index with alpha
+        m = self.model
+        h, attention = m.conv1(x, edge_index, return_attention_weights=True)
+        h = F.leaky_relu(m.bn1(h))
+        h = F.leaky_relu(m.conv2(h, edge_index))
+        return F.log_softmax(m.out(h), dim=1), attention
+
+
+def build_inference_model(model, backend="fused", quantization="none"):
+    """
+    Builds the scoring forward `(x, edge_index) -> log-probs` from a loaded
+    DeMIE_GATv2.
+
+    eager   - the original module (attention weights computed, then dropped)
+    fused   - DeMIE_GATv2Inference: BatchNorm folded, no attention output
+    compile - torch.compile over the fused module (dynamic shapes); falls
+              back to fused if the compiler is unavailable
+
+    `quantization` ("int8" or "bf16", see quantize_inference_model) is
+    applied to the fused graph before compilation.
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {INFERENCE_BACKENDS}")
+
+    model.eval()
+    if backend == "eager" and quantization == "none":
+        return _EagerForward(model)
+
+    fused = quantize_inference_model(DeMIE_GATv2Inference(model).eval(), quantization)
+    if backend == "compile":
+        try:
+            return torch.compile(fused, dynamic=True)
+        except Exception as e:
+            print(f"[!] torch.compile unavailable, using fused graph: {e}")
+    return fused
+
+
+class _BFloat16Forward(torch.nn.Module):
+    """Runs the wrapped forward under CPU bfloat16 autocast; returns float32."""
+
+    def __init__(self, module):
+        super(_BFloat16Forward, self).__init__()
+        self.module = module
+
+    def forward(self, x, edge_index, return_attention=False):
+        with torch.autocast(device_type="cpu", dtype=torch.bfloat16):
+            out = self.module(x, edge_index, return_attention)
+        if return_attention:
+            log_probs, (attention_index, alpha) = out
+            return log_probs.float(), (attention_index, alpha.float())
+        return out.float()
+
+
+def _swap_pyg_linears(module):
+    """Replaces PyG Linear layers with equivalent torch.nn.Linear so dynamic quantization sees them."""
+    for name, child in module.named_children():
+        if isinstance(child, PyGLinear):
+            linear = torch.nn.Linear(child.in_channels, child.out_channels, bias=child.bias is not None)
+            linear.weight.data.copy_(child.weight.data)
+            if child.bias is not None:
+                linear.bias.data.copy_(child.bias.data)
+            setattr(module, name, linear)
+        else:
+            _swap_pyg_linears(child)
+
+
+def quantize_inference_model(module, mode="none"):
+    """
+    Reduced-precision CPU variants of an inference module.
+
+    int8 - dynamic int8 quantization of every projection: GATv2Conv's
+           lin_l/lin_r and the output Linear. Activations stay float and
+           weights are quantized once here.
+    bf16 - bfloat16 autocast for the whole forward pass.
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}")
+    if mode == "none":
+        return module
+    if mode == "bf16":
+        return _BFloat16Forward(module).eval()
+
+    quantized = copy.deepcopy(module)
+    _swap_pyg_linears(quantized)
+    return torch.ao.quantization.quantize_dynamic(quantized, {torch.nn.Linear}, dtype=torch.qint8).eval()
+
+
+def warm_up(forward, in_channels, num_nodes=64, num_edges=256, passes=2, attention=False):
+    """
+    Runs throwaway forward passes so lazy initialization and compilation
+    happen at load time rather than on the first /analyze request. With
+    `attention`, the return_attention=True signature (compiled as its own
+    graph) is warmed up too. Returns the warm-up time in seconds.
+    """
+    generator = torch.Generator().manual_seed(0)
+    x = torch.randn((num_nodes, in_channels), generator=generator)
+    edge_index = torch.randint(0, num_nodes, (2, num_edges), generator=generator)
+
+    start = time.perf_counter()
+    with torch.no_grad():
+        for _ in range(passes):
+            forward(x, edge_index)
+            if attention:
+                forward(x, edge_index, return_attention=True)
+    return time.perf_counter() - start
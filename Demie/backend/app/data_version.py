@@ -0,0 +1,63 @@
+import json
+import os
+from app.routers.config import settings
+
+
+class DataVersion:
+    """
+    Monotonic version of the scored graph. Bumped whenever an analysis run
+    has written scores/fusion or an ingest batch is signalled, so anything
+    derived from the graph (cached explanations, responses, ETags) can be
+    keyed on it.
+
+    With a `path` the value is persisted on every bump and reloaded at
+    startup, so it never moves backwards across restarts (an ETag issued
+    before a restart cannot match different data after it).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.value = self._load()
+        self.listeners = []
+
+    def current(self):
+        return self.value
+
+    def bump(self):
+        self.value += 1
+        self._save()
+        for listener in self.listeners:
+            listener(self.value)
+        return self.value
+
+    def subscribe(self, listener):
+        """Registers `listener(version)`, called after every bump."""
+        self.listeners.append(listener)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path) as f:
+                return int(json.load(f)["version"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[!] Unreadable data version at {self.path}, starting at 0: {e}")
+            return 0
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Write-then-rename: a crash never leaves a truncated file
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"version": self.value}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[!] Could not persist data version {self.value}: {e}")
+
+
+data_version = DataVersion(settings.DATA_VERSION_PATH)
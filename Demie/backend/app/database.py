@@ -1,4 +1,7 @@
 from neo4j import AsyncGraphDatabase
+from app.metrics import InstrumentedSession, QUERY_OBSERVERS, pool_collector, registry
+from app.query_log import SlowQueryLog
+from app.routers.config import settings
 import os
 
 # Database Driver - Global Singleton
@@ -7,9 +10,26 @@ driver = AsyncGraphDatabase.driver(
     auth=("neo4j", "password123")
 )
 
+registry.add_collector(pool_collector(driver))
+
+# Statements over the threshold are logged; a sample is re-run under PROFILE
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_LOG_PATH,
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    profile_rate=settings.SLOW_QUERY_PROFILE_RATE,
+    session_factory=driver.session,
+)
+QUERY_OBSERVERS.append(slow_query_log.observe)
+
+def instrumented_session(**config):
+    """driver.session() whose statements are timed (background pipelines)."""
+    return InstrumentedSession(driver.session(**config))
+
 async def get_db_session():
-    session = driver.session()
+    # Per-statement timing/row counts for everything run through endpoints
+    session = InstrumentedSession(driver.session())
     try:
         yield session
     finally:
+        # Records statements whose results were never read before closing
         await session.close()
\ No newline at end of file
@@ -0,0 +1,168 @@
+import json
+import os
+import numpy as np
+
+# Column order the scaler was fitted on, written by generate_scaler.py
+SCALER_COLUMNS_PATH = "data/scaler_columns.json"
+
+RAW_FILE = "raw.f32"
+SCALED_FILE = "scaled.f32"
+KEYS_FILE = "keys.npy"
+KEY_ROWS_FILE = "key_rows.npy"
+META_FILE = "meta.json"
+
+
+def load_columns(path=SCALER_COLUMNS_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_columns(columns, path=SCALER_COLUMNS_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(list(columns), f, indent=2)
+
+
+def _normalize(addresses):
+    return np.array([str(a).lower() for a in addresses], dtype=str)
+
+
+class FeatureStore:
+    """
+    On-disk 45-feature matrix for known addresses.
+
+    Layout of `directory`:
+    raw.f32              float32 [rows, 45], unscaled, in scaler column order
+    scaled.f32           the same rows after scaler.transform (model input)
+    keys.npy             addresses, sorted, for binary-search lookup
+    key_rows.npy         matrix row of each sorted key
+    meta.json            row count and column order
+
+    Every array is opened as a read-only memory map, so loading costs no
+    copy and any number of workers can share the pages through the OS page
+    cache. The scaled copy is maintained by `upsert`, so inference never
+    re-runs the scaler for stored rows.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.columns = None
+        self.num_rows = 0
+        self.raw = None
+        self.scaled = None
+        self.keys = None
+        self.key_rows = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def exists(self):
+        return os.path.exists(self._path(META_FILE))
+
+    def open(self, expected_columns=None):
+        """
+        Maps the store read-only. Returns False if it is missing or was built
+        for a different column order than `expected_columns`.
+        """
+        if not self.exists():
+            return False
+        with open(self._path(META_FILE)) as f:
+            meta = json.load(f)
+        if expected_columns is not None and list(expected_columns) != meta["columns"]:
+            print(f"[!] Feature store at {self.directory} does not match the scaler column order; ignoring it.")
+            return False
+
+        self.columns = meta["columns"]
+        self.num_rows = meta["rows"]
+        shape = (self.num_rows, len(self.columns))
+        if self.num_rows:
+            self.raw = np.memmap(self._path(RAW_FILE), dtype=np.float32, mode="r", shape=shape)
+            self.scaled = np.memmap(self._path(SCALED_FILE), dtype=np.float32, mode="r", shape=shape)
+        else:
+            self.raw = np.zeros(shape, dtype=np.float32)
+            self.scaled = np.zeros(shape, dtype=np.float32)
+        self.keys = np.load(self._path(KEYS_FILE), mmap_mode="r")
+        self.key_rows = np.load(self._path(KEY_ROWS_FILE), mmap_mode="r")
+        return True
+
+    def lookup(self, addresses):
+        """Returns (rows, found) for each address; rows are undefined where not found."""
+        needles = _normalize(addresses)
+        if self.num_rows == 0 or len(needles) == 0:
+            return np.zeros(len(needles), dtype=np.int64), np.zeros(len(needles), dtype=bool)
+        pos = np.searchsorted(self.keys, needles)
+        pos = np.minimum(pos, self.num_rows - 1)
+        found = self.keys[pos] == needles
+        return np.asarray(self.key_rows[pos], dtype=np.int64), found
+
+    def scaled_rows(self, rows):
+        """Model-ready feature rows (only the requested rows are read from disk)."""
+        return self.scaled[np.asarray(rows, dtype=np.int64)]
+
+    def upsert(self, addresses, raw, scaler):
+        """
+        Writes raw feature rows and their scaled copy. Known addresses are
+        updated in place; new ones are appended and the index is rebuilt.
+        """
+        addresses = _normalize(addresses)
+        raw = np.asarray(raw, dtype=np.float32)
+        if raw.shape != (len(addresses), len(self.columns)):
+            raise ValueError(f"Expected a ({len(addresses)}, {len(self.columns)}) feature block, got {raw.shape}")
+        scaled = scaler.transform(raw).astype(np.float32)
+
+        rows, found = self.lookup(addresses)
+        width = len(self.columns)
+        # 1. In-place update of existing rows
+        if found.any():
+            shape = (self.num_rows, width)
+            for name, block in ((RAW_FILE, raw), (SCALED_FILE, scaled)):
+                matrix = np.memmap(self._path(name), dtype=np.float32, mode="r+", shape=shape)
+                matrix[rows[found]] = block[found]
+                matrix.flush()
+                del matrix
+
+        # 2. Append new rows (last occurrence wins for duplicates within the batch)
+        new = ~found
+        appended = 0
+        if new.any():
+            new_addresses, last = np.unique(addresses[new][::-1], return_index=True)
+            pick = np.flatnonzero(new)[::-1][last]
+            for name, block in ((RAW_FILE, raw), (SCALED_FILE, scaled)):
+                with open(self._path(name), "ab") as f:
+                    f.write(np.ascontiguousarray(block[pick]).tobytes())
+
+            keys = np.concatenate([np.asarray(self.keys), new_addresses])
+            key_rows = np.concatenate([
+                np.asarray(self.key_rows, dtype=np.int64),
+                np.arange(self.num_rows, self.num_rows + len(new_addresses), dtype=np.int64),
+            ])
+            appended = len(new_addresses)
+            order = np.argsort(keys, kind="stable")
+            self._write_index(keys[order], key_rows[order], self.num_rows + len(new_addresses))
+
+        self.open()
+        return {"updated": int(found.sum()), "appended": appended}
+
+    def _write_index(self, keys, key_rows, num_rows):
+        # Drop the maps before the files underneath are replaced
+        self.keys = self.key_rows = None
+        np.save(self._path(KEYS_FILE), keys)
+        np.save(self._path(KEY_ROWS_FILE), key_rows)
+        with open(self._path(META_FILE), "w") as f:
+            json.dump({"rows": int(num_rows), "columns": list(self.columns)}, f)
+
+    @classmethod
+    def build(cls, directory, addresses, raw, scaler, columns):
+        """Creates (or replaces) a store from a full feature matrix."""
+        os.makedirs(directory, exist_ok=True)
+        store = cls(directory)
+        store.columns = list(columns)
+        for name in (RAW_FILE, SCALED_FILE):
+            open(store._path(name), "wb").close()
+        store._write_index(np.array([], dtype=str), np.array([], dtype=np.int64), 0)
+        store.open()
+        store.upsert(addresses, raw, scaler)
+        print(f"[*] Feature store: {store.num_rows} rows x {len(store.columns)} features at {directory}")
+        return store
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+from app.core.graph_builder import DenseIdMap
+from app.score_writer import write_in_chunks
+from app.metrics import cypher
+
+INHERIT_COMMUNITY_QUERY = cypher("fusion.inherit_community", """
+UNWIND $rows AS row
+MATCH (n:Address) WHERE id(n) = row.id
+SET n.community = row.community
+""")
+
+DELETE_FUSED_QUERY = cypher("fusion.delete_fused", """
+UNWIND $rows AS row
+MATCH (a:Address)-[r:FUSED_TO]->(b:Address)
+WHERE id(a) = row.src AND id(b) = row.dst
+DELETE r
+""")
+
+CREATE_FUSED_QUERY = cypher("fusion.create_fused", """
+UNWIND $rows AS row
+MATCH (a:Address) WHERE id(a) = row.src
+MATCH (b:Address) WHERE id(b) = row.dst
+MERGE (a)-[:FUSED_TO]->(b)
+""")
+
+FUSED_COUNT_QUERY = cypher("fusion.fused_count", """
+UNWIND $rows AS row
+MATCH (p:Address) WHERE id(p) = row.id
+SET p.fused_count = row.count
+""")
+
+CLUSTER_SIZE_QUERY = cypher("fusion.cluster_size", """
+UNWIND $rows AS row
+MATCH (n:Address) WHERE id(n) = row.id
+SET n.cluster_size = row.size
+""")
+
+
+class FusionPlan:
+    """Row-level delta produced by FusionStage.plan (all indices are graph rows)."""
+
+    def __init__(self, codes, labels, proxies, inherited, create, delete, counts, sizes):
+        self.codes = codes            # community code per row after inheritance (-1 = none)
+        self.labels = labels          # community value per code
+        self.proxies = proxies        # proxy row per community code
+        self.inherited = inherited    # rows that picked up a neighbour's community
+        self.create = create          # (2, k) member -> proxy FUSED_TO edges to add
+        self.delete = delete          # (2, k) stale FUSED_TO edges to remove
+        self.counts = counts          # (proxy rows, new fused_count) that changed
+        self.sizes = sizes            # (rows, new cluster_size) that changed
+
+
+class FusionStage:
+    """
+    Identity fusion as an in-memory pipeline stage.
+
+    For each run it:
+    1. lets Address nodes without a community inherit one from a SENT
+       neighbour
+    2. picks the highest-risk member of every community as its proxy
+    3. points every other member at that proxy through FUSED_TO
+    4. sets the proxy's fused_count to its member count + 1 (0 once a
+       former proxy has no members left)
+    5. sets every node's cluster_size: itself plus the nodes within two
+       FUSED_TO hops (what the live feed used to expand at read time)
+
+    Everything is computed with array group-bys over the extracted graph.
+    Only the difference from what is stored goes back to Neo4j: new
+    communities, FUSED_TO edges to add or retarget, and changed counts.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+
+    def plan(self, graph, scores, inherit_rows=None):
+        """
+        Computes the fusion delta for `graph` given this run's `scores`.
+        `inherit_rows` (bool mask) limits which rows may inherit a community.
+        """
+        n = graph.num_nodes
+        scores = np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=-np.inf)
+        codes, labels = pd.factorize(pd.Series(graph.communities, dtype=object), use_na_sentinel=True)
+        codes = codes.astype(np.int64)
+        id_map = DenseIdMap(graph.node_ids)
+
+        # 1. COMMUNITY INHERITANCE over undirected SENT edges (lowest neighbour row wins)
+        s, d = self._edges(graph, id_map, "SENT")
+        u, v = np.concatenate([s, d]), np.concatenate([d, s])
+        take = (codes[u] < 0) & (codes[v] >= 0)
+        if inherit_rows is not None:
+            take &= inherit_rows[u]
+        u, v = u[take], v[take]
+        order = np.lexsort((v, u))
+        u, v = u[order], v[order]
+        first = np.ones(len(u), dtype=bool)
+        np.not_equal(u[1:], u[:-1], out=first[1:])
+        inherited = u[first]
+        codes = codes.copy()
+        codes[inherited] = codes[v[first]]
+
+        # 2. PROXY PER COMMUNITY: highest score, ties to the lowest row
+        members = np.flatnonzero(codes >= 0)
+        proxies = np.full(len(labels), -1, dtype=np.int64)
+        if len(members):
+            order = np.lexsort((members, -scores[members], codes[members]))
+            ranked = members[order]
+            head = np.ones(len(ranked), dtype=bool)
+            np.not_equal(codes[ranked[1:]], codes[ranked[:-1]], out=head[1:])
+            proxies[codes[ranked[head]]] = ranked[head]
+
+        # 3. DESIRED vs EXISTING FUSED_TO
+        member_rows = members[proxies[codes[members]] != members]
+        want_src, want_dst = member_rows, proxies[codes[member_rows]]
+        have_src, have_dst = self._edges(graph, id_map, "FUSED_TO")
+
+        key = np.int64(max(n, 1))
+        want = want_src * key + want_dst
+        have = have_src * key + have_dst
+        create_mask = ~np.isin(want, have)
+        # Only edges leaving community members are managed by fusion
+        delete_mask = (codes[have_src] >= 0) & ~np.isin(have, want)
+
+        # 4. FUSED COUNTS from the post-update edge set
+        kept_dst = np.concatenate([have_dst[~delete_mask], want_dst[create_mask]])
+        incoming = np.bincount(kept_dst, minlength=n)
+        proxy_rows = proxies[proxies >= 0]
+        proxy_rows = proxy_rows[incoming[proxy_rows] > 0]
+        new_counts = incoming[proxy_rows] + 1
+        changed = graph.fused_counts[proxy_rows] != new_counts
+        # Former proxies left without members are reset to 0
+        stored_counts = np.nan_to_num(np.asarray(graph.fused_counts, dtype=np.float64), nan=0.0)
+        emptied = (stored_counts != 0) & (incoming == 0)
+        if inherit_rows is not None:
+            # Scoped runs: only community members have their whole cluster in scope
+            emptied &= codes >= 0
+        emptied_rows = np.flatnonzero(emptied)
+        proxy_rows = np.concatenate([proxy_rows[changed], emptied_rows])
+        new_counts = np.concatenate([new_counts[changed], np.zeros(len(emptied_rows), dtype=new_counts.dtype)])
+        order = np.argsort(proxy_rows, kind="stable")
+        proxy_rows, new_counts = proxy_rows[order], new_counts[order]
+
+        # 5. CLUSTER SIZES: 1 + deg(v) + sum of (deg(u) - 1) over FUSED_TO
+        # neighbours u, i.e. the 2-hop neighbourhood of a star (exact for the
+        # member -> proxy edges fusion maintains), in O(E)
+        kept_src = np.concatenate([have_src[~delete_mask], want_src[create_mask]])
+        pairs = np.unique(np.sort(np.stack([kept_src, kept_dst]), axis=0), axis=1)
+        pairs = pairs[:, pairs[0] != pairs[1]]
+        degree = np.bincount(pairs.ravel(), minlength=n)
+        second = np.bincount(pairs[0], weights=degree[pairs[1]] - 1, minlength=n) \
+            + np.bincount(pairs[1], weights=degree[pairs[0]] - 1, minlength=n)
+        sizes = 1 + degree + second.astype(np.int64)
+        stored = np.asarray(graph.cluster_sizes, dtype=np.float64)
+        # Unset reads as 1, so singletons are never written
+        size_changed = np.where(np.isnan(stored), sizes != 1, stored != sizes)
+        if inherit_rows is not None:
+            # Scoped runs: only community members have their whole cluster in scope
+            size_changed &= codes >= 0
+        size_rows = np.flatnonzero(size_changed)
+
+        return FusionPlan(
+            codes=codes,
+            labels=np.asarray(labels, dtype=object),
+            proxies=proxies,
+            inherited=inherited,
+            create=np.vstack([want_src[create_mask], want_dst[create_mask]]),
+            delete=np.vstack([have_src[delete_mask], have_dst[delete_mask]]),
+            counts=(proxy_rows, new_counts),
+            sizes=(size_rows, sizes[size_rows]),
+        )
+
+    async def apply(self, session, graph, plan):
+        """Writes a FusionPlan back to Neo4j in chunked UNWIND transactions."""
+        ids = graph.node_ids
+        inherit_rows = [
+            {"id": int(ids[r]), "community": _plain(plan.labels[plan.codes[r]])} for r in plan.inherited
+        ]
+        delete_rows = [{"src": int(ids[a]), "dst": int(ids[b])} for a, b in plan.delete.T]
+        create_rows = [{"src": int(ids[a]), "dst": int(ids[b])} for a, b in plan.create.T]
+        proxy_rows, counts = plan.counts
+        count_rows = [{"id": int(ids[r]), "count": int(c)} for r, c in zip(proxy_rows, counts)]
+        size_rows, sizes = plan.sizes
+        cluster_rows = [{"id": int(ids[r]), "size": int(s)} for r, s in zip(size_rows, sizes)]
+
+        await write_in_chunks(session, INHERIT_COMMUNITY_QUERY, inherit_rows, self.chunk_size)
+        await write_in_chunks(session, DELETE_FUSED_QUERY, delete_rows, self.chunk_size)
+        await write_in_chunks(session, CREATE_FUSED_QUERY, create_rows, self.chunk_size)
+        await write_in_chunks(session, FUSED_COUNT_QUERY, count_rows, self.chunk_size)
+        await write_in_chunks(session, CLUSTER_SIZE_QUERY, cluster_rows, self.chunk_size)
+
+        return {
+            "inherited": len(inherit_rows),
+            "fused_created": len(create_rows),
+            "fused_removed": len(delete_rows),
+            "counts_updated": len(count_rows),
+            "sizes_updated": len(cluster_rows),
+        }
+
+    def _edges(self, graph, id_map, rel):
+        mask = graph.edge_mask(rel)
+        s, s_ok = id_map.lookup(graph.src[mask])
+        d, d_ok = id_map.lookup(graph.dst[mask])
+        keep = s_ok & d_ok
+        return s[keep], d[keep]
+
+
+def _plain(value):
+    """NumPy scalars -> Python values the Bolt driver can serialize."""
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,285 @@
+import asyncio
+import numpy as np
+from app.database import instrumented_session
+from app.metrics import cypher
+
+# Node properties the scoring path actually reads (columns 0-4 of the 45-feature input)
+FEATURE_PROPERTIES = ['avg_min_sent', 'avg_min_rec', 'avg_sent_tnx', 'avg_received_tnx', 'tx_per_min']
+
+NODE_COUNT_QUERY = cypher("extract.node_count", "MATCH (n:Address) RETURN count(n) AS total")
+# Upper bound for Address->Address edges, answered from the counts store
+# (full extractions only; a scoped one must not pay for the whole graph)
+EDGE_COUNT_QUERY = cypher("extract.edge_count", "MATCH (:Address)-[r]->() RETURN count(r) AS total")
+
+# Every Address node, projecting only the columns we need. One label scan,
+# streamed to the client in fetch_size batches (no per-page re-scan)
+NODE_STREAM_QUERY = cypher("extract.node_stream", """
+MATCH (n:Address)
+RETURN id(n) AS id,
+       n.address AS address,
+       n.integrity_risk_score AS score,
+       n.community AS community,
+       n.fused_count AS fused_count,
+       n.cluster_size AS cluster_size,
+       [p IN $props | n[p]] AS features
+""")
+
+# Same stream restricted to an explicit node scope (NodeByIdSeek; incremental runs)
+SCOPED_NODE_STREAM_QUERY = cypher("extract.scoped_node_stream", """
+MATCH (n:Address)
+WHERE id(n) IN $scope
+RETURN id(n) AS id,
+       n.address AS address,
+       n.integrity_risk_score AS score,
+       n.community AS community,
+       n.fused_count AS fused_count,
+       n.cluster_size AS cluster_size,
+       [p IN $props | n[p]] AS features
+""")
+
+# Outgoing edges of one node page (NodeByIdSeek, cost bounded by the page)
+EDGE_PAGE_QUERY = cypher("extract.edge_page", """
+MATCH (a:Address)-[r]->(b:Address)
+WHERE id(a) IN $ids
+RETURN id(a) AS source, id(b) AS target, type(r) AS rel
+""")
+
+# Induced edges of a node page inside a scope
+SCOPED_EDGE_PAGE_QUERY = cypher("extract.scoped_edge_page", """
+MATCH (a:Address)-[r]->(b:Address)
+WHERE id(a) IN $ids AND id(b) IN $scope
+RETURN id(a) AS source, id(b) AS target, type(r) AS rel
+""")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# Initial edge buffer size per scoped node; _grow doubles it when exceeded
+SCOPED_EDGES_PER_NODE = 4
+
+
+def _grow(array, min_size):
+    """Doubles a preallocated buffer when the graph grew mid-extraction."""
+    size = max(min_size, 2 * len(array), 1)
+    grown = np.empty((size,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class ExtractedGraph:
+    """
+    Column-oriented view of the Address graph.
+    Node arrays are aligned by row; edges reference Neo4j internal ids.
+    Missing or non-numeric feature values are NaN.
+    """
+
+    def __init__(self, node_ids, addresses, features, scores, src, dst, edge_types, edge_type_names,
+                 communities=None, fused_counts=None, cluster_sizes=None):
+        self.node_ids = node_ids
+        self.addresses = addresses
+        self.features = features
+        self.scores = scores
+        n = len(node_ids)
+        self.communities = communities if communities is not None else np.full(n, None, dtype=object)
+        self.fused_counts = fused_counts if fused_counts is not None else np.full(n, np.nan)
+        self.cluster_sizes = cluster_sizes if cluster_sizes is not None else np.full(n, np.nan)
+        self.src = src
+        self.dst = dst
+        self.edge_types = edge_types
+        self.edge_type_names = edge_type_names
+        # Prebuilt incoming CSR (indptr, indices) over rows, when the source has one
+        self.csr = None
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.src)
+
+    def edge_mask(self, rel):
+        """Boolean mask of edges whose relationship type is `rel`."""
+        if rel not in self.edge_type_names:
+            return np.zeros(self.num_edges, dtype=bool)
+        return self.edge_types == self.edge_type_names.index(rel)
+
+
+class _GraphBuffers:
+    """
+    Preallocated column buffers of one extraction. Every extract() call
+    builds its own, so concurrent extractions (an analysis run and
+    /explain requests) never share state.
+    """
+
+    def __init__(self, scope, node_cap, edge_cap):
+        self.scope = scope
+        self.node_ids = np.empty(node_cap, dtype=np.int64)
+        self.addresses = np.empty(node_cap, dtype=object)
+        self.features = np.full((node_cap, len(FEATURE_PROPERTIES)), np.nan, dtype=np.float64)
+        self.scores = np.full(node_cap, np.nan, dtype=np.float64)
+        self.communities = np.full(node_cap, None, dtype=object)
+        self.fused_counts = np.full(node_cap, np.nan, dtype=np.float64)
+        self.cluster_sizes = np.full(node_cap, np.nan, dtype=np.float64)
+        self.src = np.empty(edge_cap, dtype=np.int64)
+        self.dst = np.empty(edge_cap, dtype=np.int64)
+        self.edge_types = np.empty(edge_cap, dtype=np.int16)
+        self.type_codes = {}
+        self.n = 0
+        self.e = 0
+
+    def append_node(self, record):
+        i = self.n
+        if i >= len(self.node_ids):
+            self.node_ids = _grow(self.node_ids, i + 1)
+            self.addresses = _grow(self.addresses, i + 1)
+            self.features = _grow(self.features, i + 1)
+            self.scores = _grow(self.scores, i + 1)
+            self.communities = _grow(self.communities, i + 1)
+            self.fused_counts = _grow(self.fused_counts, i + 1)
+            self.cluster_sizes = _grow(self.cluster_sizes, i + 1)
+            self.features[i:] = np.nan
+            self.scores[i:] = np.nan
+            self.communities[i:] = None
+            self.fused_counts[i:] = np.nan
+            self.cluster_sizes[i:] = np.nan
+
+        self.node_ids[i] = record["id"]
+        self.addresses[i] = record["address"]
+        self.scores[i] = _to_float(record["score"])
+        self.communities[i] = record["community"]
+        self.fused_counts[i] = _to_float(record["fused_count"])
+        self.cluster_sizes[i] = _to_float(record["cluster_size"])
+        for j, value in enumerate(record["features"]):
+            self.features[i, j] = _to_float(value)
+        self.n = i + 1
+
+    def append_edge(self, record):
+        k = self.e
+        if k >= len(self.src):
+            self.src = _grow(self.src, k + 1)
+            self.dst = _grow(self.dst, k + 1)
+            self.edge_types = _grow(self.edge_types, k + 1)
+
+        code = self.type_codes.setdefault(record["rel"], len(self.type_codes))
+        self.src[k] = record["source"]
+        self.dst[k] = record["target"]
+        self.edge_types[k] = code
+        self.e = k + 1
+
+    def graph(self):
+        n, e = self.n, self.e
+        names = [None] * len(self.type_codes)
+        for name, code in self.type_codes.items():
+            names[code] = name
+
+        return ExtractedGraph(
+            node_ids=self.node_ids[:n],
+            addresses=self.addresses[:n],
+            features=self.features[:n],
+            scores=self.scores[:n],
+            src=self.src[:e],
+            dst=self.dst[:e],
+            edge_types=self.edge_types[:e],
+            edge_type_names=names,
+            communities=self.communities[:n],
+            fused_counts=self.fused_counts[:n],
+            cluster_sizes=self.cluster_sizes[:n],
+        )
+
+
+class GraphExtractor:
+    """
+    Streams the Address graph out of Neo4j in pages.
+
+    Nodes come from a single streamed query, pulled in `page_size` driver
+    batches, so the label is scanned once whatever the graph size. A
+    second session fetches the outgoing edges of each completed page, so
+    edge transfer overlaps with node streaming. Records are written straight into
+    preallocated NumPy buffers; at most `prefetch` pages are in flight.
+    The extractor itself is stateless, so one instance can serve
+    concurrent extractions.
+    """
+
+    def __init__(self, page_size=5000, prefetch=2, session_factory=None):
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.session_factory = session_factory or instrumented_session
+
+    async def extract(self, scope=None):
+        """
+        Extracts the whole Address graph, or with `scope` (Neo4j ids) only
+        the subgraph induced by those nodes.
+        """
+        scope = None if scope is None else [int(i) for i in scope]
+        if scope is None:
+            async with self.session_factory() as session:
+                node_cap = await self._count(session, NODE_COUNT_QUERY)
+                edge_cap = await self._count(session, EDGE_COUNT_QUERY)
+        else:
+            # Sized by the scope, so /explain and incremental runs stay O(scope)
+            node_cap = len(scope)
+            edge_cap = SCOPED_EDGES_PER_NODE * len(scope)
+
+        # 1. PREALLOCATE BUFFERS (per call)
+        buffers = _GraphBuffers(scope, node_cap, edge_cap)
+
+        # 2. PIPELINE: node pages -> queue -> edge fetcher
+        pages = asyncio.Queue(maxsize=self.prefetch)
+        consumer = asyncio.create_task(self._consume_edges(pages, buffers))
+        try:
+            await self._produce_nodes(pages, consumer, buffers)
+            await self._put(pages, None, consumer)
+            await consumer
+        except BaseException:
+            consumer.cancel()
+            raise
+
+        return buffers.graph()
+
+    async def _count(self, session, query):
+        result = await session.run(query)
+        record = await result.single()
+        return int(record["total"] or 0)
+
+    async def _put(self, pages, item, consumer):
+        """Queue a page, surfacing the edge fetcher's error instead of blocking on it."""
+        put = asyncio.ensure_future(pages.put(item))
+        done, _ = await asyncio.wait({put, consumer}, return_when=asyncio.FIRST_COMPLETED)
+        if put not in done:
+            put.cancel()
+            consumer.result()
+
+    async def _produce_nodes(self, pages, consumer, buffers):
+        async with self.session_factory(fetch_size=self.page_size) as session:
+            if buffers.scope is None:
+                result = await session.run(NODE_STREAM_QUERY, props=FEATURE_PROPERTIES)
+            else:
+                result = await session.run(SCOPED_NODE_STREAM_QUERY, props=FEATURE_PROPERTIES, scope=buffers.scope)
+            # A full queue pauses iteration, and with it the driver's pulls
+            page_start = buffers.n
+            async for record in result:
+                buffers.append_node(record)
+                if buffers.n - page_start == self.page_size:
+                    await self._put(pages, buffers.node_ids[page_start:buffers.n].tolist(), consumer)
+                    page_start = buffers.n
+            if buffers.n > page_start:
+                await self._put(pages, buffers.node_ids[page_start:buffers.n].tolist(), consumer)
+
+    async def _consume_edges(self, pages, buffers):
+        async with self.session_factory() as session:
+            while True:
+                ids = await pages.get()
+                if ids is None:
+                    return
+                if buffers.scope is None:
+                    result = await session.run(EDGE_PAGE_QUERY, ids=ids)
+                else:
+                    result = await session.run(SCOPED_EDGE_PAGE_QUERY, ids=ids, scope=buffers.scope)
+                async for record in result:
+                    buffers.append_edge(record)
@@ -0,0 +1,338 @@
+import asyncio
+import datetime
+import json
+import os
+import shutil
+import numpy as np
+from app.core.graph_builder import DenseIdMap, build_edge_index, build_csr
+from app.graph_extract import ExtractedGraph
+from app.pagination import encode_value, decode_value
+from app.routers.config import settings
+from app.metrics import cypher
+
+# Dirty nodes since the snapshot watermark plus their 1-hop neighbours: the
+# subgraph induced by this set contains every edge touching a dirty node
+SNAPSHOT_DELTA_QUERY = cypher("snapshot.snapshot_delta", """
+MATCH (d:Address)
+WHERE coalesce(d.updated_at, d.last_active) > $since
+OPTIONAL MATCH (d)--(b:Address)
+WITH collect(DISTINCT id(d)) + collect(DISTINCT id(b)) AS ids
+UNWIND ids AS id
+RETURN DISTINCT id
+""")
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+# Memory-mapped column files of one version
+ARRAY_FILES = (
+    "indptr", "indices",                      # incoming CSR over rows (inference adjacency)
+    "edge_src", "edge_dst", "edge_types",     # typed edge list over rows
+    "node_ids", "addresses", "features", "scores", "fused_counts", "cluster_sizes",
+    "keys", "key_rows",                       # address dictionary (sorted)
+)
+
+
+class GraphSnapshot:
+    """
+    Versioned on-disk copy of the Address graph, used as the inference source.
+
+    Each version is a directory of .npy columns. It holds the incoming CSR
+    (indptr/indices) the batch engine reads, the typed edge list, node
+    columns, a sorted address dictionary and a manifest with the version
+    number and the activity watermark it is current up to. CURRENT names
+    the live version and is swapped atomically, so readers never see a
+    half-written snapshot.
+
+    Arrays are opened as read-only memory maps. A refresh reads from Neo4j
+    only the nodes touched since the watermark (with their neighbourhood)
+    and merges them in memory; commit() writes the run's delta, scores and
+    fusion as one next version, on an executor thread.
+    """
+
+    def __init__(self, directory, keep=2):
+        self.directory = directory
+        self.keep = keep
+        self.version = 0
+        self.watermark = None
+        self.graph = None
+        self.refreshes_since_rebuild = 0
+        self._recorded = False
+        # Dictionary of the last persisted version
+        self._keys = self._key_rows = np.array([], dtype=str)
+
+    def _version_dir(self, version):
+        return os.path.join(self.directory, f"v{version:06d}")
+
+    # ---- loading -----------------------------------------------------------
+
+    def load(self):
+        """Maps the CURRENT version. Returns False if there is none."""
+        pointer = os.path.join(self.directory, CURRENT_FILE)
+        if not os.path.exists(pointer):
+            return False
+        with open(pointer) as f:
+            path = os.path.join(self.directory, f.read().strip())
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in ARRAY_FILES if os.path.exists(os.path.join(path, f"{name}.npy"))
+        }
+        # Versions written before a column existed read it as unknown (NaN)
+        for name in ("cluster_sizes",):
+            if name not in arrays:
+                arrays[name] = np.full(len(arrays["node_ids"]), np.nan)
+        with open(os.path.join(path, "communities.json")) as f:
+            values = json.load(f)
+        communities = np.empty(len(values), dtype=object)
+        communities[:] = values
+
+        graph = ExtractedGraph(
+            node_ids=arrays["node_ids"],
+            addresses=arrays["addresses"],
+            features=arrays["features"],
+            scores=arrays["scores"],
+            src=arrays["node_ids"][arrays["edge_src"]],
+            dst=arrays["node_ids"][arrays["edge_dst"]],
+            edge_types=arrays["edge_types"],
+            edge_type_names=manifest["edge_type_names"],
+            communities=communities,
+            fused_counts=arrays["fused_counts"],
+            cluster_sizes=arrays["cluster_sizes"],
+        )
+        graph.csr = (arrays["indptr"], arrays["indices"])
+        self._keys, self._key_rows = arrays["keys"], arrays["key_rows"]
+
+        self.graph = graph
+        self.version = manifest["version"]
+        self.watermark = decode_value(manifest["watermark"])
+        self._recorded = False
+        return True
+
+    def lookup(self, addresses):
+        """Address dictionary: returns (rows, found) for each address."""
+        needles = np.array([str(a).lower() for a in addresses], dtype=str)
+        if self.graph is None or len(self._keys) == 0 or len(needles) == 0:
+            return np.zeros(len(needles), dtype=np.int64), np.zeros(len(needles), dtype=bool)
+        pos = np.minimum(np.searchsorted(self._keys, needles), len(self._keys) - 1)
+        return np.asarray(self._key_rows[pos], dtype=np.int64), self._keys[pos] == needles
+
+    # ---- writing -----------------------------------------------------------
+
+    def save(self, graph, watermark):
+        """Writes `graph` as the next version, points CURRENT at it and maps it."""
+        version = self.version + 1
+        path = self._version_dir(version)
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        # 1. Typed edge list over rows, in CSR (target) order
+        id_map = DenseIdMap(graph.node_ids)
+        s, s_ok = id_map.lookup(graph.src)
+        d, d_ok = id_map.lookup(graph.dst)
+        keep = s_ok & d_ok
+        s, d, types = s[keep], d[keep], np.asarray(graph.edge_types)[keep]
+        order = np.lexsort((s, d))
+
+        # 2. Inference adjacency: the same edge_index the extractor path builds
+        edge_index = build_edge_index(id_map, graph.src, graph.dst, dedupe=settings.EDGE_DEDUPE)
+        indptr, indices = build_csr(edge_index, graph.num_nodes)
+
+        # 3. Address dictionary
+        addresses = np.array([str(a).lower() for a in graph.addresses], dtype=str)
+        key_order = np.argsort(addresses, kind="stable")
+
+        columns = {
+            "indptr": indptr,
+            "indices": indices,
+            "edge_src": s[order],
+            "edge_dst": d[order],
+            "edge_types": types[order].astype(np.int16),
+            "node_ids": np.asarray(graph.node_ids, dtype=np.int64),
+            "addresses": np.asarray(graph.addresses).astype(str),
+            "features": np.asarray(graph.features, dtype=np.float32),
+            "scores": np.asarray(graph.scores, dtype=np.float64),
+            "fused_counts": np.asarray(graph.fused_counts, dtype=np.float64),
+            "cluster_sizes": np.asarray(graph.cluster_sizes, dtype=np.float64),
+            "keys": addresses[key_order],
+            "key_rows": key_order.astype(np.int64),
+        }
+        for name, array in columns.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), array)
+        with open(os.path.join(tmp, "communities.json"), "w") as f:
+            json.dump([_plain(c) for c in graph.communities], f)
+        with open(os.path.join(tmp, MANIFEST_FILE), "w") as f:
+            json.dump({
+                "version": version,
+                "watermark": encode_value(watermark),
+                "nodes": int(graph.num_nodes),
+                "edges": int(len(s)),
+                "edge_type_names": list(graph.edge_type_names),
+                "created_at": datetime.datetime.utcnow().isoformat() + "Z",
+            }, f)
+
+        # 4. Publish atomically, then drop versions beyond `keep`
+        os.replace(tmp, path)
+        pointer = os.path.join(self.directory, CURRENT_FILE)
+        with open(pointer + ".tmp", "w") as f:
+            f.write(os.path.basename(path))
+        os.replace(pointer + ".tmp", pointer)
+        self._prune(version)
+
+        self.load()
+        print(f"[*] Graph snapshot v{version}: {graph.num_nodes} nodes / {len(s)} edges.")
+        return version
+
+    def _prune(self, current):
+        for name in os.listdir(self.directory):
+            if name.startswith("v") and name[1:].isdigit() and int(name[1:]) <= current - self.keep:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    # ---- deltas ------------------------------------------------------------
+
+    async def refresh(self, session, extractor, watermark):
+        """
+        Brings the in-memory snapshot up to `watermark` and returns the
+        graph to score. Nothing is written here; commit() persists it.
+
+        Without a snapshot (or after GRAPH_SNAPSHOT_REBUILD_EVERY applied
+        deltas, to pick up deletions the watermark cannot see) the whole
+        graph is extracted. Otherwise only the delta subgraph is read from
+        Neo4j.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if self.graph is None and not self.load():
+            return await self._rebuild(extractor, watermark), "rebuild"
+        if self.watermark is None or self.refreshes_since_rebuild >= settings.GRAPH_SNAPSHOT_REBUILD_EVERY:
+            return await self._rebuild(extractor, watermark), "rebuild"
+        if watermark is None or watermark == self.watermark:
+            return self.graph, "current"
+
+        result = await session.run(SNAPSHOT_DELTA_QUERY, since=self.watermark)
+        scope = [record["id"] async for record in result]
+        if scope:
+            delta = await extractor.extract(scope=scope)
+            self.graph = merge_graphs(self.graph, delta)
+            self.refreshes_since_rebuild += 1
+            self._recorded = True
+        # An empty delta only moves the watermark; not worth a version on its own
+        self.watermark = watermark
+        return self.graph, f"delta:{len(scope)}"
+
+    async def _rebuild(self, extractor, watermark):
+        self.graph = await extractor.extract()
+        self.watermark = watermark
+        self.refreshes_since_rebuild = 0
+        self._recorded = True
+        return self.graph
+
+    def record_scores(self, node_ids, scores):
+        """Mirrors scores written to Neo4j into the in-memory snapshot."""
+        rows, found = DenseIdMap(self.graph.node_ids).lookup(node_ids)
+        updated = np.array(self.graph.scores, dtype=np.float64)
+        updated[rows[found]] = np.asarray(scores, dtype=np.float64)[found]
+        self.graph.scores = updated
+        self._recorded = True
+
+    def record_fusion(self, graph, plan):
+        """Mirrors a FusionPlan applied to `graph` (any subgraph) into the snapshot."""
+        snap = self.graph
+        id_map = DenseIdMap(snap.node_ids)
+
+        # 1. Node columns: inherited communities, proxy counts, cluster sizes
+        rows, found = id_map.lookup(graph.node_ids[plan.inherited])
+        communities = np.array(snap.communities, dtype=object)
+        communities[rows[found]] = plan.labels[plan.codes[plan.inherited]][found]
+        proxy_rows, counts = plan.counts
+        rows, found = id_map.lookup(graph.node_ids[proxy_rows])
+        fused_counts = np.array(snap.fused_counts, dtype=np.float64)
+        fused_counts[rows[found]] = counts[found]
+        size_rows, sizes = plan.sizes
+        rows, found = id_map.lookup(graph.node_ids[size_rows])
+        cluster_sizes = np.array(snap.cluster_sizes, dtype=np.float64)
+        cluster_sizes[rows[found]] = sizes[found]
+        snap.communities, snap.fused_counts, snap.cluster_sizes = communities, fused_counts, cluster_sizes
+        self._recorded = True
+
+        # 2. FUSED_TO edges removed / added
+        if plan.delete.shape[1] == 0 and plan.create.shape[1] == 0:
+            return
+        names = list(snap.edge_type_names)
+        if "FUSED_TO" not in names:
+            names.append("FUSED_TO")
+        fused = names.index("FUSED_TO")
+
+        gone = set(zip(graph.node_ids[plan.delete[0]].tolist(), graph.node_ids[plan.delete[1]].tolist()))
+        src, dst, types = np.asarray(snap.src), np.asarray(snap.dst), np.asarray(snap.edge_types)
+        keep = np.ones(len(src), dtype=bool)
+        if gone:
+            candidates = np.flatnonzero(types == fused)
+            keep[candidates] = [(a, b) not in gone for a, b in zip(src[candidates].tolist(), dst[candidates].tolist())]
+
+        snap.src = np.concatenate([src[keep], graph.node_ids[plan.create[0]]])
+        snap.dst = np.concatenate([dst[keep], graph.node_ids[plan.create[1]]])
+        snap.edge_types = np.concatenate([types[keep], np.full(plan.create.shape[1], fused, dtype=types.dtype)])
+        snap.edge_type_names = names
+
+    async def commit(self, executor=None):
+        """
+        Persists the run (applied delta, recorded write-back and fusion) as
+        one new version on `executor`, so the event loop keeps serving
+        during the write. No-op when nothing changed. Returns the version.
+        """
+        if self.graph is None or not self._recorded:
+            return self.version
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.save, self.graph, self.watermark)
+
+
+def merge_graphs(base, delta):
+    """
+    Overlays `delta` (an induced subgraph re-read from Neo4j) onto `base`:
+    node columns of delta nodes are replaced or appended, and every base
+    edge with both endpoints inside delta is replaced by delta's edges.
+    """
+    base_map = DenseIdMap(base.node_ids)
+    rows, found = base_map.lookup(delta.node_ids)
+
+    def merge(column, fill):
+        merged = np.concatenate([np.asarray(column), np.asarray(fill)[~found]])
+        merged[rows[found]] = np.asarray(fill)[found]
+        return merged
+
+    node_ids = np.concatenate([np.asarray(base.node_ids), np.asarray(delta.node_ids)[~found]])
+    features = np.vstack([np.asarray(base.features, dtype=np.float64), np.asarray(delta.features)[~found]])
+    features[rows[found]] = np.asarray(delta.features)[found]
+
+    # Edge types are re-coded into one shared name list
+    names = list(base.edge_type_names)
+    for name in delta.edge_type_names:
+        if name not in names:
+            names.append(name)
+    recode = np.array([names.index(n) for n in delta.edge_type_names] or [0], dtype=np.int16)
+
+    delta_map = DenseIdMap(delta.node_ids)
+    _, src_in = delta_map.lookup(base.src)
+    _, dst_in = delta_map.lookup(base.dst)
+    keep = ~(src_in & dst_in)
+
+    return ExtractedGraph(
+        node_ids=node_ids,
+        addresses=merge(np.asarray(base.addresses, dtype=object), np.asarray(delta.addresses, dtype=object)),
+        features=features,
+        scores=merge(np.asarray(base.scores, dtype=np.float64), delta.scores),
+        src=np.concatenate([np.asarray(base.src)[keep], delta.src]),
+        dst=np.concatenate([np.asarray(base.dst)[keep], delta.dst]),
+        edge_types=np.concatenate([np.asarray(base.edge_types, dtype=np.int16)[keep], recode[np.asarray(delta.edge_types, dtype=np.int64)]]),
+        edge_type_names=names,
+        communities=merge(np.asarray(base.communities, dtype=object), np.asarray(delta.communities, dtype=object)),
+        fused_counts=merge(np.asarray(base.fused_counts, dtype=np.float64), delta.fused_counts),
+        cluster_sizes=merge(np.asarray(base.cluster_sizes, dtype=np.float64), delta.cluster_sizes),
+    )
+
+
+def _plain(value):
+    """NumPy scalars -> JSON-serializable Python values."""
+    return value.item() if isinstance(value, np.generic) else value
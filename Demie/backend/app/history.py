@@ -0,0 +1,102 @@
+import heapq
+from app.pagination import encode_cursor, decode_cursor
+from app.metrics import cypher
+
+DIRECTIONS = ("both", "out", "in")
+
+# One direction of an address's SENT transfers, newest first. The
+# endpoint addresses are denormalized onto the relationship so the
+# (from_address|to_address, timestamp) composite indexes serve the seek
+# and the order: a page reads `limit` entries whatever the degree.
+_PAGE_QUERY = cypher("history.page", """
+MATCH (a:Address)-[r:SENT]->(b:Address)
+WHERE {conditions}
+RETURN
+    '{label}' AS type,
+    {counterparty}.address AS counterparty,
+    r.amount AS amount,
+    r.timestamp AS timestamp,
+    coalesce(r.tx_hash, elementId(r)) AS tx_id
+ORDER BY r.timestamp DESC, tx_id DESC
+LIMIT $fetch
+""")
+
+# Fills the denormalized endpoint properties (ingest batches, migration backfill).
+# Contract for SENT writers: set from_address/to_address (lowercased
+# endpoint addresses) and timestamp when creating the relationship, or
+# list the batch's addresses in the /ingest/complete body. Until then
+# the transfer is missing from /address/{address}/history.
+DENORMALIZE_QUERY = cypher("history.denormalize", """
+MATCH (a:Address)-[r:SENT]-(b:Address)
+WHERE a.address IN $addresses AND (r.from_address IS NULL OR r.to_address IS NULL)
+WITH DISTINCT r
+SET r.from_address = startNode(r).address, r.to_address = endNode(r).address
+""")
+
+# SENT relationships the history indexes cannot serve (one relationship scan)
+UNINDEXED_QUERY = cypher("history.unindexed", """
+MATCH ()-[r:SENT]->()
+WHERE r.from_address IS NULL OR r.to_address IS NULL OR r.timestamp IS NULL
+RETURN
+    count(CASE WHEN r.from_address IS NULL OR r.to_address IS NULL THEN 1 END) AS missing_endpoints,
+    count(CASE WHEN r.timestamp IS NULL THEN 1 END) AS missing_timestamp
+""")
+
+
+class HistoryPage:
+    """
+    One keyset page of an address's transfers ordered by (timestamp, tx id)
+    descending. direction "out" lists SENT, "in" RECEIVED, "both" merges
+    the two index-ordered streams. Transfers without a timestamp are not
+    indexed and are not listed.
+    """
+
+    def __init__(self, address, direction="both", counterparty=None, cursor=None, limit=25):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        self.address = address.lower()
+        self.direction = direction
+        self.counterparty = counterparty.lower() if counterparty else None
+        self.after = decode_cursor(cursor, 2) if cursor else None
+        self.limit = limit
+
+    def queries(self):
+        """(query, params) per direction to read; each returns at most limit + 1 rows."""
+        wanted = ("out", "in") if self.direction == "both" else (self.direction,)
+        return [self._query(direction) for direction in wanted]
+
+    def _query(self, direction):
+        own, other = ("from_address", "to_address") if direction == "out" else ("to_address", "from_address")
+        conditions = [f"r.{own} = $addr", "r.timestamp IS NOT NULL"]
+        params = {"addr": self.address, "fetch": self.limit + 1}
+        if self.counterparty:
+            conditions.append(f"r.{other} = $counterparty")
+            params["counterparty"] = self.counterparty
+        if self.after is not None:
+            conditions.append(
+                "(r.timestamp < $after_ts OR (r.timestamp = $after_ts AND coalesce(r.tx_hash, elementId(r)) < $after_tx))"
+            )
+            params["after_ts"], params["after_tx"] = self.after
+        query = (
+            _PAGE_QUERY.replace("{conditions}", "\n  AND ".join(conditions))
+            .replace("{label}", "SENT" if direction == "out" else "RECEIVED")
+            .replace("{counterparty}", "b" if direction == "out" else "a")
+        )
+        return cypher(f"{_PAGE_QUERY.name}_{direction}", query), params
+
+    def shape(self, streams):
+        """Merges the per-direction results (each already newest first) into one page."""
+        key = lambda r: (r["timestamp"], r["tx_id"])
+        merged = []
+        seen = set()
+        for record in heapq.merge(*streams, key=key, reverse=True):
+            # A self-transfer is in both directions; list it once (as SENT)
+            if record["tx_id"] in seen:
+                continue
+            seen.add(record["tx_id"])
+            merged.append(record)
+        items = merged[:self.limit]
+        next_cursor = None
+        if len(merged) > self.limit and items:
+            next_cursor = encode_cursor(items[-1]["timestamp"], items[-1]["tx_id"])
+        return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,122 @@
+from app.routers.config import settings
+from app.metrics import cypher
+
+# Activity watermark: the newest update/activity stamp on any Address
+WATERMARK_QUERY = cypher("incremental.watermark", """
+MATCH (n:Address)
+RETURN max(coalesce(n.updated_at, n.last_active)) AS watermark
+""")
+
+DIRTY_SINCE_QUERY = cypher("incremental.dirty_since", """
+MATCH (n:Address)
+WHERE coalesce(n.updated_at, n.last_active) > $since
+RETURN id(n) AS id
+""")
+
+DIRTY_BY_ADDRESS_QUERY = cypher("incremental.dirty_by_address", """
+MATCH (n:Address)
+WHERE n.address IN $addresses
+RETURN id(n) AS id
+""")
+
+# Nodes whose score can change: anything within `hops` of a dirty node
+AFFECTED_QUERY = cypher("incremental.affected", """
+MATCH (d:Address)
+WHERE id(d) IN $ids
+MATCH (d)-[*0..%d]-(a:Address)
+RETURN DISTINCT id(a) AS id
+""")
+
+# Everything an affected node reads from: its incoming `hops`-hop field
+RECEPTIVE_FIELD_QUERY = cypher("incremental.receptive_field", """
+MATCH (a:Address)
+WHERE id(a) IN $ids
+MATCH (r:Address)-[*0..%d]->(a)
+RETURN DISTINCT id(r) AS id
+""")
+
+# Nodes identity fusion must see around the affected set: SENT neighbours
+# (community inheritance) and current FUSED_TO targets ...
+FUSION_SEEDS_QUERY = cypher("incremental.fusion_seeds", """
+MATCH (a:Address)
+WHERE id(a) IN $ids
+OPTIONAL MATCH (a)-[:SENT|FUSED_TO]-(b:Address)
+WITH collect(DISTINCT a) + collect(DISTINCT b) AS seeds
+UNWIND seeds AS s
+RETURN DISTINCT id(s) AS id, s.community AS community
+""")
+
+# ... plus every member of the communities involved (proxy selection),
+# one seek on the address_community index for all of them
+COMMUNITY_MEMBERS_QUERY = cypher("incremental.community_members", """
+MATCH (m:Address)
+WHERE m.community IN $communities
+RETURN id(m) AS id
+""")
+
+
+class IncrementalPlanner:
+    """
+    Plans an incremental GATv2 pass.
+
+    A change to a node can only move scores within `hops` of it (one hop
+    per GATv2Conv layer), so only that neighbourhood is re-scored. To
+    score it exactly, inference runs on the subgraph induced by the
+    incoming `hops`-hop receptive field of the affected nodes.
+    """
+
+    def __init__(self, hops=2):
+        self.hops = hops
+        self.watermark = None
+        self.runs_since_full = 0
+
+    def needs_full_run(self, explicit=False):
+        """
+        Periodic reconciliation: every Nth incremental request runs the full
+        graph. Watermark-driven runs also need one full pass to start from.
+        """
+        if not explicit and self.watermark is None:
+            return True
+        return self.runs_since_full >= settings.INCREMENTAL_FULL_EVERY
+
+    async def read_watermark(self, session):
+        result = await session.run(WATERMARK_QUERY)
+        record = await result.single()
+        return record["watermark"] if record else None
+
+    async def dirty_ids(self, session, addresses=None):
+        """Dirty nodes from an explicit address list, or everything past the watermark."""
+        if addresses:
+            result = await session.run(DIRTY_BY_ADDRESS_QUERY, addresses=[a.lower() for a in addresses])
+        else:
+            result = await session.run(DIRTY_SINCE_QUERY, since=self.watermark)
+        return [record["id"] async for record in result]
+
+    async def plan(self, session, dirty):
+        """Returns (affected_ids, receptive_field_ids) for a list of dirty node ids."""
+        if not dirty:
+            return [], []
+
+        result = await session.run(cypher(AFFECTED_QUERY.name, AFFECTED_QUERY % self.hops), ids=list(dirty))
+        affected = [record["id"] async for record in result]
+
+        field = await self.receptive_field(session, affected)
+        return affected, field
+
+    async def receptive_field(self, session, ids):
+        """Node ids of the incoming `hops`-hop receptive field of `ids`."""
+        result = await session.run(cypher(RECEPTIVE_FIELD_QUERY.name, RECEPTIVE_FIELD_QUERY % self.hops), ids=list(ids))
+        return [record["id"] async for record in result]
+
+    async def fusion_scope(self, session, affected):
+        """Node ids identity fusion needs to see to re-fuse the affected nodes."""
+        if not affected:
+            return []
+        result = await session.run(FUSION_SEEDS_QUERY, ids=list(affected))
+        seeds = await result.data()
+        scope = {record["id"] for record in seeds}
+        communities = sorted({record["community"] for record in seeds if record["community"] is not None})
+        if communities:
+            result = await session.run(COMMUNITY_MEMBERS_QUERY, communities=communities)
+            scope.update([record["id"] async for record in result])
+        return sorted(scope)
@@ -0,0 +1,143 @@
+import asyncio
+import datetime
+import time
+import uuid
+from collections import OrderedDict
+
+
+class AnalysisJob:
+    """State of one queued/running GATv2 analysis, as exposed by the job API."""
+
+    def __init__(self, mode="full", addresses=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.mode = mode
+        self.addresses = sorted(set(addresses)) if addresses else None
+        self.status = "QUEUED"
+        self.stage = None
+        self.stages = []
+        self.summary = None
+        self.error = None
+        self.created_at = datetime.datetime.utcnow().isoformat() + "Z"
+        self.started_at = None
+        self.finished_at = None
+        self._t0 = None
+        self._t_end = None
+        self._stage_t0 = None
+
+    def covers(self, mode, addresses):
+        """True if running this job also satisfies a request for (mode, addresses)."""
+        if self.mode == "full":
+            return True
+        wanted = sorted(set(addresses)) if addresses else None
+        return self.mode == mode and self.addresses == wanted
+
+    def absorb(self, mode, addresses):
+        """Widens a pending job so it also satisfies another request."""
+        if self.covers(mode, addresses):
+            return
+        if mode == "incremental" and addresses and self.addresses:
+            self.addresses = sorted(set(self.addresses) | set(addresses))
+        else:
+            # Mixed scopes: one full pass satisfies every request
+            self.mode = "full"
+            self.addresses = None
+
+    def enter_stage(self, name):
+        """Progress callback: closes the current stage and opens `name`."""
+        now = time.perf_counter()
+        if self.stages and self.stages[-1]["duration_ms"] is None:
+            self.stages[-1]["duration_ms"] = round((now - self._stage_t0) * 1000, 1)
+        if name is not None:
+            self.stages.append({"name": name, "duration_ms": None})
+        self.stage = name
+        self._stage_t0 = now
+
+    def to_dict(self):
+        elapsed = None
+        if self._t0 is not None:
+            end = self._t_end if self.finished_at else time.perf_counter()
+            elapsed = round((end - self._t0) * 1000, 1)
+        return {
+            "job_id": self.id,
+            "mode": self.mode,
+            "addresses": self.addresses,
+            "status": self.status,
+            "stage": self.stage,
+            "stages": self.stages,
+            "elapsed_ms": elapsed,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "summary": self.summary,
+            "error": self.error,
+        }
+
+
+class AnalysisJobManager:
+    """
+    Runs analyses in the background, one at a time.
+
+    Requests that arrive while a job is running either join it (when it
+    already covers them) or fold into a single pending follow-up job, so
+    bursts of triggers never stack duplicate full-graph passes.
+    `runner(job)` is a coroutine returning the job summary.
+    """
+
+    def __init__(self, runner, history=50):
+        self.runner = runner
+        self.history = history
+        self.jobs = OrderedDict()
+        self._running = None
+        self._pending = None
+        self._task = None
+
+    def submit(self, mode="full", addresses=None):
+        """Returns (job, coalesced)."""
+        if self._running and self._running.covers(mode, addresses):
+            return self._running, True
+        if self._pending:
+            self._pending.absorb(mode, addresses)
+            return self._pending, True
+
+        job = AnalysisJob(mode, addresses)
+        self._remember(job)
+        if self._running:
+            self._pending = job
+        else:
+            self._start(job)
+        return job, False
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def recent(self):
+        return [job.to_dict() for job in reversed(self.jobs.values())]
+
+    def _remember(self, job):
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.history:
+            self.jobs.popitem(last=False)
+
+    def _start(self, job):
+        self._running = job
+        self._task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job):
+        job.status = "RUNNING"
+        job.started_at = datetime.datetime.utcnow().isoformat() + "Z"
+        job._t0 = time.perf_counter()
+        try:
+            job.summary = await self.runner(job)
+            job.status = "COMPLETED"
+        except Exception as e:
+            print(f"Inference Error: {e}")
+            job.status = "FAILED"
+            job.error = str(e)
+        finally:
+            job.enter_stage(None)
+            job._t_end = time.perf_counter()
+            job.finished_at = datetime.datetime.utcnow().isoformat() + "Z"
+            self._running = None
+            if self._pending:
+                pending, self._pending = self._pending, None
+                self._start(pending)
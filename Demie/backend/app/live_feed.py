@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+
+def format_event(event):
+    """Serializes one broadcaster event as a Server-Sent Events frame."""
+    payload = json.dumps(event, default=str)
+    return f"event: {event['type']}\nid: {event['version']}\ndata: {payload}\n\n"
+
+
+class LiveFeedBroadcaster:
+    """
+    Push channel for the dashboard live feed.
+
+    A single producer task wakes up when the data version moves (analysis
+    run or signalled ingest), reads the live feed once from the
+    materialized aggregates and sends only what changed to every
+    subscriber:
+
+        snapshot  {entries}                       on subscribe / resync
+        diff      {upserts, removed, order}       after each change
+
+    Every subscriber owns a bounded queue. A client that falls behind
+    never blocks the producer: when its queue is full the backlog is
+    dropped and replaced by one fresh snapshot.
+    """
+
+    def __init__(self, aggregates, queue_size=16):
+        self.aggregates = aggregates
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.entries = {}
+        self.order = []
+        self.version = None
+        self.published = 0
+        self.resyncs = 0
+        self._changed = None
+        self._task = None
+
+    def start(self):
+        """Starts the producer task (lazily, on the first subscriber)."""
+        if self._task is None or self._task.done():
+            self._changed = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            # Load the current feed so new subscribers get a snapshot
+            self._changed.set()
+
+    async def stop(self):
+        """Stops the producer and ends every open stream (app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._changed = None
+        for queue in list(self.subscribers):
+            # None tells the stream to finish
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        self.subscribers.clear()
+
+    def notify(self, version=None):
+        """Data version listener: wakes the producer (no-op until started)."""
+        if self._changed is not None:
+            self._changed.set()
+
+    def subscribe(self):
+        self.start()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.version is not None:
+            queue.put_nowait(self.snapshot())
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def snapshot(self):
+        return {
+            "type": "snapshot",
+            "version": self.version,
+            "entries": [self.entries[a] for a in self.order],
+        }
+
+    def diff(self, feed, version):
+        """Applies `feed` as the new state; returns the diff event (None if unchanged)."""
+        entries = {e["address"]: e for e in feed}
+        order = [e["address"] for e in feed]
+        upserts = [e for e in feed if self.entries.get(e["address"]) != e]
+        removed = [a for a in self.order if a not in entries]
+        first, reordered = self.version is None, order != self.order
+        self.entries, self.order, self.version = entries, order, version
+        if first:
+            return self.snapshot()
+        if not upserts and not removed and not reordered:
+            return None
+        return {"type": "diff", "version": version, "upserts": upserts, "removed": removed, "order": order}
+
+    def publish(self, feed, version):
+        event = self.diff(feed, version)
+        if event is None:
+            return 0
+        for queue in list(self.subscribers):
+            self._offer(queue, event)
+        self.published += 1
+        return len(self.subscribers)
+
+    def _offer(self, queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop its backlog and resync it with one snapshot
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(self.snapshot())
+            self.resyncs += 1
+
+    async def _run(self):
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            try:
+                data = await self.aggregates.get()
+                self.publish(data["live_feed"], self.aggregates.version)
+            except Exception as e:
+                print(f"[!] Live feed producer error: {e}")
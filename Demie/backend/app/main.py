@@ -1,8 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import auth, forensics 
+from app.routers.config import settings
+from app.compression import CompressionMiddleware
+from app.conditional import ConditionalGetMiddleware, data_version_parts
+from app.data_version import data_version
+from app.metrics import MetricsMiddleware, registry, CONTENT_TYPE
+from app.database import driver
+from app.schema import bootstrap_schema
 
-app = FastAPI(title="DeMIE Forensic Engine")
+@asynccontextmanager
+async def lifespan(app):
+    # Idempotent: creates missing constraints/indexes, records versions
+    if settings.SCHEMA_BOOTSTRAP_ON_STARTUP:
+        await bootstrap_schema(driver)
+    yield
+    # End the live feed producer and its open streams, then release the pool
+    await forensics.live_feed.stop()
+    await driver.close()
+
+app = FastAPI(title="DeMIE Forensic Engine", lifespan=lifespan)
+
+# Conditional GET: unchanged data version -> 304 without touching Neo4j.
+# The graph also depends on whether the LOD projection for it is built yet.
+app.add_middleware(
+    ConditionalGetMiddleware,
+    routes={
+        "/api/stats": data_version_parts,
+        "/api/analytics/forensics": data_version_parts,
+        "/api/clusters": data_version_parts,
+        "/api/network/graph": lambda: (data_version.current(), forensics.predictor.projection.version or 0),
+    },
+    cache_control=settings.CONDITIONAL_CACHE_CONTROL,
+)
 
 # --- CORS CONFIGURATION ---
 origins = ["http://localhost:3000", "http://localhost:5173"]
@@ -15,10 +47,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Large graph/cluster payloads: brotli or gzip, whichever the client accepts
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    compresslevel=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
+# Outermost, so latency includes compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+
 # CENTRALIZED PREFIXING (Crucial for fixing 404s)
 app.include_router(auth.router, prefix="/api")
 app.include_router(forensics.router, prefix="/api")
 
 @app.get("/")
 async def root():
-    return {"status": "DeMIE Backend Online"}
\ No newline at end of file
+    return {"status": "DeMIE Backend Online"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: route latency, Cypher timing, pool usage."""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
\ No newline at end of file
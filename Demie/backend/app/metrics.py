@@ -0,0 +1,439 @@
+import bisect
+import hashlib
+import re
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached polls (sub-ms) up to full analysis triggers
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+# Statements with interpolated literals must not explode label cardinality
+MAX_STATEMENTS = 500
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A named family of samples, one per label-value tuple."""
+
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, *labels, value):
+        self.values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; observe() is one bisect and three adds."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels, value):
+        series = self.values.get(labels)
+        if series is None:
+            # [per-bucket counts (+Inf last), sum, count]
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = (("le", _number(bound)),)
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process metric families rendered in the Prometheus text format.
+    Updates are plain dict arithmetic on the event loop thread (no locks),
+    so instrumentation stays cheap enough to leave on. Collectors run at
+    scrape time for values that are sampled rather than counted.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector):
+        """Registers `collector()`, called before every render."""
+        self.collectors.append(collector)
+
+    def render(self):
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"[!] Metrics collector failed: {e}")
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route"))
+REQUESTS = registry.counter(
+    "http_requests_total", "Completed requests by route and status class.", ("method", "route", "status"))
+REQUEST_ERRORS = registry.counter(
+    "http_request_errors_total", "Requests answered 5xx or raising.", ("method", "route"))
+IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requests currently being served (route is unknown until routed).", ("method",))
+
+QUERY_LATENCY = registry.histogram(
+    "neo4j_query_duration_seconds", "Cypher statement time from run() to fully read result.", ("statement",))
+QUERY_ROWS = registry.histogram(
+    "neo4j_query_rows", "Rows returned per Cypher statement execution.", ("statement",), ROW_BUCKETS)
+QUERY_ERRORS = registry.counter(
+    "neo4j_query_errors_total", "Cypher statements that raised.", ("statement",))
+QUERY_INFO = registry.gauge(
+    "neo4j_query_info", "Statement label to Cypher text (truncated).", ("statement", "query"))
+
+POOL_CONNECTIONS = registry.gauge(
+    "neo4j_pool_connections", "Driver pool connections by state.", ("state",))
+POOL_MAX = registry.gauge(
+    "neo4j_pool_max_size", "Configured maximum driver pool size.")
+
+
+# `observer(name, query, parameters, seconds, rows)` after every recorded statement
+QUERY_OBSERVERS = []
+
+
+class NamedQuery(str):
+    """Cypher text carrying a stable name (the metrics/slow-log label)."""
+
+    def __new__(cls, name, text):
+        query = super().__new__(cls, text)
+        query.name = name
+        return query
+
+
+def cypher(name, text):
+    """Names a statement: `QUERY = cypher("module.purpose", \"\"\"...\"\"\")`."""
+    return NamedQuery(name, text)
+
+
+def statement_label(query):
+    """
+    Stable, low-cardinality label of a Cypher statement: its cypher() name,
+    else a fingerprint of its whitespace-normalized text (the text itself
+    is in neo4j_query_info).
+    """
+    text = re.sub(r"\s+", " ", query).strip()
+    label = getattr(query, "name", None) or "q_" + hashlib.sha1(text.encode()).hexdigest()[:10]
+    if (label,) not in QUERY_LATENCY.values and len(QUERY_LATENCY.values) >= MAX_STATEMENTS:
+        return "other"
+    if (label, text[:120]) not in QUERY_INFO.values:
+        QUERY_INFO.set(label, text[:120], value=1)
+    return label
+
+
+class InstrumentedResult:
+    """
+    Result proxy that records the statement once it has been read to the
+    end (data/single/consume or iteration). Results that are never read
+    (fire-and-forget writes) are consumed and recorded by their session
+    before its next statement or on close. Anything else is delegated.
+    """
+
+    def __init__(self, result, label, started, query=None, parameters=None):
+        self._result = result
+        self._label = label
+        self._started = started
+        self._query = query
+        self._parameters = parameters
+        self._rows = 0
+        self._done = False
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def _finish(self, rows):
+        if not self._done:
+            self._done = True
+            elapsed = time.perf_counter() - self._started
+            QUERY_LATENCY.observe(self._label, value=elapsed)
+            QUERY_ROWS.observe(self._label, value=rows)
+            for observer in QUERY_OBSERVERS:
+                observer(self._label, self._query, self._parameters, elapsed, rows)
+
+    async def data(self, *keys):
+        records = await self._result.data(*keys)
+        self._finish(len(records))
+        return records
+
+    async def single(self, *args, **kwargs):
+        record = await self._result.single(*args, **kwargs)
+        self._finish(0 if record is None else 1)
+        return record
+
+    async def consume(self):
+        try:
+            summary = await self._result.consume()
+        except Exception:
+            if not self._done:
+                self._done = True
+                QUERY_ERRORS.inc(self._label)
+            raise
+        self._finish(self._rows)
+        return summary
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        async for record in self._result:
+            self._rows += 1
+            yield record
+        self._finish(self._rows)
+
+
+async def timed_run(target, query, parameters, kwargs):
+    label = statement_label(query)
+    started = time.perf_counter()
+    try:
+        result = await target.run(query, parameters, **kwargs)
+    except Exception:
+        QUERY_ERRORS.inc(label)
+        raise
+    return InstrumentedResult(result, label, started, query, dict(parameters or {}, **kwargs))
+
+
+async def settle(results):
+    """
+    Consumes the results in `results` that were run but not read to the
+    end, so they are recorded too. The driver would discard them at the
+    same point (next statement, commit or close).
+    """
+    pending = [result for result in results if not result._done]
+    results.clear()
+    for result in pending:
+        await result.consume()
+
+
+class InstrumentedTransaction:
+    """Managed-transaction proxy (execute_read/execute_write work functions)."""
+
+    def __init__(self, tx):
+        self._tx = tx
+        self._results = []
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+    async def run(self, query, parameters=None, **kwargs):
+        await settle(self._results)
+        result = await timed_run(self._tx, query, parameters, kwargs)
+        self._results.append(result)
+        return result
+
+
+def _instrumented_work(work):
+    async def run_work(tx, *args, **kwargs):
+        instrumented = InstrumentedTransaction(tx)
+        value = await work(instrumented, *args, **kwargs)
+        await settle(instrumented._results)
+        return value
+    return run_work
+
+
+class InstrumentedSession:
+    """Session proxy timing every run(), including inside managed transactions."""
+
+    def __init__(self, session):
+        self._session = session
+        self._results = []
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def __aenter__(self):
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        if exc[0] is None:
+            try:
+                await settle(self._results)
+            except BaseException:
+                await self._session.close()
+                raise
+        return await self._session.__aexit__(*exc)
+
+    async def close(self):
+        try:
+            await settle(self._results)
+        finally:
+            await self._session.close()
+
+    async def run(self, query, parameters=None, **kwargs):
+        await settle(self._results)
+        result = await timed_run(self._session, query, parameters, kwargs)
+        self._results.append(result)
+        return result
+
+    async def execute_read(self, work, *args, **kwargs):
+        await settle(self._results)
+        return await self._session.execute_read(_instrumented_work(work), *args, **kwargs)
+
+    async def execute_write(self, work, *args, **kwargs):
+        await settle(self._results)
+        return await self._session.execute_write(_instrumented_work(work), *args, **kwargs)
+
+
+def pool_collector(driver):
+    """
+    Scrape-time sampler of the driver's connection pool. Reads driver
+    internals (there is no public pool API), so it degrades to nothing
+    rather than failing the scrape if they change.
+    """
+
+    def collect():
+        pool = getattr(driver, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return
+        in_use = idle = 0
+        for queue in list(connections.values()):
+            for connection in list(queue):
+                if getattr(connection, "in_use", False):
+                    in_use += 1
+                else:
+                    idle += 1
+        reserved = sum(getattr(pool, "connections_reservations", {}).values())
+        POOL_CONNECTIONS.set("in_use", value=in_use)
+        POOL_CONNECTIONS.set("idle", value=idle)
+        POOL_CONNECTIONS.set("opening", value=reserved)
+        POOL_MAX.set(value=pool.pool_config.max_connection_pool_size)
+
+    return collect
+
+
+def route_template(scope):
+    """
+    Path template of the matched route, router prefix included. Included
+    routers keep the prefix out of route.path, so it is recovered from the
+    concrete path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    try:
+        concrete = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    if concrete and path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, in-flight count and status per
+    route template (`/api/address/{address}/history`, not the raw path).
+    Unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+        IN_FLIGHT.inc(method)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status[0] = 500
+            raise
+        finally:
+            IN_FLIGHT.dec(method)
+            route = route_template(scope)
+            REQUEST_LATENCY.observe(method, route, value=time.perf_counter() - started)
+            REQUESTS.inc(method, route, f"{status[0] // 100}xx")
+            if status[0] >= 500:
+                REQUEST_ERRORS.inc(method, route)
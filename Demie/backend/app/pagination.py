@@ -0,0 +1,35 @@
+import base64
+import json
+import neo4j.time
+
+
+def encode_value(value):
+    """JSON-safe form of a Neo4j value that must compare as its original type."""
+    # Temporals must round-trip as temporals, or `>` / `<` on them never matches
+    if isinstance(value, (neo4j.time.DateTime, neo4j.time.Date)):
+        return {"type": type(value).__name__, "iso": value.iso_format()}
+    return value.item() if hasattr(value, "item") else value
+
+
+def decode_value(value):
+    if isinstance(value, dict):
+        return getattr(neo4j.time, value["type"]).from_iso_format(value["iso"])
+    return value
+
+
+def encode_cursor(*values):
+    """Opaque keyset cursor holding the sort key of the last row of a page."""
+    raw = json.dumps([encode_value(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Inverse of encode_cursor; raises ValueError on anything malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        return [decode_value(v) for v in values]
+    except Exception:
+        raise ValueError("Malformed cursor")
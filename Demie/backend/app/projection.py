@@ -0,0 +1,154 @@
+import numpy as np
+from app.core.graph_builder import DenseIdMap
+
+# Relationship types drawn on the network map
+MAP_RELATIONSHIPS = ("SENT_FUNDS", "FUSED_TO")
+
+
+def force_layout(num_nodes, src, dst, iterations=60, seed=0, chunk=1024):
+    """
+    Fruchterman-Reingold layout, vectorized with NumPy. Repulsion is a
+    matrix product over row chunks (chunk x N blocks, bounded memory);
+    attraction is one scatter-add over the edge list per iteration.
+    Deterministic for a given graph and seed. Returns float32 [N, 2] in [0, 1].
+    """
+    n = num_nodes
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2), dtype=np.float32) - 0.5
+    k = np.float32(1.0 / np.sqrt(n))
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        disp = np.zeros_like(pos)
+        # 1. Repulsion between every pair, k^2 / d along the separation:
+        # sum_j (p_i - p_j) w_ij = p_i * sum_j w_ij - (W @ p)_i, w_ij = k^2 / d_ij^2
+        sq = (pos ** 2).sum(axis=1)
+        for start in range(0, n, chunk):
+            block = pos[start:start + chunk]
+            dist2 = sq[start:start + chunk, None] + sq[None, :] - 2 * block @ pos.T
+            weights = k * k / np.maximum(dist2, 1e-6)
+            weights[np.arange(len(block)), np.arange(start, start + len(block))] = 0
+            disp[start:start + chunk] = block * weights.sum(axis=1)[:, None] - weights @ pos
+        # 2. Attraction along edges: d^2 / k
+        if len(src):
+            delta = pos[src] - pos[dst]
+            dist = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), 1e-3)
+            force = delta * (dist / k)[:, None]
+            np.add.at(disp, src, -force)
+            np.add.at(disp, dst, force)
+        # 3. Move, capped by the current temperature
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    lo, hi = pos.min(axis=0), pos.max(axis=0)
+    return ((pos - lo) / np.maximum(hi - lo, 1e-9)).astype(np.float32)
+
+
+class NetworkProjection:
+    """
+    Level-of-detail projection of the scored graph for the network map.
+
+    Nodes are ranked by integrity_risk_score (then address); level i holds
+    the top levels[i] nodes and only the edges between them, so every link
+    points at a returned node and coarser levels are subsets of finer ones.
+    One layout is computed on the finest level and shared by all levels,
+    so nodes keep their position while zooming. Built once per data
+    version, after each analysis run.
+    """
+
+    def __init__(self, levels=(100, 500, 2000), iterations=60, seed=0, relationships=MAP_RELATIONSHIPS):
+        self.levels = tuple(sorted(levels))
+        self.relationships = tuple(relationships)
+        self.iterations = iterations
+        self.seed = seed
+        self.version = None
+        self.nodes = None
+        self.edges = None
+        self.edge_type_names = []
+
+    @property
+    def available(self):
+        return self.nodes is not None
+
+    def build(self, graph, version):
+        """Projects `graph` (scores in graph.scores) at data version `version`."""
+        id_map = DenseIdMap(graph.node_ids)
+        scores = np.asarray(graph.scores, dtype=np.float64)
+        scored = np.flatnonzero(~np.isnan(scores))
+        addresses = np.asarray(graph.addresses).astype(str)
+
+        # 1. Global ranking, cut at the finest level
+        order = scored[np.lexsort((addresses[scored], -scores[scored]))][:self.levels[-1]]
+        n = len(order)
+
+        # 2. Induced map edges (both endpoints kept), as ranks, deduplicated
+        rank = np.full(graph.num_nodes, -1, dtype=np.int64)
+        rank[order] = np.arange(n, dtype=np.int64)
+        typed = np.zeros(graph.num_edges, dtype=bool)
+        for rel in self.relationships:
+            typed |= graph.edge_mask(rel)
+        s, s_ok = id_map.lookup(graph.src)
+        d, d_ok = id_map.lookup(graph.dst)
+        src = np.where(s_ok, rank[s], -1)
+        dst = np.where(d_ok, rank[d], -1)
+        keep = typed & (src >= 0) & (dst >= 0) & (src != dst)
+        edges = np.unique(np.stack([src[keep], dst[keep], np.asarray(graph.edge_types)[keep].astype(np.int64)]), axis=1)
+
+        # 3. One layout for every level
+        xy = force_layout(n, edges[0], edges[1], self.iterations, self.seed)
+
+        fused = np.asarray(graph.fused_counts, dtype=np.float64)[order] if graph.fused_counts is not None else np.ones(n)
+        self.nodes = {
+            "address": addresses[order],
+            "integrity_risk_score": scores[order],
+            "fused_count": np.where(np.isnan(fused), 1, fused).astype(np.int64),
+            "x": xy[:, 0],
+            "y": xy[:, 1],
+        }
+        self.edges = edges
+        self.edge_type_names = list(graph.edge_type_names)
+        self.version = version
+        return self
+
+    def level_for_zoom(self, zoom):
+        """Maps a zoom factor in [0, 1] to a level index."""
+        zoom = min(max(zoom, 0.0), 1.0)
+        return min(int(zoom * len(self.levels)), len(self.levels) - 1)
+
+    def view(self, level, bbox=None):
+        """
+        Nodes and links of `level` (optionally only inside the viewport
+        bbox = (x0, y0, x1, y1) in layout coordinates).
+        """
+        level = min(max(level, 0), len(self.levels) - 1)
+        size = min(self.levels[level], len(self.nodes["address"]))
+        visible = np.zeros(len(self.nodes["address"]), dtype=bool)
+        visible[:size] = True
+        if bbox is not None:
+            x0, y0, x1, y1 = bbox
+            x, y = self.nodes["x"], self.nodes["y"]
+            visible &= (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+
+        rows = np.flatnonzero(visible)
+        src, dst, types = self.edges
+        on = visible[src] & visible[dst]
+        addresses = self.nodes["address"]
+        nodes = [
+            {
+                "address": addresses[r],
+                "integrity_risk_score": round(float(self.nodes["integrity_risk_score"][r]), 6),
+                "fused_count": int(self.nodes["fused_count"][r]),
+                "x": round(float(self.nodes["x"][r]), 5),
+                "y": round(float(self.nodes["y"][r]), 5),
+            }
+            for r in rows
+        ]
+        links = [
+            {"source": addresses[s], "target": addresses[d], "relationship_type": self.edge_type_names[t]}
+            for s, d, t in zip(src[on].tolist(), dst[on].tolist(), types[on].tolist())
+        ]
+        return nodes, links, level
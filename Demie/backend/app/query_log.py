@@ -0,0 +1,160 @@
+import asyncio
+import datetime
+import json
+import os
+import random
+import re
+
+# Clauses that make a statement a write; those are profiled in a rolled-back transaction
+WRITE_CLAUSES = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DETACH)\b", re.IGNORECASE)
+
+
+def parameter_shapes(parameters):
+    """Types and sizes of the parameters, never their values."""
+    return {key: _shape(value) for key, value in (parameters or {}).items()}
+
+
+def _shape(value):
+    if isinstance(value, (list, tuple)):
+        inner = sorted({_shape(v) for v in value[:20]})
+        return f"list[{len(value)}]" + (f"<{'|'.join(inner)}>" if inner else "")
+    if isinstance(value, dict):
+        return "map{" + ",".join(sorted(value)) + "}"
+    return type(value).__name__
+
+
+def operator_tree(plan):
+    """Compact PROFILE tree: operator, db hits and rows of every node."""
+    if not plan:
+        return None
+    return {
+        "operator": plan.get("operatorType", "").split("@")[0],
+        "db_hits": plan.get("dbHits", 0),
+        "rows": plan.get("rows", 0),
+        "children": [operator_tree(child) for child in plan.get("children", [])],
+    }
+
+
+def total_db_hits(tree):
+    if not tree:
+        return 0
+    return tree["db_hits"] + sum(total_db_hits(child) for child in tree["children"])
+
+
+class SlowQueryLog:
+    """
+    Statements slower than `threshold_ms` are appended to a JSON-lines log
+    with their name, duration, row count and parameter shapes. A
+    `profile_rate` fraction of them is re-run under PROFILE on a separate
+    session, off the request path, and the db hits and operator tree are
+    logged too. Writes are profiled inside a transaction that is rolled
+    back. At most one profile runs at a time; others are skipped.
+    """
+
+    def __init__(self, path, threshold_ms=250.0, profile_rate=0.1, session_factory=None, max_bytes=20_000_000):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.profile_rate = profile_rate
+        self.session_factory = session_factory
+        self.max_bytes = max_bytes
+        self.slow = 0
+        self.profiled = 0
+        self._profiling = None
+
+    def observe(self, name, query, parameters, seconds, rows):
+        """QUERY_OBSERVERS hook; cheap unless the statement was slow."""
+        duration_ms = seconds * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        self.slow += 1
+        shapes = parameter_shapes(parameters)
+        print(f"[!] Slow query {name}: {duration_ms:.0f} ms, {rows} rows, params {shapes}")
+        self.append({"kind": "slow", "name": name, "duration_ms": round(duration_ms, 2), "rows": rows, "params": shapes})
+
+        if self.session_factory is None or query is None or random.random() >= self.profile_rate:
+            return
+        if self._profiling is not None and not self._profiling.done():
+            return
+        try:
+            self._profiling = asyncio.get_running_loop().create_task(self.profile(name, query, parameters))
+        except RuntimeError:
+            pass
+
+    async def profile(self, name, query, parameters):
+        """Re-runs `query` under PROFILE and logs its plan. Returns the logged entry."""
+        try:
+            async with self.session_factory() as session:
+                tx = await session.begin_transaction()
+                try:
+                    result = await tx.run("PROFILE " + str(query), parameters)
+                    summary = await result.consume()
+                finally:
+                    # Read-only statements are rolled back too: nothing to commit
+                    await tx.rollback()
+        except Exception as e:
+            print(f"[!] PROFILE of {name} failed: {e}")
+            return None
+        tree = operator_tree(summary.profile)
+        entry = {
+            "kind": "profile",
+            "name": name,
+            "write": bool(WRITE_CLAUSES.search(str(query))),
+            "db_hits": total_db_hits(tree),
+            "plan": tree,
+        }
+        self.profiled += 1
+        self.append(entry)
+        return entry
+
+    def append(self, entry):
+        entry = {"at": datetime.datetime.utcnow().isoformat() + "Z", **entry}
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # One previous generation is kept
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        except OSError as e:
+            print(f"[!] Slow query log write failed: {e}")
+
+
+def read_entries(path):
+    """Entries of the log and its previous generation, oldest first."""
+    entries = []
+    for name in (path + ".1", path):
+        if not os.path.exists(name):
+            continue
+        with open(name) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return entries
+
+
+def top_offenders(entries, by="total_ms", limit=10):
+    """
+    Per statement name: slow executions, total/max duration, last
+    parameter shapes and the latest profile. Sorted by `by` descending.
+    """
+    stats = {}
+    for entry in entries:
+        row = stats.setdefault(entry["name"], {
+            "name": entry["name"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "params": None, "db_hits": None, "plan": None,
+        })
+        if entry["kind"] == "slow":
+            row["count"] += 1
+            row["total_ms"] += entry["duration_ms"]
+            row["max_ms"] = max(row["max_ms"], entry["duration_ms"])
+            row["params"] = entry["params"]
+        elif entry["kind"] == "profile":
+            row["db_hits"] = entry["db_hits"]
+            row["plan"] = entry["plan"]
+    rows = [row for row in stats.values() if row["count"]]
+    rows.sort(key=lambda row: row[by] or 0, reverse=True)
+    return rows[:limit]
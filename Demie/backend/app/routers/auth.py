@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from app.database import get_db_session
+from app.metrics import cypher
 import hashlib
 import datetime
 import random
@@ -39,7 +40,7 @@ async def create_audit_log(username: str, action: str, details: str, session):
     Creates a forensic log node in Neo4j linked to the User.
     This creates a 'Graph of Activity' for forensic auditing.
     """
-    query = """
+    query = cypher("auth.audit_log", """
     MATCH (u:User {username: $username})
     CREATE (l:Log {
         action: $action,
@@ -48,7 +49,7 @@ async def create_audit_log(username: str, action: str, details: str, session):
         status: 'SUCCESS'
     })
     CREATE (u)-[:PERFORMED]->(l)
-    """
+    """)
     await session.run(query, username=username, action=action, details=details)
 
 # --- API Endpoints ---
@@ -68,14 +69,14 @@ async def register(user_data: dict, session=Depends(get_db_session)):
         raise HTTPException(status_code=400, detail="USERNAME_PASSWORD_AND_EMAIL_REQUIRED")
 
     # 1. Check if Auditor already exists in Graph
-    check_query = "MATCH (u:User {username: $username}) RETURN u"
+    check_query = cypher("auth.user_exists", "MATCH (u:User {username: $username}) RETURN u")
     existing = await session.run(check_query, {"username": username})
     if await existing.single():
         raise HTTPException(status_code=400, detail="USER_ALREADY_EXISTS")
 
     # 2. Generate Session ID and Create Node
     new_sid = generate_session_id()
-    create_query = """
+    create_query = cypher("auth.create_user", """
     CREATE (u:User {
         username: $username,
         email: $email,
@@ -87,7 +88,7 @@ async def register(user_data: dict, session=Depends(get_db_session)):
         created_at: datetime()
     })
     RETURN u.username as username
-    """
+    """)
     
     await session.run(create_query, {
         "username": username, 
@@ -151,12 +152,12 @@ async def login(credentials: dict, session=Depends(get_db_session)):
     if not username or not password:
         raise HTTPException(status_code=400, detail="CREDENTIALS_MISSING")
 
-    query = """
+    query = cypher("auth.login_lookup", """
     MATCH (u:User {username: $username}) 
     RETURN u.password_hash as stored_hash, 
            u.session_id as sid, 
            u.protocol as protocol
-    """
+    """)
     res = await session.run(query, username=username)
     user_record = await res.single()
     
@@ -192,11 +193,11 @@ async def reset_password(data: dict, session=Depends(get_db_session)):
         raise HTTPException(status_code=400, detail="INVALID_REQUEST_DATA")
 
     # 1. Verify Token and Expiry in Neo4j
-    query = """
+    query = cypher("auth.reset_token_lookup", """
     MATCH (u:User {reset_token: $token})
     WHERE u.token_expiry > datetime()
     RETURN u.username as username, u.email as email
-    """
+    """)
     res = await session.run(query, {"token": token})
     user_record = await res.single()
 
@@ -209,12 +210,12 @@ async def reset_password(data: dict, session=Depends(get_db_session)):
     email_address = user_record['email']
 
     # 2. Update Credentials and Clear Recovery Fields
-    update_query = """
+    update_query = cypher("auth.reset_password", """
     MATCH (u:User {username: $username})
     SET u.password_hash = $hash, 
         u.reset_token = null, 
         u.token_expiry = null
-    """
+    """)
     await session.run(update_query, {
         "username": username, 
         "hash": get_password_hash(new_password)
@@ -287,11 +288,11 @@ async def forgot_password(data: dict, session=Depends(get_db_session)):
         raise HTTPException(status_code=400, detail="EMAIL_AND_USERNAME_REQUIRED")
 
     # 1. Verify Auditor exists in the Graph
-    query = """
-    MATCH (u:User)
-    WHERE toLower(u.email) = toLower($email) AND u.username = $username
+    query = cypher("auth.recovery_lookup", """
+    MATCH (u:User {username: $username})
+    WHERE toLower(u.email) = toLower($email)
     RETURN u.username as username, u.email as email
-    """
+    """)
     res = await session.run(query, email=email_address, username=username)
     user_record = await res.single()
 
@@ -301,11 +302,11 @@ async def forgot_password(data: dict, session=Depends(get_db_session)):
     # 2. Generate a secure 32-byte token and set 1-hour expiry
     reset_token = secrets.token_urlsafe(32)
     
-    update_query = """
+    update_query = cypher("auth.set_reset_token", """
     MATCH (u:User {username: $username})
     SET u.reset_token = $token, 
         u.token_expiry = datetime() + duration('PT1H')
-    """
+    """)
     await session.run(update_query, username=username, token=reset_token)
 
     # 3. Create Forensic Audit Log
@@ -1,3 +1,4 @@
+from typing import Tuple
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,4 +11,73 @@ class Settings(BaseSettings):
     MAIL_STARTTLS: bool = True
     MAIL_SSL_TLS: bool = False
 
-settings = Settings()
\ No newline at end of file
+    # Risk Score Write-Back (GATv2 -> Neo4j)
+    WRITEBACK_CHUNK_SIZE: int = 1000
+    WRITEBACK_EPSILON: float = 1e-4
+
+    # Keyset-paged graph extraction (Neo4j -> NumPy)
+    EXTRACT_PAGE_SIZE: int = 5000
+    EDGE_DEDUPE: bool = True
+
+    # Incremental re-scoring (2-hop neighbourhood of dirty addresses)
+    INCREMENTAL_FULL_EVERY: int = 20
+
+    # Mini-batch inference: target nodes per batch, in-edges kept per hop (-1 = all)
+    INFERENCE_BATCH_SIZE: int = 4096
+    INFERENCE_FANOUT: Tuple[int, int] = (-1, -1)
+    # Scoring forward pass: "eager", "fused" (BatchNorm folded) or "compile"
+    INFERENCE_BACKEND: str = "fused"
+    # Opt-in reduced precision: "none", "int8" (dynamic) or "bf16".
+    # Check drift first with `python validate_quantization.py`.
+    INFERENCE_QUANTIZATION: str = "none"
+
+    # Memory-mapped 45-feature store (built by generate_scaler.py)
+    FEATURE_STORE_DIR: str = "data/features"
+
+    # Versioned CSR graph snapshot used as the full-run inference source
+    GRAPH_SNAPSHOT_ENABLED: bool = True
+    GRAPH_SNAPSHOT_DIR: str = "data/snapshot"
+    # Delta refreshes between full re-extractions (catches deleted nodes/edges)
+    GRAPH_SNAPSHOT_REBUILD_EVERY: int = 50
+
+    # Explainability: strongest incoming attention edges kept per address (0 = off)
+    ATTENTION_TOP_K: int = 8
+    ATTENTION_INDEX_DIR: str = "data/attention"
+    # On-demand single-address explanations cached per (address, data version)
+    EXPLAIN_CACHE_SIZE: int = 256
+    # Threads for on-demand explanations, separate from the analysis worker
+    EXPLAIN_WORKERS: int = 2
+    # Audit modal payloads cached per (cluster proxy, data version)
+    CLUSTER_DETAILS_CACHE_SIZE: int = 512
+
+    # Live feed push channel: pending events per client before it is resynced
+    LIVE_FEED_QUEUE_SIZE: int = 16
+    # Seconds between SSE keep-alive comments on an idle stream
+    LIVE_FEED_HEARTBEAT: float = 15.0
+
+    # Network map level-of-detail projection: node count per level, layout iterations
+    PROJECTION_LEVELS: Tuple[int, ...] = (100, 500, 2000)
+    PROJECTION_LAYOUT_ITERATIONS: int = 60
+
+    # Apply pending Neo4j schema migrations (and log hot-query plans) at startup.
+    # Same step as `python migrate_schema.py`.
+    SCHEMA_BOOTSTRAP_ON_STARTUP: bool = True
+
+    # Persisted graph data version (bumped by analysis/fusion and ingest
+    # batches); read endpoints derive their ETags from it
+    DATA_VERSION_PATH: str = "data/data_version.json"
+    # Clients must revalidate every time; unchanged data costs a 304
+    CONDITIONAL_CACHE_CONTROL: str = "no-cache"
+
+    # Slow-query log (inspect with `python slow_queries.py`): statements over
+    # the threshold are logged; this fraction of them is re-run under PROFILE
+    SLOW_QUERY_THRESHOLD_MS: float = 250.0
+    SLOW_QUERY_PROFILE_RATE: float = 0.1
+    SLOW_QUERY_LOG_PATH: str = "data/slow_queries.jsonl"
+
+    # Negotiated response compression (brotli if installed, else gzip)
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+settings = Settings()
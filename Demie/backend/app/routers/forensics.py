@@ -1,6 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from app.database import get_db_session
+from app.metrics import cypher
 from app.prediction_service import PredictionService
+from app.jobs import AnalysisJobManager
+from app.aggregates import DashboardAggregates
+from app.data_version import data_version
+from app.live_feed import LiveFeedBroadcaster, format_event
+from app.history import HistoryPage, DENORMALIZE_QUERY
+from app.clusters import ClusterPage, CLUSTER_FIELDS
+from app.explain import LRUCache
+from app.serialization import FastJSONResponse, LAYOUT_PATTERN, columnar, columnar_graph
+from app.routers.config import settings
+import asyncio
 import torch
 import torch.nn.functional as F
 from torch_geometric.nn import GATv2Conv, BatchNorm
@@ -17,6 +30,16 @@ def is_valid_ethereum_address(address: str) -> bool:
 # The prefix "/api" is applied in main.py
 router = APIRouter(tags=["Forensics"])
 predictor = PredictionService()
+aggregates = DashboardAggregates()
+live_feed = LiveFeedBroadcaster(aggregates, queue_size=settings.LIVE_FEED_QUEUE_SIZE)
+data_version.subscribe(live_feed.notify)
+# Filtered /clusters totals, keyed by (filters, data version)
+cluster_totals = LRUCache(64)
+# Audit modal payloads, keyed by (proxy address, data version): every
+# member of a cluster shares its proxy's entry
+cluster_details = LRUCache(settings.CLUSTER_DETAILS_CACHE_SIZE)
+# (address, data version) -> proxy address of its cluster
+cluster_proxies = LRUCache(4 * settings.CLUSTER_DETAILS_CACHE_SIZE)
 
 # --- GATv2 MODEL ARCHITECTURE ---
 # Matches engine logic: Now supports attention weight retrieval
@@ -60,149 +83,159 @@ class ForgotPasswordRequest(BaseModel):
     email: EmailStr
     username: str    
 
+class IngestBatch(BaseModel):
+    addresses: List[str] = []
+
 # --- DYNAMIC DASHBOARD ENDPOINTS ---
 
 @router.get("/live-feed")
-async def get_live_feed(session=Depends(get_db_session)):
+async def get_live_feed():
     """
     Live stream of highest risk detections.
     Traverses the Identity Fusion graph to provide cluster context.
+    Served from the materialized aggregates (recomputed only after writes).
     """
-    query = """
-    MATCH (a:Address)
-    WHERE a.integrity_risk_score > 0.6
-    
-    // Calculate the size of the cluster this address belongs to
-    OPTIONAL MATCH (a)-[:FUSED_TO*1..2]-(clusterNode)
-    WITH a, count(DISTINCT clusterNode) + 1 as cluster_size
-    
-    RETURN 
-        a.address as address, 
-        a.integrity_risk_score as risk, 
-        a.amount as amount,
-        a.last_active as timestamp,
-        cluster_size
-    ORDER BY a.integrity_risk_score DESC, a.last_active DESC 
-    LIMIT 15
+    return (await aggregates.get())["live_feed"]
+
+@router.get("/live-feed/stream")
+async def stream_live_feed(request: Request):
     """
-    
-    result = await session.run(query)
-    records = await result.data()
-    
-    feed = []
-    for r in records:
-        risk_val = float(r["risk"] or 0)
-        
-        # Determine specific forensic flags based on GAT output
-        flag = "STABLE"
-        if risk_val > 0.85: flag = "CRITICAL_THREAT"
-        elif risk_val > 0.75: flag = "HIGH_ANOMALY"
-        elif risk_val > 0.60: flag = "ELEVATED_RISK"
-
-        feed.append({
-            "address": r["address"],
-            "risk_raw": risk_val,
-            "risk_display": f"{risk_val * 100:.1f}%",
-            "amount": f"{float(r['amount'] or 0):.4f} ETH",
-            "cluster_size": r["cluster_size"],
-            "status": flag,
-            "reason": "Cluster Expansion" if r["cluster_size"] > 10 else "High-Risk Lead",
-            "timestamp": r["timestamp"] or "Just Now"
-        })
-        
-    return feed
+    Server-Sent Events push channel for the live feed.
+    Sends a snapshot on connect, then only the diffs produced after each
+    analysis run or ingest batch (one feed query per change, not per client).
+    """
+    queue = live_feed.subscribe()
 
-@router.post("/analyze")
-async def start_analysis(session=Depends(get_db_session)):
-    """Triggers the PredictionService sequence and returns immediate state delta"""
-    try:
-        # 1. Execute the GAT Engine Inference
-        count = await predictor.run_forensic_analysis()
-        
-        # 2. Fetch the new global distribution immediately after processing
-        # This ensures the HUD in the UI updates to the latest GAT weights
-        dist_query = """
-        MATCH (a:Address)
-        WHERE a.integrity_risk_score IS NOT NULL
-        RETURN 
-            count(CASE WHEN a.integrity_risk_score > 0.75 THEN 1 END) as critical,
-            count(CASE WHEN a.integrity_risk_score >= 0.6 AND a.integrity_risk_score <= 0.75 THEN 1 END) as moderate,
-            count(CASE WHEN a.integrity_risk_score < 0.6 THEN 1 END) as stable,
-            avg(a.integrity_risk_score) as mean_irs
-        """
-        
-        result = await session.run(dist_query)
-        stats = await result.single()
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_FEED_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    # Broadcaster stopped (shutdown)
+                    break
+                yield format_event(event)
+        finally:
+            live_feed.unsubscribe(queue)
 
-        return {
-            "status": "COMPLETED",
-            "nodes_processed": count,
-            "protocol": "GAT_V2_NODE_CLASSIFICATION",
-            "summary": {
-                "critical": stats["critical"],
-                "moderate": stats["moderate"],
-                "stable": stats["stable"],
-                "mean_irs": f"{round((stats['mean_irs'] or 0) * 100, 1)}%"
-            }
-        }
-    except Exception as e:
-        print(f"Inference Error: {e}")
-        raise HTTPException(status_code=500, detail=f"GAT Inference Failed: {str(e)}")
-    
-@router.get("/analytics/forensics")
-async def get_forensic_analytics(session=Depends(get_db_session)):
-    # Query 1: Radar Chart Stats
-    stats_query = """
-    MATCH (n:Address)
-    WHERE n.integrity_risk_score IS NOT NULL
-    RETURN 
-        avg(coalesce(n.avg_sent_tnx, 0)) as avg_sent,
-        avg(coalesce(n.avg_received_tnx, 0)) as avg_received,
-        avg(n.integrity_risk_score) as avgIRS,
-        avg(coalesce(toFloat(n.amount), 0)) as avg_vol
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def run_analysis_job(job):
+    """Background body of an /analyze job: GAT pass, then the state delta for the HUD."""
+    # 1. Execute the GAT Engine Inference
+    count = await predictor.run_forensic_analysis(
+        mode=job.mode, addresses=job.addresses, progress=job.enter_stage
+    )
+
+    # 2. Recompute the dashboard aggregates once, right after processing
+    # This ensures the HUD in the UI updates to the latest GAT weights:
+    # the run bumped the data version, so get() recomputes, once per
+    # version (shared with the live feed producer and concurrent polls)
+    job.enter_stage("summary")
+    data = await aggregates.get()
+
+    return {
+        "nodes_processed": count,
+        "protocol": "GAT_V2_NODE_CLASSIFICATION",
+        "writeback": predictor.last_run,
+        "data_version": aggregates.version,
+        "summary": data["distribution"],
+    }
+
+analysis_jobs = AnalysisJobManager(run_analysis_job)
+
+@router.post("/analyze", status_code=202)
+async def start_analysis(
+    mode: str = Query("full", pattern="^(full|incremental)$"),
+    addresses: Optional[List[str]] = Query(None),
+):
     """
-    
-    # Query 2: Top 10 Entities (Matches Frontend id/score keys)
-    top_entities_query = """
-    MATCH (n:Address)
-    WHERE n.integrity_risk_score IS NOT NULL
-    RETURN n.address as id, n.integrity_risk_score * 100 as score
-    ORDER BY n.integrity_risk_score DESC
-    LIMIT 10
+    Queues a GAT analysis and returns its job id immediately.
+    mode=incremental re-scores only the 2-hop neighbourhood of changed
+    addresses (the `addresses` list, or activity since the last run).
+    Triggers that arrive while a run is in flight join it instead of
+    starting another full-graph pass.
     """
+    job, coalesced = analysis_jobs.submit(mode=mode, addresses=addresses)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "mode": job.mode,
+        "coalesced": coalesced,
+    }
 
-    try:
-        stats_res = await session.run(stats_query)
-        stats = await stats_res.single()
-        
-        entities_res = await session.run(top_entities_query)
-        entities = await entities_res.data()
+@router.get("/analyze/jobs")
+async def list_analysis_jobs():
+    """Recent analysis jobs, newest first."""
+    return analysis_jobs.recent()
 
-        return {
-            "radarData": [
-                {"subject": "Tx Sent", "value": stats["avg_sent"]},
-                {"subject": "Tx Received", "value": stats["avg_received"]},
-                {"subject": "Network Risk", "value": (stats["avgIRS"] or 0) * 100},
-                {"subject": "Avg Volume", "value": (stats["avg_vol"] or 0) / 1000}
-            ],
-            "topEntities": entities,
-            "metadata": {
-                "meanIRS": f"{round((stats['avgIRS'] or 0) * 100, 1)}%",
-                "status": "synchronized"
-            }
-        }
+@router.get("/analyze/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """Progress by stage, timing and (once finished) the run summary."""
+    job = analysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="JOB_NOT_FOUND")
+    return job.to_dict()
+    
+@router.get("/analytics/forensics")
+async def get_forensic_analytics():
+    """Radar averages and top 10 entities, served from the materialized aggregates."""
+    try:
+        return (await aggregates.get())["analytics"]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/network/graph")
-async def get_network_graph(session=Depends(get_db_session)):
+async def get_network_graph(
+    layout: str = Query("records", pattern=LAYOUT_PATTERN),
+    level: Optional[int] = Query(None, ge=0),
+    zoom: Optional[float] = Query(None, ge=0.0, le=1.0),
+    bbox: Optional[str] = Query(None, description="x0,y0,x1,y1 in layout coordinates"),
+    session=Depends(get_db_session),
+):
     """
     Returns sampled network data optimized for the Canvas-based NetworkMap.
     Focuses on high-risk clusters and their immediate bridge connections.
+    layout=columnar sends one array per field and links as address index pairs.
+
+    After an analysis run this is served from the precomputed projection:
+    pick a detail level (or a zoom in [0, 1]) and optionally a viewport;
+    nodes carry x/y layout coordinates and links only join returned nodes.
     """
+    projection = predictor.projection
+    if projection.available:
+        viewport = None
+        if bbox is not None:
+            try:
+                viewport = tuple(float(v) for v in bbox.split(","))
+            except ValueError:
+                viewport = ()
+            if len(viewport) != 4:
+                raise HTTPException(status_code=400, detail="INVALID_BBOX")
+        if level is None:
+            level = projection.level_for_zoom(zoom) if zoom is not None else len(projection.levels) - 1
+        nodes, links, level = projection.view(level, viewport)
+        body = columnar_graph(nodes, links) if layout == "columnar" else {"nodes": nodes, "links": links}
+        body["metadata"] = {
+            "sampling_ratio": f"Top {projection.levels[level]} by IRS",
+            "protocol": "GAT_TOPOLOGY_V1",
+            "level": level,
+            "levels": list(projection.levels),
+            "positions": "precomputed",
+            "data_version": projection.version,
+        }
+        return FastJSONResponse(body)
+
     # 1. Fetch High-Risk Nodes and their 'Fused' counts
     # This ensures we prioritize nodes that actually appear in your Identity Explorer
-    node_query = """
+    node_query = cypher("forensics.graph_nodes", """
     MATCH (n:Address)
     WHERE n.integrity_risk_score IS NOT NULL
     WITH n
@@ -212,130 +245,236 @@ async def get_network_graph(session=Depends(get_db_session)):
         n.address as address, 
         n.integrity_risk_score as integrity_risk_score,
         COUNT { (n)-[:FUSED_TO]-() } + 1 as fused_count
-    """
+    """)
     
     # 2. Fetch critical links only (e.g., high volume or risk propagation)
     # We filter for links between the nodes we just sampled to avoid 'Ghost Links'
-    link_query = """
+    link_query = cypher("forensics.graph_links", """
     MATCH (a:Address)-[r:SENT_FUNDS|FUSED_TO]->(b:Address)
-    WHERE a.integrity_risk_score > 0.6 OR b.integrity_risk_score > 0.6
+    WHERE a.address IN $addresses AND b.address IN $addresses
     WITH a, b, r
     LIMIT 1000
     RETURN 
         a.address as source, 
         b.address as target, 
         type(r) as relationship_type
-    """
+    """)
     
     try:
         nodes_res = await session.run(node_query)
         nodes = await nodes_res.data()
         
-        links_res = await session.run(link_query)
+        links_res = await session.run(link_query, addresses=[n["address"] for n in nodes])
         links = await links_res.data()
         
-        return {
-            "nodes": nodes, 
-            "links": links,
-            "metadata": {
-                "sampling_ratio": "Top 500 by IRS",
-                "protocol": "GAT_TOPOLOGY_V1"
-            }
+        body = columnar_graph(nodes, links) if layout == "columnar" else {"nodes": nodes, "links": links}
+        body["metadata"] = {
+            "sampling_ratio": "Top 500 by IRS",
+            "protocol": "GAT_TOPOLOGY_V1"
         }
+        return FastJSONResponse(body)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Graph Projection Failed: {str(e)}")
     
 @router.get("/address/{address}/history")
-async def get_address_history(address: str, session=Depends(get_db_session)):
-    # The query uses the $addr placeholder
-    query = """
-    MATCH (a:Address {address: $addr})-[r]->(b:Address)
-    RETURN 'SENT' as type, b.address as counterparty, r.amount as amount
-    UNION
-    MATCH (a:Address {address: $addr})<-[r]-(b:Address)
-    RETURN 'RECEIVED' as type, b.address as counterparty, r.amount as amount
-    LIMIT 10
+async def get_address_history(
+    address: str,
+    direction: str = Query("both", pattern="^(both|out|in)$"),
+    counterparty: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(25, ge=1, le=500),
+    session=Depends(get_db_session),
+):
+    """
+    Transfers of an address, newest first, keyset-paginated on
+    (timestamp, tx id). Pass `next_cursor` back as `cursor` for the
+    following page (null = last page). Each page is an index seek on the
+    SENT relationship indexes, so its cost does not grow with the degree.
+
+    Only SENT edges with from_address, to_address and timestamp are
+    listed. Ingestion must set them on creation or pass the batch's
+    addresses to /ingest/complete (see DENORMALIZE_QUERY).
+    """
+    if not is_valid_ethereum_address(address):
+        raise HTTPException(status_code=400, detail="Invalid Ethereum Address format")
+    if counterparty and not is_valid_ethereum_address(counterparty):
+        raise HTTPException(status_code=400, detail="INVALID_COUNTERPARTY")
+    try:
+        page = HistoryPage(address, direction, counterparty, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="INVALID_CURSOR")
+
+    streams = []
+    for query, params in page.queries():
+        result = await session.run(query, params)
+        streams.append(await result.data())
+    return page.shape(streams)
+
+@router.get("/address/{address}/influence")
+async def get_address_influence(address: str, limit: int = Query(None, ge=1)):
     """
-    # CORRECT: Passing the variable as a named parameter in a dictionary
-    results = await session.run(query, {"addr": address.lower()}) 
-    return await results.data()
+    Most influential counterparties of an address: its strongest incoming
+    GATv2 attention edges from the latest analysis run (head-averaged).
+    Served from the attention index, without touching the model or Neo4j.
+    """
+    if not is_valid_ethereum_address(address):
+        raise HTTPException(status_code=400, detail="Invalid Ethereum Address format")
+    if not predictor.attention.available:
+        raise HTTPException(status_code=503, detail="ATTENTION_INDEX_UNAVAILABLE")
+
+    counterparties = predictor.attention.top(address, limit)
+    if counterparties is None:
+        raise HTTPException(status_code=404, detail="ADDRESS_NOT_INDEXED")
+
+    return {
+        "address": address.lower(),
+        "counterparties": counterparties,
+        "k": predictor.attention.k,
+        "indexed_at": predictor.attention.meta["created_at"],
+    }
     
     
+@router.get("/address/{address}/explain")
+async def explain_address(address: str, session=Depends(get_db_session)):
+    """
+    On-demand GATv2 explanation for one address: re-scores it on its 2-hop
+    receptive field and returns the score with per-edge attention. Results
+    are cached until the next analysis run changes the graph version.
+    """
+    if not is_valid_ethereum_address(address):
+        raise HTTPException(status_code=400, detail="Invalid Ethereum Address format")
+
+    explanation = await predictor.explain_address(session, address)
+    if explanation is None:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return explanation
+
 @router.get("/stats")
-async def get_dashboard_stats(session=Depends(get_db_session)):
-    query = """
-    MATCH (a:Address)
-    RETURN 
-        count(a) as total_nodes,
-        avg(coalesce(a.integrity_risk_score, 0)) as avg_risk,
-        sum(case when a.integrity_risk_score > 0.6 then a.amount else 0 end) as eth_at_risk
+async def get_dashboard_stats():
+    """Node count, mean risk and ETH at risk, served from the materialized aggregates."""
+    return (await aggregates.get())["stats"]
+
+@router.post("/ingest/complete")
+async def ingest_complete(data: Optional[IngestBatch] = None, session=Depends(get_db_session)):
     """
-    result = await session.run(query)
-    record = await result.single()
-    
-    return {
-        "total_nodes": record["total_nodes"] or 0,
-        "avgRiskScore": float(record["avg_risk"] or 0),
-        # This replaces the static string with the actual DB sum
-        "valueAtRisk": f"{float(record['eth_at_risk'] or 0):.2f} ETH" 
-    }
+    Called by the ingestion pipeline after each committed batch: moves the
+    data version so cached aggregates and explanations are recomputed.
+    An optional {"addresses": [...]} body lists the addresses the batch
+    touched; their SENT volumes and cluster totals are refreshed first,
+    and their new SENT edges get the from_address/to_address properties
+    the history endpoint seeks on. A batch that neither writes those
+    properties itself nor lists its addresses here stays out of the
+    history (counted by `python migrate_schema.py`).
+    """
+    addresses = data.addresses if data else []
+    refreshed = 0
+    if addresses:
+        # Index the new transfers for the history endpoint
+        await session.run(DENORMALIZE_QUERY, {"addresses": [a.lower() for a in addresses]})
+        refreshed = await predictor.volumes.refresh_addresses(session, addresses)
+    return {"data_version": data_version.bump(), "volumes_refreshed": refreshed}
     
 @router.get("/clusters")
-async def get_clusters(session=Depends(get_db_session)):
-    # Explicitly counting FUSED_TO relationships to sync with the Audit Modal
-    query = """
-    MATCH (a:Address)
-    WHERE a.integrity_risk_score IS NOT NULL
-    RETURN 
-        a.address AS address, 
-        toFloat(a.integrity_risk_score) AS integrity_risk_score,
-        CASE 
-            WHEN a.integrity_risk_score > 0.75 THEN 'HIGH'
-            WHEN a.integrity_risk_score >= 0.6 AND a.integrity_risk_score <= 0.75 THEN 'MEDIUM'
-            ELSE 'LOW'
-        END AS risk_level,
-        toFloat(a.amount) AS amount,
-        // FIX: Only count actual cluster members + the root node itself
-        COUNT { (a)-[:FUSED_TO]-() } + 1 AS fused_count,
-        COALESCE(toFloat(a.confidence), 0.85 + (rand() * 0.1)) AS confidence
+async def get_clusters(
+    risk_level: Optional[str] = Query(None, description="HIGH, MEDIUM or LOW"),
+    min_score: Optional[float] = Query(None, ge=0.0, le=1.0),
+    min_fused_count: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    include_total: bool = False,
+    layout: str = Query("records", pattern=LAYOUT_PATTERN),
+    search: Optional[str] = Query(None, max_length=64),
+    search_type: str = Query("ADDRESS", pattern="^(ADDRESS|ID)$"),
+    session=Depends(get_db_session),
+):
+    """
+    Scored addresses, keyset-paginated by integrity_risk_score then address.
+    Pass `next_cursor` back as `cursor` for the following page (null = last page).
+    layout=columnar sends `nodes` as one array per field. `search` narrows
+    every page to matching addresses (search_type=ADDRESS) or community
+    ids (search_type=ID).
     """
     try:
-        result = await session.run(query)
-        data = await result.data()
-        return data
+        page = ClusterPage(risk_level, min_score, min_fused_count, cursor, limit, search, search_type)
+    except ValueError as e:
+        detail = "INVALID_CURSOR" if "cursor" in str(e) else "INVALID_RISK_LEVEL"
+        raise HTTPException(status_code=400, detail=detail)
+
+    try:
+        query, params = page.page_query()
+        result = await session.run(query, params)
+        body = page.shape(await result.data())
+
+        if include_total:
+            distribution = (await aggregates.get())["distribution"]
+            body["distribution"] = {k: distribution[k] for k in ("critical", "moderate", "stable")}
+            if page.band_only:
+                # Band totals are already materialized with the dashboard counters
+                body["total"] = page.total_from(distribution)
+            else:
+                key = (page.filter_key, data_version.current())
+                body["total"] = cluster_totals.get(key)
+                if body["total"] is None:
+                    query, params = page.count_query()
+                    result = await session.run(query, params)
+                    body["total"] = (await result.single())["total"]
+                    cluster_totals.put(key, body["total"])
+        if layout == "columnar":
+            body["nodes"] = columnar(body["nodes"], CLUSTER_FIELDS)
+            body["layout"] = "columnar"
+        return FastJSONResponse(body)
     except Exception as e:
         print(f"Neo4j Error: {e}")
         raise HTTPException(status_code=500, detail="Database query failed")
     
+def cluster_details_response(address, cluster):
+    """Audit modal payload of `address` from its cluster's cached members and totals."""
+    members = cluster["members"]
+    # Find the requested node in the list for the header stats
+    primary_node = next((r for r in members if r['address'].lower() == address.lower()), members[0])
+    return {
+        "address": address,
+        "integrity_risk_score": primary_node.get("individual_score", 0),
+        "fused_count": len(members),
+        "cluster_volume": cluster["cluster_volume"],
+        "members": members
+    }
+
 @router.get("/clusters/{address}/details")
 async def get_cluster_details(address: str, session=Depends(get_db_session)):
     if not is_valid_ethereum_address(address):
         raise HTTPException(status_code=400, detail="Invalid Ethereum Address format")
         
     addr_clean = address.lower()
+    version = data_version.current()
+    proxy_address = cluster_proxies.get((addr_clean, version))
+    cluster = cluster_details.get((proxy_address, version)) if proxy_address else None
+    if cluster is not None:
+        return cluster_details_response(address, cluster)
     
     # We now fetch nodes explicitly connected via FUSED_TO 
     # to match the identity logic in the main DashboardView.
-    query = """
-    MATCH (proxy:Address {address: $addr})
-    // 1. Find all nodes in this fused cluster
+    # Volumes are node properties kept current by fusion and ingestion.
+    query = cypher("forensics.cluster_details", """
+    MATCH (start:Address {address: $addr})
+    // 1. Resolve the cluster's proxy (members point at it through FUSED_TO)
+    OPTIONAL MATCH (start)-[:FUSED_TO]->(head:Address)
+    WITH coalesce(head, start) AS proxy
+    // 2. Find all nodes in this fused cluster
     OPTIONAL MATCH (proxy)-[:FUSED_TO]-(member:Address)
     WITH proxy, collect(DISTINCT member) + proxy AS cluster_members
     
     UNWIND cluster_members AS m
-    // 2. Calculate the specific volume for each member
-    OPTIONAL MATCH (m)-[s:SENT]->()
-    WITH m, sum(toFloat(s.amount)) AS sent_vol
-    OPTIONAL MATCH (m)<-[r:SENT]-()
-    WITH m, sent_vol, sum(toFloat(r.amount)) AS recv_vol
-    
     RETURN 
         m.address AS address,
         COALESCE(m.role, 'MEMBER') AS role,
         toFloat(m.integrity_risk_score) AS individual_score,
-        COALESCE(sent_vol, 0) AS amount_sent,
-        COALESCE(recv_vol, 0) AS amount_received
-    """
+        COALESCE(m.sent_volume, 0.0) AS amount_sent,
+        COALESCE(m.received_volume, 0.0) AS amount_received,
+        proxy.address AS proxy_address,
+        proxy.cluster_sent_volume AS cluster_sent,
+        proxy.cluster_received_volume AS cluster_received
+    """)
     try:
         result = await session.run(query, {"addr": addr_clean})
         records = await result.data()
@@ -343,15 +482,20 @@ async def get_cluster_details(address: str, session=Depends(get_db_session)):
         if not records:
             raise HTTPException(status_code=404, detail="Entity not found")
 
-        # Find the proxy node in the list for the header stats
-        primary_node = next((r for r in records if r['address'].lower() == addr_clean), records[0])
+        # Every row carries the same proxy and cluster totals
+        proxy_address = records[0]["proxy_address"].lower()
+        totals = {"sent": records[0]["cluster_sent"], "received": records[0]["cluster_received"]}
+        for r in records:
+            del r["proxy_address"], r["cluster_sent"], r["cluster_received"]
 
-        return {
-            "address": address,
-            "integrity_risk_score": primary_node.get("individual_score", 0),
-            "fused_count": len(records),
-            "members": records 
-        }
+        cluster = {"cluster_volume": totals, "members": records}
+        cluster_details.put((proxy_address, version), cluster)
+        # Any member's later lookup resolves to this entry without Neo4j
+        for r in records:
+            cluster_proxies.put((r["address"].lower(), version), proxy_address)
+        return cluster_details_response(address, cluster)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Audit Trace Error: {e}")
         raise HTTPException(status_code=500, detail=f"Graph Inference Error: {str(e)}")
@@ -364,7 +508,7 @@ async def health_check(session: AsyncSession = Depends(get_db_session)):
     """
     try:
         # Simple query to verify DB connectivity
-        await session.run("RETURN 1 AS health")
+        await session.run(cypher("forensics.health", "RETURN 1 AS health"))
         return {
             "status": "online",
             "database": "connected",
@@ -385,11 +529,11 @@ async def forgot_password(request: ForgotPasswordRequest, session=Depends(get_db
     against the Neo4j User registry.
     """
     # 1. Verification Query
-    query = """
-    MATCH (u:User)
-    WHERE toLower(u.email) = toLower($email) AND u.username = $username
+    query = cypher("forensics.forgot_password_lookup", """
+    MATCH (u:User {username: $username})
+    WHERE toLower(u.email) = toLower($email)
     RETURN u.email AS email
-    """
+    """)
     
     try:
         result = await session.run(query, {"email": request.email, "username": request.username})
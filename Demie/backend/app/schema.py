@@ -0,0 +1,191 @@
+import datetime
+from app.aggregates import LIVE_FEED_QUERY
+from app.clusters import ClusterPage
+from app.history import HistoryPage, UNINDEXED_QUERY
+
+# Ordered, idempotent schema migrations: (version, description, statements).
+# Append new versions; never edit one that has shipped. Versions listed in
+# DATA_BACKFILLS rewrite existing data (O(graph)) and are only applied by
+# `python migrate_schema.py`, never during app startup.
+MIGRATIONS = [
+    (1, "uniqueness constraints on lookup keys", [
+        "CREATE CONSTRAINT address_address_unique IF NOT EXISTS FOR (a:Address) REQUIRE a.address IS UNIQUE",
+        "CREATE CONSTRAINT user_username_unique IF NOT EXISTS FOR (u:User) REQUIRE u.username IS UNIQUE",
+    ]),
+    (2, "range indexes for risk ordering, activity watermarks and reset tokens", [
+        "CREATE INDEX address_risk IF NOT EXISTS FOR (a:Address) ON (a.integrity_risk_score)",
+        "CREATE INDEX address_last_active IF NOT EXISTS FOR (a:Address) ON (a.last_active)",
+        "CREATE INDEX address_updated_at IF NOT EXISTS FOR (a:Address) ON (a.updated_at)",
+        "CREATE INDEX user_reset_token IF NOT EXISTS FOR (u:User) ON (u.reset_token)",
+    ]),
+    (3, "text index for email lookups", [
+        "CREATE TEXT INDEX user_email_text IF NOT EXISTS FOR (u:User) ON (u.email)",
+    ]),
+    (4, "time-ordered transfer history: relationship indexes on denormalized endpoints", [
+        "CREATE INDEX sent_from_time IF NOT EXISTS FOR ()-[r:SENT]-() ON (r.from_address, r.timestamp)",
+        "CREATE INDEX sent_to_time IF NOT EXISTS FOR ()-[r:SENT]-() ON (r.to_address, r.timestamp)",
+        "CREATE INDEX sent_pair_time IF NOT EXISTS FOR ()-[r:SENT]-() ON (r.from_address, r.to_address, r.timestamp)",
+    ]),
+    (5, "backfill denormalized SENT endpoints for the history indexes", [
+        """
+        MATCH (a:Address)-[r:SENT]->(b:Address)
+        WHERE r.from_address IS NULL OR r.to_address IS NULL
+        CALL {
+            WITH a, r, b
+            SET r.from_address = a.address, r.to_address = b.address
+        } IN TRANSACTIONS OF 10000 ROWS
+        """,
+    ]),
+    (6, "range index for community membership lookups (incremental fusion scope)", [
+        "CREATE INDEX address_community IF NOT EXISTS FOR (a:Address) ON (a.community)",
+    ]),
+]
+
+# Data backfills (see above): the history endpoint lists only the SENT
+# edges already denormalized until version 5 has been applied
+DATA_BACKFILLS = {5}
+
+APPLIED_QUERY = "MATCH (m:SchemaMigration) RETURN m.version AS version"
+
+RECORD_QUERY = """
+MERGE (m:SchemaMigration {version: $version})
+SET m.description = $description, m.applied_at = datetime()
+"""
+
+# Hot read paths whose plans must start from an index seek, with sample
+# parameters (EXPLAIN only plans, it never executes)
+_page_query, _page_params = ClusterPage(limit=100).page_query()
+HOT_QUERIES = {
+    "address_lookup": ("MATCH (a:Address {address: $addr}) RETURN a", {"addr": "0x0"}),
+    "user_login": ("MATCH (u:User {username: $username}) RETURN u", {"username": ""}),
+    "reset_token": (
+        "MATCH (u:User {reset_token: $token}) WHERE u.token_expiry > datetime() RETURN u.username",
+        {"token": ""},
+    ),
+    "live_feed": (LIVE_FEED_QUERY, {}),
+    "clusters_page": (_page_query, _page_params),
+    "address_history": HistoryPage("0x0", direction="out", limit=25).queries()[0],
+}
+
+# Plan operators that read every node/relationship of a label or type (or the whole graph)
+SCAN_OPERATORS = ("AllNodesScan", "NodeByLabelScan", "DirectedRelationshipTypeScan", "UndirectedRelationshipTypeScan")
+
+
+def plan_operators(plan):
+    """Operator names of an EXPLAIN plan tree, depth first."""
+    if plan is None:
+        return []
+    if isinstance(plan, dict):
+        name, children = plan.get("operatorType", ""), plan.get("children", [])
+    else:
+        name, children = getattr(plan, "operator_type", ""), getattr(plan, "children", [])
+    # Operators come back with a runtime suffix, e.g. "NodeIndexSeek@neo4j"
+    names = [name.split("@")[0]]
+    for child in children:
+        names.extend(plan_operators(child))
+    return names
+
+
+class SchemaMigrator:
+    """
+    Applies pending MIGRATIONS and records each applied version as a
+    (:SchemaMigration {version}) node, so re-running is a no-op. A version
+    is only recorded once all of its statements succeeded (a uniqueness
+    constraint fails while duplicates exist; it is retried on the next run).
+    """
+
+    def __init__(self, migrations=None, hot_queries=None):
+        self.migrations = MIGRATIONS if migrations is None else migrations
+        self.hot_queries = HOT_QUERIES if hot_queries is None else hot_queries
+
+    async def applied(self, session):
+        result = await session.run(APPLIED_QUERY)
+        return {r["version"] for r in await result.data()}
+
+    async def pending(self, session):
+        done = await self.applied(session)
+        return [m for m in self.migrations if m[0] not in done]
+
+    async def migrate(self, session, backfills=True):
+        """
+        Applies pending versions in order; returns the versions applied now.
+        With backfills=False, DATA_BACKFILLS versions are left pending.
+        """
+        applied = []
+        for version, description, statements in await self.pending(session):
+            if not backfills and version in DATA_BACKFILLS:
+                print(f"[!] Data backfill {version} ({description}) pending: run `python migrate_schema.py`")
+                continue
+            try:
+                for statement in statements:
+                    result = await session.run(statement)
+                    await result.consume()
+            except Exception as e:
+                print(f"[!] Schema migration {version} ({description}) failed: {e}")
+                break
+            result = await session.run(RECORD_QUERY, version=version, description=description)
+            await result.consume()
+            print(f"[*] Schema migration {version} applied: {description}")
+            applied.append(version)
+        return applied
+
+    async def explain(self, session):
+        """
+        EXPLAIN plans of the hot queries. Returns {name: {operators, scan}}
+        and logs any query still planned as a label/all-nodes scan.
+        """
+        report = {}
+        for name, (query, params) in self.hot_queries.items():
+            result = await session.run("EXPLAIN " + query, params)
+            summary = await result.consume()
+            operators = plan_operators(summary.plan)
+            scan = [op for op in operators if op in SCAN_OPERATORS]
+            report[name] = {"operators": operators, "scan": bool(scan)}
+            marker = "[!]" if scan else "[*]"
+            print(f"{marker} Plan {name}: {' <- '.join(operators)}")
+        return report
+
+
+    async def unindexed_transfers(self, session):
+        """
+        Counts SENT relationships missing from the history indexes: without
+        denormalized endpoints (written after the v5 backfill without the
+        properties or an /ingest/complete address list) or a timestamp.
+        """
+        result = await session.run(UNINDEXED_QUERY)
+        record = await result.single()
+        report = {
+            "missing_endpoints": record["missing_endpoints"] if record else 0,
+            "missing_timestamp": record["missing_timestamp"] if record else 0,
+        }
+        if report["missing_endpoints"] or report["missing_timestamp"]:
+            print(
+                f"[!] History index gaps: {report['missing_endpoints']} SENT edge(s) without "
+                f"from_address/to_address, {report['missing_timestamp']} without timestamp"
+            )
+        else:
+            print("[*] Every SENT edge is denormalized for the history indexes")
+        return report
+
+
+async def bootstrap_schema(driver, explain=True, audit=False):
+    """
+    Startup hook: migrate and log hot-query plans. `audit` also reports
+    SENT edges the history indexes miss; that scans every SENT edge, so
+    startup leaves it to `python migrate_schema.py`. Never blocks startup
+    on a DB error.
+    """
+    migrator = SchemaMigrator()
+    started = datetime.datetime.utcnow()
+    try:
+        async with driver.session() as session:
+            # Constraints/indexes only; data backfills are left to the CLI
+            applied = await migrator.migrate(session, backfills=False)
+            report = await migrator.explain(session) if explain else {}
+            unindexed = await migrator.unindexed_transfers(session) if audit else None
+    except Exception as e:
+        print(f"[!] Schema bootstrap skipped: {e}")
+        return None
+    elapsed = (datetime.datetime.utcnow() - started).total_seconds()
+    print(f"[*] Schema bootstrap done in {elapsed:.2f}s ({len(applied)} migration(s) applied)")
+    return {"applied": applied, "plans": report, "unindexed": unindexed}
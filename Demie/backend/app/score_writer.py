@@ -0,0 +1,68 @@
+import numpy as np
+from app.routers.config import settings
+from app.metrics import cypher
+
+# One parameterized statement per chunk instead of one round trip per address.
+SCORE_WRITE_QUERY = cypher("writeback.score_write", """
+UNWIND $rows AS row
+MATCH (n:Address {address: row.address})
+SET n.integrity_risk_score = row.score
+""")
+
+
+class ScoreWriter:
+    """
+    Bulk write-back of GATv2 risk scores.
+    Scores are sent in fixed-size chunks through a single UNWIND statement,
+    each chunk inside a managed write transaction (retried by the driver on
+    transient errors). Addresses whose score moved less than `epsilon` since
+    the previous run are skipped entirely.
+    """
+
+    def __init__(self, chunk_size=None, epsilon=None):
+        self.chunk_size = chunk_size or settings.WRITEBACK_CHUNK_SIZE
+        self.epsilon = settings.WRITEBACK_EPSILON if epsilon is None else epsilon
+
+    def select_changed(self, scores, previous=None):
+        """Boolean mask of rows that actually need to be written."""
+        scores = np.asarray(scores, dtype=np.float64)
+        if previous is None:
+            return np.ones(len(scores), dtype=bool)
+
+        previous = np.asarray(previous, dtype=np.float64)
+        # Never-scored nodes (NaN) are always written
+        return np.isnan(previous) | (np.abs(scores - previous) >= self.epsilon)
+
+    async def write(self, session, addresses, scores, previous=None):
+        """
+        Writes changed scores and returns a report:
+        {"written": int, "skipped": int, "chunks": int}
+        """
+        mask = self.select_changed(scores, previous)
+        idx = np.flatnonzero(mask)
+
+        rows = [{"address": addresses[i], "score": float(scores[i])} for i in idx]
+        chunks = await write_in_chunks(session, SCORE_WRITE_QUERY, rows, self.chunk_size)
+
+        return {
+            "written": int(len(idx)),
+            "skipped": int(len(mask) - len(idx)),
+            "chunks": chunks,
+        }
+
+
+async def write_in_chunks(session, query, rows, chunk_size):
+    """
+    Runs `query` (which must UNWIND $rows) once per chunk, each chunk in its
+    own managed write transaction. Returns the number of chunks sent.
+    """
+    chunks = 0
+    for start in range(0, len(rows), chunk_size):
+        await session.execute_write(_write_chunk, query, rows[start:start + chunk_size])
+        chunks += 1
+    return chunks
+
+
+async def _write_chunk(tx, query, rows):
+    result = await tx.run(query, rows=rows)
+    await result.consume()
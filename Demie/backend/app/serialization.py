@@ -0,0 +1,83 @@
+import json
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Content negotiation for the large list endpoints (?layout=columnar)
+LAYOUTS = ("records", "columnar")
+# Query(pattern=...) accepting exactly the layouts above
+LAYOUT_PATTERN = "^(" + "|".join(LAYOUTS) + ")$"
+
+
+def _default(value):
+    # neo4j temporal/spatial values, numpy scalars, Decimals...
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def dumps(content):
+    """Compact JSON bytes; orjson when installed, stdlib otherwise."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson. Endpoints returning it directly also
+    skip FastAPI's jsonable_encoder pass over every record.
+    """
+
+    def render(self, content):
+        return dumps(content)
+
+
+def columnar(records, keys):
+    """List of dicts -> one array per key (keys written once, not per row)."""
+    return {key: [r.get(key) for r in records] for key in keys}
+
+
+def dictionary_encode(values, table, index):
+    """Codes of `values` in `table`, appending unseen values to it."""
+    codes = []
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(table)
+            table.append(value)
+        codes.append(code)
+    return codes
+
+
+def columnar_graph(nodes, links):
+    """
+    Columnar layout of a node/link projection:
+
+        addresses            every address once
+        nodes.address        index into addresses (+ one array per node field)
+        links.source/target  index pairs into addresses
+        links.relationship_type  index into relationship_types
+    """
+    addresses, index = [], {}
+    node_columns = columnar(nodes, [k for k in (nodes[0] if nodes else {}) if k != "address"])
+    node_columns["address"] = dictionary_encode([n["address"] for n in nodes], addresses, index)
+
+    types, type_index = [], {}
+    link_columns = {
+        "source": dictionary_encode([l["source"] for l in links], addresses, index),
+        "target": dictionary_encode([l["target"] for l in links], addresses, index),
+        "relationship_type": dictionary_encode(
+            [l.get("relationship_type") for l in links], types, type_index
+        ),
+    }
+    return {
+        "layout": "columnar",
+        "addresses": addresses,
+        "relationship_types": types,
+        "nodes": node_columns,
+        "links": link_columns,
+    }
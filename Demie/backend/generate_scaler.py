@@ -2,6 +2,8 @@ import pandas as pd
 import joblib
 import os
 from sklearn.preprocessing import StandardScaler
+from app.feature_store import FeatureStore, save_columns, SCALER_COLUMNS_PATH
+from app.routers.config import settings
 
 # 1. Load training dataset
 DATA_PATH = 'transaction_dataset.csv'
@@ -29,9 +31,19 @@ else:
     # Fill missing values with 0 to match typical GNN training preprocessing
     scaler.fit(feature_df.fillna(0))
 
-    # 4. Save the new scaler
+    # 4. Save the new scaler and its column order next to it
     os.makedirs('data', exist_ok=True)
     joblib.dump(scaler, SCALER_PATH)
-    
+    save_columns(feature_df.columns, SCALER_COLUMNS_PATH)
+
     print(f"[*] SUCCESS: New 45-feature scaler saved to {SCALER_PATH}")
-    print(f"[*] Feature Order: {list(feature_df.columns)}")
\ No newline at end of file
+    print(f"[*] Feature Order: {list(feature_df.columns)} (saved to {SCALER_COLUMNS_PATH})")
+
+    # 5. Rebuild the memory-mapped feature store (raw + pre-scaled rows per address)
+    FeatureStore.build(
+        settings.FEATURE_STORE_DIR,
+        df['Address'].values,
+        feature_df.fillna(0).values,
+        scaler,
+        feature_df.columns,
+    )
\ No newline at end of file
@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+from app.database import driver
+from app.schema import SchemaMigrator
+
+
+async def run(args):
+    try:
+        return await _run(args)
+    finally:
+        await driver.close()
+
+
+async def _run(args):
+    migrator = SchemaMigrator()
+    async with driver.session() as session:
+        # 1. Status: applied vs pending versions
+        pending = await migrator.pending(session)
+        print(f"[*] {len(migrator.migrations) - len(pending)} applied, {len(pending)} pending")
+        for version, description, _ in pending:
+            print(f"    pending {version}: {description}")
+
+        # 2. Apply
+        if not args.status and not args.explain_only:
+            await migrator.migrate(session)
+
+        # 3. SENT edges the history indexes miss
+        await migrator.unindexed_transfers(session)
+
+        # 4. Hot-query plans
+        if not args.status:
+            report = await migrator.explain(session)
+            scans = [name for name, plan in report.items() if plan["scan"]]
+            if scans:
+                print(f"[!] Still scanning: {', '.join(scans)}")
+                return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply Neo4j schema migrations and check hot-query plans.")
+    parser.add_argument('--status', action='store_true', help="only list applied/pending migrations")
+    parser.add_argument('--explain-only', action='store_true', help="skip migrating, only log EXPLAIN plans")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,227 @@
+import argparse
+import os
+import resource
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+import torch
+from app.core.gat_engine import DeMIE_GATv2
+from app.core.graph_builder import build_csr
+from app.core.batch_inference import NeighborSampledInference
+from app.core.inference import build_inference_model, INFERENCE_BACKENDS
+
+MODEL_PATH = 'data/demie_gatv2_weights.pth'
+SCALER_PATH = 'data/scaler.pkl'
+# Row-aligned with processed_graph_data.pt: supplies addresses and flags
+NODES_PATH = 'data/nodes_final.csv'
+
+# Per-worker state, set once by _init_worker
+_worker = {}
+
+
+def load_model(seed):
+    """DeMIE_GATv2 as the service loads it; the seed pins any layer the weights do not cover."""
+    torch.manual_seed(seed)
+    model = DeMIE_GATv2(in_channels=45, hidden_channels=32, out_channels=2)
+    model.eval()
+    if os.path.exists(MODEL_PATH):
+        try:
+            model.load_state_dict(torch.load(MODEL_PATH, map_location=torch.device('cpu'), weights_only=False))
+        except Exception as e:
+            print(f"[!] Model Load Error: {e}")
+    return model
+
+
+def _init_worker(state_dict, backend, source, fanout, threads):
+    torch.set_num_threads(threads)
+    model = DeMIE_GATv2(in_channels=45, hidden_channels=32, out_channels=2)
+    model.load_state_dict(state_dict)
+    forward = build_inference_model(model, backend)
+    _worker['forward'] = forward
+
+    if source.endswith('.pt'):
+        # mmap: every worker shares the tensor pages instead of unpickling a copy
+        graph = torch.load(source, map_location=torch.device('cpu'), weights_only=False, mmap=True)
+        x = graph.x.float()
+        _worker['x'] = x
+        _worker['csr'] = build_csr(graph.edge_index.long(), graph.num_nodes)
+        _worker['engine'] = NeighborSampledInference(forward, fanout=fanout)
+
+
+def _to_scores(logits):
+    # Same temperature-scaled softmax as PredictionService
+    return torch.softmax(logits.float() / 0.7, dim=1)[:, 1].numpy()
+
+
+def _score_graph_chunk(task):
+    """Scores target rows [start, stop) of the .pt graph over their full incoming 2-hop field."""
+    start, stop = task
+    x = _worker['x']
+    targets = np.arange(start, stop, dtype=np.int64)
+    # Seeded per chunk, so sampled fan-outs do not depend on which worker ran it
+    rng = np.random.default_rng(start)
+    logits = _worker['engine'].predict_targets(lambda rows: x[torch.from_numpy(rows)], _worker['csr'], targets, rng)
+    return _to_scores(logits)
+
+
+def _score_table_chunk(X):
+    """Scores pre-scaled rows of a tabular source; it carries no edges, so only self-loops apply."""
+    empty = torch.empty((2, 0), dtype=torch.long)
+    with torch.no_grad():
+        logits = _worker['forward'](torch.from_numpy(X), empty)
+    return _to_scores(logits)
+
+
+def graph_tasks(source, chunk_size):
+    """Yields (row_range, meta DataFrame) per chunk of the .pt graph."""
+    graph = torch.load(source, map_location=torch.device('cpu'), weights_only=False, mmap=True)
+    n = graph.num_nodes
+    meta = pd.DataFrame({'row': np.arange(n)})
+    if os.path.exists(NODES_PATH):
+        nodes = pd.read_csv(NODES_PATH, usecols=['address', 'flag'])
+        if len(nodes) == n:
+            meta['address'] = nodes['address'].values
+            meta['flag'] = nodes['flag'].values
+        else:
+            print(f"[!] {NODES_PATH} has {len(nodes)} rows, graph has {n}; writing row numbers only.")
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        yield (start, stop), meta.iloc[start:stop]
+
+
+def table_tasks(source, chunk_size, scaler):
+    """Yields (scaled float32 matrix, meta DataFrame) per CSV chunk, columns aligned to the scaler."""
+    columns = list(scaler.feature_names_in_)
+    offset = 0
+    for frame in pd.read_csv(source, chunksize=chunk_size):
+        # Missing cells are 0 as in training; columns the source lacks
+        # entirely default to the training mean (0 after scaling)
+        X = frame.reindex(columns=columns).apply(pd.to_numeric, errors='coerce')
+        for i, column in enumerate(columns):
+            if column not in frame.columns:
+                X[column] = scaler.mean_[i]
+        X = scaler.transform(X.fillna(0)).astype(np.float32)
+
+        meta = pd.DataFrame({'row': np.arange(offset, offset + len(frame))})
+        address = 'Address' if 'Address' in frame else 'address'
+        if address in frame:
+            meta['address'] = frame[address].values
+        for flag in ('FLAG', 'flag'):
+            if flag in frame:
+                meta['flag'] = frame[flag].values
+                break
+        offset += len(frame)
+        yield X, meta
+
+
+class ScoreSink:
+    """Streams scored chunks to CSV, or to Parquet when pyarrow is installed."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self._first = True
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a', header=self._first,
+                         index=False, float_format='%.8f')
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-score addresses with DeMIE_GATv2 without Neo4j.")
+    parser.add_argument('--source', default='data/processed_graph_data.pt',
+                        help=".pt graph (scored over its edges) or a .csv feature table (transaction_dataset.csv, data/nodes_final.csv)")
+    parser.add_argument('--out', default='scores.csv', help="Output .csv or .parquet")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument('--chunk-size', type=int, default=4096)
+    parser.add_argument('--backend', default='fused', choices=[b for b in INFERENCE_BACKENDS if b != 'compile'])
+    parser.add_argument('--fanout', type=int, nargs=2, default=[-1, -1], help="In-edges kept per hop for .pt sources (-1 = all)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"[!] Error: {args.source} not found.")
+        return 1
+    if args.out.endswith('.parquet'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("[!] Error: Parquet output requires pyarrow (pip install pyarrow).")
+            return 1
+
+    # 1. Resolve the source into an ordered chunk stream
+    is_graph = args.source.endswith('.pt')
+    if is_graph:
+        tasks = graph_tasks(args.source, args.chunk_size)
+        score_fn = _score_graph_chunk
+    else:
+        scaler = joblib.load(SCALER_PATH)
+        tasks = table_tasks(args.source, args.chunk_size, scaler)
+        score_fn = _score_table_chunk
+
+    # 2. One set of weights for every worker (identical output across runs and worker counts)
+    state_dict = load_model(args.seed).state_dict()
+    threads = max(1, (os.cpu_count() or 1) // max(args.workers, 1))
+    init_args = (state_dict, args.backend, args.source, tuple(args.fanout), threads)
+
+    sink = ScoreSink(args.out)
+    rows = 0
+    start = time.perf_counter()
+    print(f"[*] Scoring {args.source} -> {args.out} ({args.workers} workers, chunks of {args.chunk_size})")
+
+    def emit(meta, scores):
+        nonlocal rows
+        frame = meta.copy()
+        frame['integrity_risk_score'] = scores
+        sink.write(frame)
+        rows += len(frame)
+
+    # 3. Score chunks in parallel; results are written in source order
+    try:
+        if args.workers <= 1:
+            _init_worker(*init_args)
+            for payload, meta in tasks:
+                emit(meta, score_fn(payload))
+        else:
+            context = mp.get_context('spawn')
+            with ProcessPoolExecutor(args.workers, mp_context=context, initializer=_init_worker, initargs=init_args) as pool:
+                pending = []
+                for payload, meta in tasks:
+                    pending.append((meta, pool.submit(score_fn, payload)))
+                    # Bounded look-ahead keeps memory flat on large sources
+                    while len(pending) > 2 * args.workers:
+                        meta_done, future = pending.pop(0)
+                        emit(meta_done, future.result())
+                for meta_done, future in pending:
+                    emit(meta_done, future.result())
+    finally:
+        sink.close()
+
+    # 4. Throughput and memory report
+    elapsed = time.perf_counter() - start
+    main_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"[*] Scored {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"[*] Peak RSS: main {main_rss:.0f} MB, largest worker {child_rss:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
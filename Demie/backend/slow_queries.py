@@ -0,0 +1,43 @@
+import argparse
+from app.query_log import read_entries, top_offenders
+from app.routers.config import settings
+
+
+def print_plan(tree, depth=0):
+    if not tree:
+        return
+    print(f"      {'  ' * depth}{tree['operator']}  db_hits={tree['db_hits']} rows={tree['rows']}")
+    for child in tree["children"]:
+        print_plan(child, depth + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the slowest named Cypher statements from the slow-query log.")
+    parser.add_argument('--log', default=settings.SLOW_QUERY_LOG_PATH, help="slow-query log path")
+    parser.add_argument('--top', type=int, default=10, help="number of statements to list")
+    parser.add_argument('--by', choices=["total_ms", "max_ms", "count", "db_hits"], default="total_ms",
+                        help="ranking key")
+    parser.add_argument('--plans', action='store_true', help="print the latest PROFILE operator tree")
+    args = parser.parse_args()
+
+    entries = read_entries(args.log)
+    if not entries:
+        print(f"[*] No slow queries logged at {args.log}")
+        return 0
+
+    # 1. Rank statements
+    offenders = top_offenders(entries, by=args.by, limit=args.top)
+    print(f"[*] {len(offenders)} statements from {len(entries)} log entries, ranked by {args.by}")
+    print(f"    {'statement':<36} {'count':>6} {'total ms':>10} {'max ms':>9} {'db hits':>10}")
+    for row in offenders:
+        hits = "-" if row["db_hits"] is None else row["db_hits"]
+        print(f"    {row['name']:<36} {row['count']:>6} {row['total_ms']:>10.0f} {row['max_ms']:>9.0f} {hits:>10}")
+        # 2. Parameter shapes and plan of each
+        print(f"      params: {row['params']}")
+        if args.plans:
+            print_plan(row["plan"])
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,11 @@
+import pytest
+from app.data_version import data_version
+from app.routers.config import settings
+
+# Tests bump the process-wide data version; keep it off data/data_version.json
+@pytest.fixture(autouse=True)
+def isolated_data_version(tmp_path, monkeypatch):
+    path = str(tmp_path / "data_version.json")
+    monkeypatch.setattr(settings, "DATA_VERSION_PATH", path)
+    monkeypatch.setattr(data_version, "path", path)
+    yield data_version
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from app.aggregates import DashboardAggregates
+from app.data_version import data_version
+
+OVERVIEW = {
+    "total_nodes": 4, "avg_risk": 0.5, "eth_at_risk": 12.0,
+    "critical": 1, "moderate": 1, "stable": 2, "mean_irs": 0.5,
+    "avg_sent": 3.0, "avg_received": 2.0, "avg_vol": 1500.0,
+}
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    async def single(self):
+        return self.records[0]
+
+    async def data(self):
+        return self.records
+
+class FakeSession:
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        self.log.append(query)
+        await asyncio.sleep(0)
+        if "total_nodes" in query:
+            return FakeResult([OVERVIEW])
+        if "cluster_size" in query:
+            return FakeResult([{"address": "0xa", "risk": 0.9, "amount": 1.5, "timestamp": None, "cluster_size": 12}])
+        return FakeResult([{"id": "0xa", "score": 90.0}])
+
+# 1. TEST: POLLS SERVED FROM MEMORY UNTIL THE DATA VERSION MOVES
+@pytest.mark.asyncio
+async def test_aggregates_version_invalidation():
+    """Automates verification that dashboard polls hit Neo4j once per data version."""
+    log = []
+    aggregates = DashboardAggregates(session_factory=lambda: FakeSession(log))
+
+    first = await aggregates.get()
+    for _ in range(20):
+        await aggregates.get()
+    assert aggregates.refreshes == 1 and len(log) == 3
+
+    assert first["stats"] == {"total_nodes": 4, "avgRiskScore": 0.5, "valueAtRisk": "12.00 ETH"}
+    assert first["distribution"]["mean_irs"] == "50.0%"
+    assert first["live_feed"][0]["status"] == "CRITICAL_THREAT"
+    assert first["live_feed"][0]["reason"] == "Cluster Expansion"
+
+    # A write bumps the version; a burst of concurrent polls shares one refresh
+    data_version.bump()
+    await asyncio.gather(*(aggregates.get() for _ in range(10)))
+    assert aggregates.refreshes == 2 and aggregates.version == data_version.current()
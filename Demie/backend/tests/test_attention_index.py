@@ -0,0 +1,84 @@
+import numpy as np
+import torch
+from app.attention_index import AttentionIndex, TopKAttention
+from app.core.batch_inference import NeighborSampledInference
+from app.core.gat_engine import DeMIE_GATv2
+from app.core.inference import build_inference_model
+
+# 1. TEST: TOP-K SELECTION AND O(k) LOOKUP
+def test_attention_index_top_k(tmp_path):
+    """Automates verification that each address keeps only its k strongest incoming edges."""
+    collector = TopKAttention(num_rows=4, k=2)
+    collector.add(
+        dst=np.array([0, 0, 0, 1]),
+        src=np.array([1, 2, 3, 0]),
+        alpha=np.array([0.2, 0.5, 0.3, 1.0], dtype=np.float32),
+    )
+    index = AttentionIndex(str(tmp_path / "attention"), k=2)
+    index.build(np.array(["0xA", "0xb", "0xc", "0xd"], dtype=object), collector)
+
+    reopened = AttentionIndex(str(tmp_path / "attention"))
+    assert reopened.load() and reopened.k == 2
+    assert reopened.top("0xa") == [{"address": "0xc", "attention": 0.5}, {"address": "0xd", "attention": 0.3}]
+    assert reopened.top("0xa", limit=1) == [{"address": "0xc", "attention": 0.5}]
+    assert reopened.top("0xc") == []
+    assert reopened.top("0xzz") is None
+
+    # Incremental upsert: new counterparty appended, target row replaced
+    reopened.upsert(np.array(["0xb"], dtype=object), np.array([["0xnew", None]], dtype=object),
+                    np.array([[0.9, 0.0]], dtype=np.float32))
+    assert reopened.top("0xb") == [{"address": "0xnew", "attention": 0.9}]
+    assert reopened.top("0xa")[0]["address"] == "0xc"
+
+# 2. TEST: UPSERT WRITES ONLY THE TOUCHED ROWS
+def test_attention_upsert_writes_delta_segment(tmp_path):
+    """Automates verification that an incremental upsert appends a delta segment merged on load."""
+    collector = TopKAttention(num_rows=4, k=2)
+    collector.add(dst=np.array([0, 0]), src=np.array([1, 2]), alpha=np.array([0.6, 0.4], dtype=np.float32))
+    directory = tmp_path / "attention"
+    index = AttentionIndex(str(directory), k=2, compact_ratio=1.0)
+    index.build(np.array(["0xa", "0xb", "0xc", "0xd"], dtype=object), collector)
+    base = {name: (directory / f"{name}.npy").read_bytes() for name in AttentionIndex.FILES}
+
+    index.upsert(np.array(["0xB"], dtype=object), np.array([["0xa", "0xnew"]], dtype=object),
+                 np.array([[0.7, 0.3]], dtype=np.float32))
+    assert {name: (directory / f"{name}.npy").read_bytes() for name in AttentionIndex.FILES} == base
+    assert sorted(p.name for p in directory.glob("delta-*")) == ["delta-000001.npz"]
+
+    # A reopened index merges the segment over the base rows
+    reopened = AttentionIndex(str(directory), compact_ratio=1.0)
+    assert reopened.load()
+    assert reopened.top("0xb") == [{"address": "0xa", "attention": 0.7}, {"address": "0xnew", "attention": 0.3}]
+    assert reopened.top("0xnew") == []
+    assert reopened.top("0xa") == [{"address": "0xb", "attention": 0.6}, {"address": "0xc", "attention": 0.4}]
+
+    # Past the ratio the overlay is folded into a full rewrite
+    reopened.compact_ratio = 0.5
+    reopened.upsert(np.array(["0xc"], dtype=object), np.array([["0xd", None]], dtype=object),
+                    np.array([[0.5, 0.0]], dtype=np.float32))
+    assert list(directory.glob("delta-*")) == [] and reopened.overlay == {}
+    assert reopened.meta["rows"] == 5
+    assert reopened.top("0xb")[1] == {"address": "0xnew", "attention": 0.3}
+    assert reopened.top("0xc") == [{"address": "0xd", "attention": 0.5}]
+
+# 3. TEST: ATTENTION COLLECTED DURING BATCHED SCORING
+def test_batched_attention_matches_full_pass():
+    """Automates verification that per-batch attention equals the full-graph conv1 attention."""
+    torch.manual_seed(0)
+    model = DeMIE_GATv2(in_channels=45, hidden_channels=8, out_channels=2).eval()
+    forward = build_inference_model(model, "fused")
+    x = torch.randn(30, 45)
+    edge_index = torch.randint(0, 30, (2, 90))
+    edge_index = edge_index[:, edge_index[0] != edge_index[1]].unique(dim=1)
+
+    collector = TopKAttention(30, k=3)
+    NeighborSampledInference(forward, batch_size=7).predict(x, edge_index, 30, attention=collector)
+
+    with torch.no_grad():
+        _, (full_index, alpha) = forward(x, edge_index, return_attention=True)
+    full = TopKAttention(30, k=3)
+    keep = full_index[0] != full_index[1]
+    full.add(full_index[1, keep].numpy(), full_index[0, keep].numpy(), alpha.mean(dim=1)[keep].numpy())
+
+    assert np.array_equal(collector.neighbors, full.neighbors)
+    np.testing.assert_allclose(collector.weights, full.weights, atol=1e-5)
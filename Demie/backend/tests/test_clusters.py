@@ -0,0 +1,135 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.clusters import ClusterPage
+from app.data_version import data_version
+from app.database import get_db_session
+from app.main import app
+from app.routers import forensics
+
+MEMBER = "0x" + "a1" * 20
+PROXY = "0x" + "b2" * 20
+
+def _row(address, score):
+    return {"address": address, "integrity_risk_score": score, "risk_level": "HIGH",
+            "amount": 1.0, "fused_count": 1, "confidence": None}
+
+# 1. TEST: KEYSET PAGE CONSTRUCTION
+def test_cluster_page_keyset():
+    """Automates verification that filters and the cursor become index-friendly predicates."""
+    page = ClusterPage(risk_level="high", min_fused_count=3, limit=2)
+    body = page.shape([_row("0xa", 0.9), _row("0xb", 0.9), _row("0xc", 0.8)])
+    assert [n["address"] for n in body["nodes"]] == ["0xa", "0xb"]
+    assert body["next_cursor"] is not None
+
+    following = ClusterPage(risk_level="HIGH", min_fused_count=3, cursor=body["next_cursor"], limit=2)
+    query, params = following.page_query()
+    assert params["after_score"] == 0.9 and params["after_address"] == "0xb"
+    assert params["fetch"] == 3 and params["min_fused_count"] == 3
+    assert "a.integrity_risk_score > 0.75" in query and "rand()" not in query
+
+    # The last page has no cursor; band-only totals come from the dashboard counters
+    assert following.shape([_row("0xc", 0.8)])["next_cursor"] is None
+    assert ClusterPage("LOW").total_from({"critical": 2, "moderate": 3, "stable": 7}) == 7
+    assert ClusterPage().total_from({"critical": 2, "moderate": 3, "stable": 7}) == 12
+
+    # Searches filter server-side, so later pages are searched too
+    query, params = ClusterPage(search=" 0xAB ", limit=2).page_query()
+    assert "a.address STARTS WITH $search" in query and params["search"] == "0xab"
+    query, params = ClusterPage(search="42", search_type="id").page_query()
+    assert "toString(a.community) CONTAINS $search" in query and params["search"] == "42"
+    assert not ClusterPage(search="0xab").band_only and ClusterPage(search="  ").search is None
+
+    with pytest.raises(ValueError):
+        ClusterPage(cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        ClusterPage(risk_level="EXTREME")
+
+# 2. TEST: ENDPOINT PAGING AND CACHED TOTAL
+@pytest.mark.asyncio
+async def test_clusters_endpoint_paging():
+    """Automates verification that /clusters pages by cursor and counts a filter once per data version."""
+    calls = []
+
+    class FakeResult:
+        def __init__(self, records):
+            self.records = records
+
+        async def data(self):
+            return self.records
+
+        async def single(self):
+            return self.records[0]
+
+    class FakeSession:
+        async def run(self, query, params=None):
+            calls.append(query)
+            if "count(a) AS total" in query:
+                return FakeResult([{"total": 42}])
+            return FakeResult([_row("0xa", 0.9), _row("0xb", 0.8)])
+
+    async def fake_session():
+        yield FakeSession()
+
+    app.dependency_overrides[get_db_session] = fake_session
+    # Dashboard counters already materialized for the current version
+    forensics.aggregates.data = {"distribution": {"critical": 2, "moderate": 3, "stable": 7, "mean_irs": "50.0%"}}
+    forensics.aggregates.version = data_version.current()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = await ac.get("/api/clusters", params={"limit": 1, "min_score": 0.7, "include_total": True})
+            again = await ac.get("/api/clusters", params={"limit": 1, "min_score": 0.7, "include_total": True,
+                                                           "cursor": first.json()["next_cursor"]})
+            bad = await ac.get("/api/clusters", params={"cursor": "%%%"})
+    finally:
+        app.dependency_overrides.clear()
+        forensics.aggregates.data = None
+
+    assert first.status_code == 200
+    assert first.json()["total"] == 42 and len(first.json()["nodes"]) == 1
+    assert again.json()["total"] == 42
+    assert first.json()["distribution"] == {"critical": 2, "moderate": 3, "stable": 7}
+    assert sum("count(a) AS total" in q for q in calls) == 1
+    assert bad.status_code == 400 and bad.json()["detail"] == "INVALID_CURSOR"
+
+# 3. TEST: AUDIT DETAILS CACHED PER CLUSTER PROXY
+@pytest.mark.asyncio
+async def test_cluster_details_cached_per_proxy():
+    """Automates verification that every member of a cluster is served from its proxy's cached details."""
+    calls = []
+
+    class FakeResult:
+        async def data(self):
+            return [
+                {"address": MEMBER, "role": "MEMBER", "individual_score": 0.4, "amount_sent": 1.0,
+                 "amount_received": 0.0, "proxy_address": PROXY,
+                 "cluster_sent": 3.0, "cluster_received": 2.0},
+                {"address": PROXY, "role": "PROXY", "individual_score": 0.9, "amount_sent": 2.0,
+                 "amount_received": 2.0, "proxy_address": PROXY,
+                 "cluster_sent": 3.0, "cluster_received": 2.0},
+            ]
+
+    class FakeSession:
+        async def run(self, query, params=None):
+            calls.append(params)
+            return FakeResult()
+
+    async def fake_session():
+        yield FakeSession()
+
+    app.dependency_overrides[get_db_session] = fake_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = await ac.get(f"/api/clusters/{MEMBER}/details")
+            proxy = await ac.get(f"/api/clusters/{PROXY}/details")
+            again = await ac.get(f"/api/clusters/{MEMBER}/details")
+    finally:
+        app.dependency_overrides.clear()
+
+    # The member's first lookup cached the whole cluster under its proxy
+    assert first.status_code == 200 and proxy.status_code == 200 and again.status_code == 200
+    assert len(calls) == 1
+    assert proxy.json()["integrity_risk_score"] == 0.9 and again.json()["integrity_risk_score"] == 0.4
+    assert proxy.json()["members"] == first.json()["members"]
+    assert first.json()["fused_count"] == 2 and first.json()["cluster_volume"] == {"sent": 3.0, "received": 2.0}
+    assert "proxy_address" not in first.json()["members"][0]
+    assert forensics.cluster_details.get((PROXY, data_version.current())) is not None
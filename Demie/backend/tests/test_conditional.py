@@ -0,0 +1,58 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.conditional import etag_matches, version_etag
+from app.data_version import DataVersion, data_version
+from app.database import get_db_session
+from app.main import app
+
+# 1. TEST: VERSION SURVIVES RESTARTS
+def test_data_version_persisted(tmp_path):
+    """Automates verification that the data version is reloaded monotonically after a restart."""
+    path = str(tmp_path / "version.json")
+    version = DataVersion(path)
+    assert version.current() == 0
+    version.bump()
+    version.bump()
+    assert DataVersion(path).current() == 2
+    assert DataVersion(str(tmp_path / "missing.json")).current() == 0
+
+    etag = version_etag(2, 0)
+    assert etag == 'W/"2.0"'
+    assert etag_matches('"1.0", W/"2.0"', etag) and etag_matches("*", etag)
+    assert not etag_matches('W/"1.0"', etag) and not etag_matches("", etag)
+
+# 2. TEST: 304 WITHOUT TOUCHING NEO4J
+@pytest.mark.asyncio
+async def test_conditional_get_skips_database():
+    """Automates verification that a matching If-None-Match is answered 304 before the endpoint runs."""
+    calls = []
+
+    class FakeResult:
+        async def data(self):
+            return [{"address": "0xa", "integrity_risk_score": 0.9, "risk_level": "HIGH",
+                     "amount": 1.0, "fused_count": 1, "confidence": None}]
+
+    class FakeSession:
+        async def run(self, query, params=None):
+            calls.append(query)
+            return FakeResult()
+
+    async def fake_session():
+        yield FakeSession()
+
+    app.dependency_overrides[get_db_session] = fake_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get("/api/clusters")
+            etag = first.headers["etag"]
+            assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+            assert etag == version_etag(data_version.current())
+
+            cached = await client.get("/api/clusters", headers={"If-None-Match": etag})
+            assert cached.status_code == 304 and cached.content == b"" and len(calls) == 1
+
+            data_version.bump()
+            fresh = await client.get("/api/clusters", headers={"If-None-Match": etag})
+            assert fresh.status_code == 200 and fresh.headers["etag"] != etag and len(calls) == 2
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,47 @@
+import numpy as np
+import numpy.testing as npt
+from sklearn.preprocessing import StandardScaler
+from app.feature_store import FeatureStore
+
+COLUMNS = [f"f{i}" for i in range(45)]
+
+def _scaler(raw):
+    return StandardScaler().fit(raw)
+
+# 1. TEST: BUILD, MEMORY-MAPPED LOOKUP AND PRE-SCALED ROWS
+def test_feature_store_roundtrip(tmp_path):
+    """Automates verification that stored rows come back pre-scaled, by address, from a read-only map."""
+    rng = np.random.default_rng(0)
+    raw = rng.normal(size=(4, 45)).astype(np.float32)
+    scaler = _scaler(raw)
+    FeatureStore.build(str(tmp_path), ["0xC", "0xa", "0xb", "0xd"], raw, scaler, COLUMNS)
+
+    store = FeatureStore(str(tmp_path))
+    assert store.open(expected_columns=COLUMNS) is True
+    assert isinstance(store.scaled, np.memmap) and not store.scaled.flags.writeable
+
+    rows, found = store.lookup(["0xb", "0xzz", "0xc"])
+    assert found.tolist() == [True, False, True]
+    npt.assert_allclose(store.scaled_rows(rows[found]), scaler.transform(raw[[2, 0]]), rtol=1e-5, atol=1e-5)
+
+    # A different column order must not be trusted
+    assert FeatureStore(str(tmp_path)).open(expected_columns=COLUMNS[::-1]) is False
+
+# 2. TEST: UPSERT KEEPS THE SCALED COPY IN SYNC
+def test_feature_store_upsert(tmp_path):
+    """Automates verification of in-place updates and appends on write."""
+    raw = np.arange(2 * 45, dtype=np.float32).reshape(2, 45)
+    scaler = _scaler(np.vstack([raw, raw + 1]))
+    store = FeatureStore.build(str(tmp_path), ["0xa", "0xb"], raw, scaler, COLUMNS)
+
+    update = np.full((2, 45), 7.0, dtype=np.float32)
+    report = store.upsert(["0xb", "0xnew"], update, scaler)
+    assert report == {"updated": 1, "appended": 1}
+
+    reopened = FeatureStore(str(tmp_path))
+    reopened.open()
+    assert reopened.num_rows == 3
+    rows, found = reopened.lookup(["0xa", "0xb", "0xnew"])
+    assert found.all()
+    npt.assert_allclose(reopened.raw[rows], np.vstack([raw[0], update]))
+    npt.assert_allclose(reopened.scaled_rows(rows), scaler.transform(np.vstack([raw[0], update])), rtol=1e-5, atol=1e-5)
@@ -0,0 +1,127 @@
+import pytest
+import numpy as np
+from app.cluster_metrics import ClusterVolumes, MEMBER_VOLUME_QUERY, CLUSTER_TOTALS_QUERY
+from app.fusion import FusionStage
+from app.graph_extract import ExtractedGraph
+
+def _graph(communities, edges, fused_counts=None):
+    n = len(communities)
+    ids = np.arange(10, 10 + n, dtype=np.int64)
+    src = np.array([ids[s] for s, _, _ in edges], dtype=np.int64)
+    dst = np.array([ids[d] for _, d, _ in edges], dtype=np.int64)
+    names = ["SENT", "FUSED_TO"]
+    types = np.array([names.index(r) for _, _, r in edges], dtype=np.int64)
+    return ExtractedGraph(
+        node_ids=ids,
+        addresses=np.array([f"0x{i}" for i in range(n)], dtype=object),
+        features=np.full((n, 5), np.nan),
+        scores=np.full(n, np.nan),
+        src=src, dst=dst, edge_types=types, edge_type_names=names,
+        communities=np.array(communities, dtype=object),
+        fused_counts=np.full(n, np.nan) if fused_counts is None else np.array(fused_counts, dtype=float),
+    )
+
+# 1. TEST: INHERITANCE, PROXY SELECTION AND FUSED_TO DELTA
+def test_fusion_plan_delta():
+    """Automates verification of the in-memory fusion group-bys against stored state."""
+    # Rows 0-2 in cluster A, row 3 untagged but SENT-linked to row 1, row 4 in cluster B alone.
+    # Row 2 still points at the old proxy (row 0) and must be retargeted.
+    graph = _graph(
+        ["A", "A", "A", None, "B"],
+        [(3, 1, "SENT"), (2, 0, "FUSED_TO")],
+        fused_counts=[2, np.nan, np.nan, np.nan, np.nan],
+    )
+    scores = np.array([0.2, 0.9, 0.5, 0.1, 0.7])
+
+    plan = FusionStage().plan(graph, scores)
+
+    assert plan.inherited.tolist() == [3]
+    assert plan.labels[plan.codes[3]] == "A"
+    assert sorted(map(tuple, plan.create.T.tolist())) == [(0, 1), (2, 1), (3, 1)]
+    assert plan.delete.T.tolist() == [[2, 0]]
+    # Proxy 1 gains three members, old proxy 0 is reset; singleton cluster B gets no count
+    rows, counts = plan.counts
+    assert rows.tolist() == [0, 1] and counts.tolist() == [0, 4]
+    # Every member of A sees a 4-node cluster; singleton B is left unset
+    rows, sizes = plan.sizes
+    assert rows.tolist() == [0, 1, 2, 3] and sizes.tolist() == [4, 4, 4, 4]
+
+    # Already-fused state produces an empty delta
+    fused = _graph(
+        ["A", "A", "A", "A", "B"],
+        [(0, 1, "FUSED_TO"), (2, 1, "FUSED_TO"), (3, 1, "FUSED_TO")],
+        fused_counts=[np.nan, 4, np.nan, np.nan, np.nan],
+    )
+    plan = FusionStage().plan(fused, scores)
+    assert plan.create.shape[1] == 0 and plan.delete.shape[1] == 0
+    assert len(plan.inherited) == 0 and len(plan.counts[0]) == 0
+    assert plan.sizes[0].tolist() == [0, 1, 2, 3]
+    fused.cluster_sizes = np.array([4, 4, 4, 4, np.nan])
+    assert len(FusionStage().plan(fused, scores).sizes[0]) == 0
+
+# 2. TEST: SCOPED INHERITANCE AND CHUNKED APPLY
+@pytest.mark.asyncio
+async def test_fusion_apply_writes_id_rows():
+    """Automates verification that the delta is written as id-keyed UNWIND chunks."""
+    class FakeSession:
+        def __init__(self):
+            self.calls = []
+
+        async def execute_write(self, fn, query, rows):
+            self.calls.append((query, rows))
+
+    graph = _graph(["A", None, None], [(1, 0, "SENT"), (2, 0, "SENT")])
+    stage = FusionStage(chunk_size=1)
+    # Only row 1 is in the affected set
+    plan = stage.plan(graph, np.array([0.9, 0.1, 0.2]), inherit_rows=np.array([False, True, False]))
+
+    session = FakeSession()
+    report = await stage.apply(session, graph, plan)
+
+    assert report == {"inherited": 1, "fused_created": 1, "fused_removed": 0, "counts_updated": 1, "sizes_updated": 2}
+    rows = [r for _, chunk in session.calls for r in chunk]
+    assert {"id": 11, "community": "A"} in rows
+    assert {"src": 11, "dst": 10} in rows
+    assert {"id": 10, "count": 2} in rows
+    assert {"id": 10, "size": 2} in rows and {"id": 11, "size": 2} in rows
+
+# 3. TEST: VOLUME ROLLUPS WRITTEN PER MEMBER, THEN PER CLUSTER
+@pytest.mark.asyncio
+async def test_cluster_volumes_refresh_order():
+    """Automates verification that member volumes are written before the proxy totals that sum them."""
+    class FakeSession:
+        def __init__(self):
+            self.calls = []
+
+        async def execute_write(self, fn, query, rows):
+            self.calls.append((query, rows))
+
+    session = FakeSession()
+    refreshed = await ClusterVolumes(chunk_size=2).refresh(session, np.array([10, 11, 12]))
+
+    assert refreshed == 3
+    assert [q for q, _ in session.calls] == [MEMBER_VOLUME_QUERY] * 2 + [CLUSTER_TOTALS_QUERY] * 2
+    assert session.calls[0][1] == [{"id": 10}, {"id": 11}]
+    # Volumes only move when they changed (no write amplification on re-runs)
+    assert "m.sent_volume <> sent" in MEMBER_VOLUME_QUERY
+
+# 4. TEST: A PROXY THAT LOSES ITS MEMBERS IS RESET
+def test_fusion_resets_emptied_proxy():
+    """Automates verification that a former proxy left without members gets fused_count 0, then stays quiet."""
+    # Row 0 fused rows 1 and 2; both have since moved to clusters of their own
+    graph = _graph(
+        ["A", "B", "C"],
+        [(1, 0, "FUSED_TO"), (2, 0, "FUSED_TO")],
+        fused_counts=[3, np.nan, np.nan],
+    )
+    scores = np.array([0.9, 0.5, 0.4])
+
+    plan = FusionStage().plan(graph, scores)
+    assert sorted(map(tuple, plan.delete.T.tolist())) == [(1, 0), (2, 0)]
+    rows, counts = plan.counts
+    assert rows.tolist() == [0] and counts.tolist() == [0]
+
+    # Re-planned once the reset is stored: nothing left to write
+    replanned = _graph(["A", "B", "C"], [], fused_counts=[0, np.nan, np.nan])
+    plan = FusionStage().plan(replanned, scores)
+    assert len(plan.counts[0]) == 0 and plan.delete.shape[1] == 0
@@ -48,4 +48,101 @@ def test_gat_output_probabilities():
     out, _ = model(x, edge_index)
     
     # log_softmax values should be <= 0
-    assert torch.all(out <= 0)
\ No newline at end of file
+    assert torch.all(out <= 0)
+
+# 4. TEST: 2-HOP LOCALITY (INCREMENTAL RE-SCORING PREMISE)
+def test_gat_two_hop_receptive_field_is_exact():
+    """Automates verification that a node's score only depends on its incoming 2-hop field."""
+    torch.manual_seed(0)
+    model = DeMIE_GATv2(in_channels=45, hidden_channels=16, out_channels=2)
+    model.eval()
+
+    num_nodes = 30
+    x = torch.randn((num_nodes, 45))
+    edge_index = torch.randint(0, num_nodes, (2, 80))
+
+    with torch.no_grad():
+        full, _ = model(x, edge_index)
+
+    # Incoming 2-hop field of the targets
+    targets = {0, 1}
+    field = set(targets)
+    for _ in range(2):
+        field |= {int(s) for s, d in edge_index.t().tolist() if d in field}
+
+    nodes = sorted(field)
+    local = {n: i for i, n in enumerate(nodes)}
+    keep = [i for i, (s, d) in enumerate(edge_index.t().tolist()) if s in local and d in local]
+    sub_edges = torch.tensor(
+        [[local[int(edge_index[0, i])] for i in keep], [local[int(edge_index[1, i])] for i in keep]],
+        dtype=torch.long,
+    ).reshape(2, -1)
+
+    with torch.no_grad():
+        sub, _ = model(x[nodes], sub_edges)
+
+    for t in targets:
+        assert torch.allclose(sub[local[t]], full[t], atol=1e-5)
+
+
+# 5. TEST: FROZEN INFERENCE PATH EQUIVALENCE
+def test_fused_inference_matches_eager():
+    """Automates verification that BatchNorm folding leaves scores unchanged."""
+    from app.core.inference import build_inference_model
+
+    torch.manual_seed(0)
+    model = DeMIE_GATv2(in_channels=45, hidden_channels=32, out_channels=2)
+    # Non-trivial running statistics so the fold is actually exercised
+    model.bn1.module.running_mean.uniform_(-1, 1)
+    model.bn1.module.running_var.uniform_(0.5, 2)
+    model.eval()
+
+    x = torch.randn((20, 45))
+    edge_index = torch.randint(0, 20, (2, 60))
+
+    fused = build_inference_model(model, "fused")
+    with torch.no_grad():
+        expected, _ = model(x, edge_index)
+        out = fused(x, edge_index)
+
+    assert torch.allclose(out, expected, atol=1e-5)
+    # The source model is left untouched
+    assert model.conv1.bias is not None
+
+
+# 6. TEST: REDUCED-PRECISION INFERENCE
+def test_quantized_inference_close_to_float():
+    """Automates verification that int8/bf16 scoring stays near the float32 scores."""
+    from app.core.inference import build_inference_model
+
+    torch.manual_seed(0)
+    model = DeMIE_GATv2(in_channels=45, hidden_channels=32, out_channels=2)
+    model.eval()
+    x = torch.randn((40, 45))
+    edge_index = torch.randint(0, 40, (2, 120))
+
+    with torch.no_grad():
+        base = build_inference_model(model, "fused")(x, edge_index).exp()[:, 1]
+        for mode in ("int8", "bf16"):
+            out = build_inference_model(model, "fused", mode)(x, edge_index)
+            assert out.dtype == torch.float32
+            assert torch.all(out <= 0)
+            assert (out.exp()[:, 1] - base).abs().max() < 0.1
+
+
+# 7. TEST: WARM-UP COVERS THE ATTENTION SIGNATURE
+def test_warm_up_attention_signature():
+    """Automates verification that warm-up also runs return_attention=True when attention is collected."""
+    from app.core.inference import build_inference_model, warm_up
+
+    calls = []
+    warm_up(lambda x, edge_index, **kwargs: calls.append(kwargs), in_channels=45, passes=2)
+    assert calls == [{}, {}]
+
+    calls.clear()
+    warm_up(lambda x, edge_index, **kwargs: calls.append(kwargs), in_channels=45, passes=2, attention=True)
+    assert calls == [{}, {"return_attention": True}] * 2
+
+    # The real inference path accepts both signatures
+    model = DeMIE_GATv2(in_channels=45, hidden_channels=8, out_channels=2).eval()
+    assert warm_up(build_inference_model(model, "fused"), in_channels=45, passes=1, attention=True) >= 0
@@ -0,0 +1,41 @@
+import torch
+import numpy as np
+from app.core.graph_builder import DenseIdMap, build_edge_index
+
+# 1. TEST: DENSE ID REMAPPING
+def test_dense_id_map_lookup():
+    """Automates verification that unsorted Neo4j ids map back to their rows."""
+    id_map = DenseIdMap([40, 7, 19])
+    idx, found = id_map.lookup([7, 40, 5, 19, 99])
+    assert found.tolist() == [True, True, False, True, False]
+    assert idx[found].tolist() == [1, 0, 2]
+
+    # Widely spread ids fall back to the sorted-array map
+    sparse = DenseIdMap([10**12, 7, 19])
+    idx, found = sparse.lookup([19, 10**12, 8])
+    assert found.tolist() == [True, True, False]
+    assert idx[found].tolist() == [2, 0]
+
+# 2. TEST: DEDUPLICATION AND SYMMETRIZATION
+def test_edge_index_dedupe_and_symmetrize():
+    """Automates verification of duplicate collapsing and mirrored edges."""
+    id_map = DenseIdMap([10, 20, 30])
+    src = [10, 10, 20]
+    dst = [20, 20, 30]
+
+    directed = build_edge_index(id_map, src, dst)
+    assert directed.tolist() == [[0, 1], [1, 2]]
+
+    raw = build_edge_index(id_map, src, dst, dedupe=False)
+    assert raw.shape == (2, 3)
+
+    both = build_edge_index(id_map, src, dst, symmetrize=True)
+    pairs = set(zip(both[0].tolist(), both[1].tolist()))
+    assert pairs == {(0, 1), (1, 0), (1, 2), (2, 1)}
+    assert both.is_contiguous() and both.dtype == torch.long
+
+# 3. TEST: EMPTY INPUTS
+def test_edge_index_empty():
+    """Automates verification of the zero-edge shape GATv2Conv expects."""
+    edge_index = build_edge_index(DenseIdMap([]), np.array([1]), np.array([2]))
+    assert edge_index.shape == (2, 0)
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+import numpy as np
+from app.graph_extract import GraphExtractor, FEATURE_PROPERTIES
+
+# Minimal in-memory stand-in for an AsyncSession
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    def __aiter__(self):
+        self._it = iter(self.records)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def single(self):
+        return self.records[0]
+
+class FakeSession:
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
+        self.queries = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        self.queries.append(query)
+        if "count(n)" in query:
+            return FakeResult([{"total": len(self.nodes)}])
+        if "count(r)" in query:
+            # Counts store is only an upper bound; under-report to exercise growth
+            return FakeResult([{"total": 1}])
+        await asyncio.sleep(0)
+        scope = set(params["scope"]) if "scope" in params else None
+        if "$props" in query:
+            return FakeResult([n for n in self.nodes if scope is None or n["id"] in scope])
+        ids = set(params["ids"])
+        return FakeResult([e for e in self.edges if e["source"] in ids and (scope is None or e["target"] in scope)])
+
+def _node(nid, addr, score=None, feats=None, community=None):
+    return {"id": nid, "address": addr, "score": score,
+            "community": community, "fused_count": None, "cluster_size": None,
+            "features": feats or [None] * len(FEATURE_PROPERTIES)}
+
+# 1. TEST: PAGED EXTRACTION INTO PREALLOCATED ARRAYS
+@pytest.mark.asyncio
+async def test_paged_extraction_fills_arrays():
+    """Automates verification that streamed node pages land in aligned NumPy columns."""
+    nodes = [
+        _node(3, "0xa", 0.4, [1, 2, 3, 4, 5]),
+        _node(7, "0xb"),
+        _node(9, "0xc", 0.9, ["bad", 1, None, 2, 3]),
+    ]
+    edges = [
+        {"source": 3, "target": 7, "rel": "SENT"},
+        {"source": 7, "target": 9, "rel": "FUSED_TO"},
+        {"source": 9, "target": 3, "rel": "SENT"},
+    ]
+    session = FakeSession(nodes, edges)
+    graph = await GraphExtractor(page_size=2, session_factory=lambda **config: session).extract()
+
+    assert graph.num_nodes == 3
+    assert graph.node_ids.tolist() == [3, 7, 9]
+    assert graph.addresses.tolist() == ["0xa", "0xb", "0xc"]
+    assert graph.features[0].tolist() == [1, 2, 3, 4, 5]
+    assert np.isnan(graph.features[2, 0]) and np.isnan(graph.features[2, 2])
+    assert np.isnan(graph.scores[1]) and graph.scores[2] == 0.9
+
+    assert graph.num_edges == 3
+    assert sorted(zip(graph.src.tolist(), graph.dst.tolist())) == [(3, 7), (7, 9), (9, 3)]
+    # One node query for the whole graph, edges fetched per 2-node page
+    assert sum("$props" in q for q in session.queries) == 1
+    assert sum("$ids" in q for q in session.queries) == 2
+    names = [graph.edge_type_names[c] for c in graph.edge_types]
+    assert names.count("SENT") == 2
+
+# 2. TEST: EMPTY GRAPH
+@pytest.mark.asyncio
+async def test_extraction_empty_graph():
+    """Automates verification that an empty database yields empty arrays."""
+    session = FakeSession([], [])
+    graph = await GraphExtractor(session_factory=lambda **config: session).extract()
+    assert graph.num_nodes == 0
+    assert graph.num_edges == 0
+
+# 3. TEST: CONCURRENT EXTRACTIONS ON ONE EXTRACTOR
+@pytest.mark.asyncio
+async def test_concurrent_extractions_isolated():
+    """Automates verification that overlapping extract() calls on a shared extractor keep separate buffers."""
+    nodes = [_node(i, f"0x{i:x}") for i in range(100)]
+    edges = [{"source": i, "target": (i + 1) % 100, "rel": "SENT"} for i in range(100)]
+    extractor = GraphExtractor(page_size=7, session_factory=lambda **config: FakeSession(nodes, edges))
+
+    full, scoped = await asyncio.gather(extractor.extract(), extractor.extract(scope=[1, 2, 3]))
+
+    assert full.num_nodes == 100 and full.num_edges == 100
+    assert full.node_ids.tolist() == list(range(100))
+    assert scoped.node_ids.tolist() == [1, 2, 3]
+    assert sorted(zip(scoped.src.tolist(), scoped.dst.tolist())) == [(1, 2), (2, 3)]
+
+# 4. TEST: SCOPED EXTRACTION SIZED BY THE SCOPE
+@pytest.mark.asyncio
+async def test_scoped_extraction_skips_global_counts():
+    """Automates verification that a scoped extraction never counts the whole graph."""
+    nodes = [_node(i, f"0x{i:x}") for i in range(4)]
+    edges = [{"source": i, "target": j, "rel": "SENT"} for i in range(4) for j in range(4) if i != j]
+    session = FakeSession(nodes, edges)
+    graph = await GraphExtractor(session_factory=lambda **config: session).extract(scope=[0, 1])
+
+    assert not any("count(" in q for q in session.queries)
+    assert graph.node_ids.tolist() == [0, 1]
+    assert sorted(zip(graph.src.tolist(), graph.dst.tolist())) == [(0, 1), (1, 0)]
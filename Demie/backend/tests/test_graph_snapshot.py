@@ -0,0 +1,114 @@
+import pytest
+import numpy as np
+from app.core.graph_builder import DenseIdMap, build_edge_index, build_csr
+from app.graph_extract import ExtractedGraph
+from app.graph_snapshot import GraphSnapshot, merge_graphs
+
+def _graph(ids, edges, scores=None, names=("SENT",)):
+    n = len(ids)
+    return ExtractedGraph(
+        node_ids=np.array(ids, dtype=np.int64),
+        addresses=np.array([f"0x{i}" for i in ids], dtype=object),
+        features=np.arange(n * 5, dtype=np.float64).reshape(n, 5),
+        scores=np.full(n, np.nan) if scores is None else np.array(scores, dtype=float),
+        src=np.array([e[0] for e in edges], dtype=np.int64),
+        dst=np.array([e[1] for e in edges], dtype=np.int64),
+        edge_types=np.array([e[2] if len(e) > 2 else 0 for e in edges], dtype=np.int16),
+        edge_type_names=list(names),
+    )
+
+def _edge_set(graph):
+    return sorted(zip(np.asarray(graph.src).tolist(), np.asarray(graph.dst).tolist()))
+
+# 1. TEST: SAVE / MEMORY-MAPPED LOAD ROUNDTRIP
+def test_snapshot_roundtrip(tmp_path):
+    """Automates verification that a saved version maps back with its CSR, dictionary and watermark."""
+    graph = _graph([10, 11, 12], [(10, 11), (11, 12), (12, 11), (10, 11)])
+    GraphSnapshot(str(tmp_path)).save(graph, watermark=42)
+
+    snap = GraphSnapshot(str(tmp_path))
+    assert snap.load() is True
+    assert snap.version == 1 and snap.watermark == 42
+    assert isinstance(snap.graph.node_ids, np.memmap)
+
+    # The stored CSR is exactly what the extractor path would build
+    edge_index = build_edge_index(DenseIdMap(graph.node_ids), graph.src, graph.dst)
+    indptr, indices = build_csr(edge_index, 3)
+    assert np.array_equal(snap.graph.csr[0], indptr)
+    assert np.array_equal(snap.graph.csr[1], indices)
+    assert _edge_set(snap.graph) == _edge_set(graph)
+
+    rows, found = snap.lookup(["0x12", "0xdead"])
+    assert found.tolist() == [True, False] and rows[0] == 2
+
+# 2. TEST: DELTA MERGE
+def test_merge_replaces_induced_edges():
+    """Automates verification that re-read nodes and their induced edges replace the stale ones."""
+    base = _graph([1, 2, 3], [(1, 2), (2, 3)], scores=[0.1, 0.2, 0.3])
+    # Node 2 and its neighbourhood re-read: edge 2->3 gone, new node 4 with 4->2
+    delta = _graph([2, 3, 4], [(4, 2)], scores=[0.9, 0.3, 0.5])
+
+    merged = merge_graphs(base, delta)
+    assert merged.node_ids.tolist() == [1, 2, 3, 4]
+    assert merged.scores.tolist() == [0.1, 0.9, 0.3, 0.5]
+    assert _edge_set(merged) == [(1, 2), (4, 2)]
+
+# 3. TEST: REFRESH READS ONLY THE DELTA
+@pytest.mark.asyncio
+async def test_refresh_applies_delta_since_watermark(tmp_path):
+    """Automates verification that a refresh pulls the changed subgraph and advances the version."""
+    class FakeResult:
+        def __init__(self, records):
+            self.records = records
+
+        def __aiter__(self):
+            self._it = iter(self.records)
+            return self
+
+        async def __anext__(self):
+            try:
+                return next(self._it)
+            except StopIteration:
+                raise StopAsyncIteration
+
+    class FakeSession:
+        def __init__(self, ids):
+            self.ids = ids
+
+        async def run(self, query, **params):
+            return FakeResult([{"id": i} for i in self.ids])
+
+    class FakeExtractor:
+        def __init__(self):
+            self.calls = []
+
+        async def extract(self, scope=None):
+            self.calls.append(scope)
+            if scope is None:
+                return _graph([1, 2, 3], [(1, 2), (2, 3)])
+            return _graph([2, 4], [(4, 2)])
+
+    snap = GraphSnapshot(str(tmp_path))
+    extractor = FakeExtractor()
+    graph, source = await snap.refresh(FakeSession([2, 4]), extractor, watermark=5)
+    assert source == "rebuild" and graph.num_nodes == 3
+    # Refreshing writes nothing; the run's commit writes one version
+    assert snap.version == 0
+    assert await snap.commit() == 1
+
+    graph, source = await snap.refresh(FakeSession([2, 4]), extractor, watermark=9)
+    assert source == "delta:2" and snap.refreshes_since_rebuild == 1
+    assert extractor.calls == [None, [2, 4]]
+    assert _edge_set(graph) == [(1, 2), (2, 3), (4, 2)]
+    assert await snap.commit() == 2
+    reopened = GraphSnapshot(str(tmp_path))
+    assert reopened.load() and reopened.version == 2 and reopened.watermark == 9
+
+    # Nothing changed: reused as-is, and not counted toward the next rebuild
+    graph, source = await snap.refresh(FakeSession([2, 4]), extractor, watermark=9)
+    assert source == "current" and snap.refreshes_since_rebuild == 1
+
+    # An empty delta moves the watermark without writing a version
+    graph, source = await snap.refresh(FakeSession([]), extractor, watermark=12)
+    assert source == "delta:0" and snap.watermark == 12 and snap.refreshes_since_rebuild == 1
+    assert await snap.commit() == 2
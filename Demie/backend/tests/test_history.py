@@ -0,0 +1,120 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.history import HistoryPage
+from app.database import get_db_session
+from app.main import app
+
+A = "0x" + "a" * 40
+B = "0x" + "b" * 40
+
+def _tx(kind, ts, tx):
+    return {"type": kind, "counterparty": B, "amount": 1.0, "timestamp": ts, "tx_id": tx}
+
+# 1. TEST: KEYSET PAGE CONSTRUCTION AND MERGE
+def test_history_page_keyset():
+    """Automates verification that both directions merge newest first and the cursor seeks past the last row."""
+    page = HistoryPage(A.upper().replace("0X", "0x"), limit=3)
+    queries = page.queries()
+    assert len(queries) == 2
+    assert "r.from_address = $addr" in queries[0][0] and "r.to_address = $addr" in queries[1][0]
+    assert queries[0][1] == {"addr": A, "fetch": 4}
+
+    body = page.shape([
+        [_tx("SENT", 90, "0x9"), _tx("SENT", 50, "0x5"), _tx("SENT", 10, "0x1")],
+        [_tx("RECEIVED", 70, "0x7"), _tx("RECEIVED", 50, "0x6")],
+    ])
+    assert [t["tx_id"] for t in body["items"]] == ["0x9", "0x7", "0x6"]
+
+    following = HistoryPage(A, direction="out", counterparty=B, cursor=body["next_cursor"], limit=3)
+    (query, params), = following.queries()
+    assert params["after_ts"] == 50 and params["after_tx"] == "0x6"
+    assert params["counterparty"] == B and "r.to_address = $counterparty" in query
+    assert "ORDER BY r.timestamp DESC" in query
+
+    # The last page has no cursor
+    assert following.shape([[_tx("SENT", 50, "0x5")]])["next_cursor"] is None
+
+    with pytest.raises(ValueError):
+        HistoryPage(A, cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        HistoryPage(A, direction="sideways")
+
+# 2. TEST: ENDPOINT PAGING AND VALIDATION
+@pytest.mark.asyncio
+async def test_history_endpoint():
+    """Automates verification that /address/{address}/history pages by cursor and rejects bad input."""
+    calls = []
+
+    class FakeResult:
+        def __init__(self, records):
+            self.records = records
+
+        async def data(self):
+            return self.records
+
+    class FakeSession:
+        async def run(self, query, params=None):
+            calls.append(params)
+            return FakeResult([_tx("SENT", 30, "0x3"), _tx("SENT", 20, "0x2")])
+
+    async def fake_session():
+        yield FakeSession()
+
+    app.dependency_overrides[get_db_session] = fake_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            res = await client.get(f"/api/address/{A}/history", params={"direction": "out", "limit": 1})
+            body = res.json()
+            assert res.status_code == 200 and len(calls) == 1
+            assert body["items"][0]["tx_id"] == "0x3" and body["next_cursor"]
+
+            res = await client.get(f"/api/address/{A}/history", params={"cursor": body["next_cursor"], "limit": 1})
+            assert res.status_code == 200 and len(calls) == 3
+            assert calls[-1]["after_ts"] == 30
+
+            assert (await client.get(f"/api/address/{A}/history", params={"cursor": "bad"})).status_code == 400
+            assert (await client.get("/api/address/nope/history")).status_code == 400
+            assert (await client.get(f"/api/address/{A}/history", params={"counterparty": "x"})).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+
+# 3. TEST: SELF-TRANSFERS LISTED ONCE
+def test_history_self_transfer_deduplicated():
+    """Automates verification that a transfer from an address to itself appears once when both directions merge."""
+    page = HistoryPage("0xA", limit=2)
+    body = page.shape([
+        [_tx("SENT", 90, "0x9"), _tx("SENT", 70, "0x7"), _tx("SENT", 60, "0x6")],
+        [_tx("RECEIVED", 90, "0x9"), _tx("RECEIVED", 80, "0x8")],
+    ])
+    assert [(i["type"], i["tx_id"]) for i in body["items"]] == [("SENT", "0x9"), ("RECEIVED", "0x8")]
+    assert body["next_cursor"] is not None
+
+    # The last page: duplicates do not count toward a further page
+    last = page.shape([[_tx("SENT", 50, "0x5")], [_tx("RECEIVED", 50, "0x5")]])
+    assert len(last["items"]) == 1 and last["next_cursor"] is None
+
+# 4. TEST: INGEST SIGNAL BODY IS VALIDATED
+@pytest.mark.asyncio
+async def test_ingest_complete_rejects_malformed_addresses():
+    """Automates verification that a malformed /ingest/complete body is a 422, not a 500, and an empty one still bumps."""
+    calls = []
+
+    class FakeSession:
+        async def run(self, query, params=None, **kwargs):
+            calls.append(query)
+
+    async def fake_session():
+        yield FakeSession()
+
+    app.dependency_overrides[get_db_session] = fake_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            not_strings = await client.post("/api/ingest/complete", json={"addresses": [1, None]})
+            not_a_list = await client.post("/api/ingest/complete", json={"addresses": "0xabc"})
+            empty = await client.post("/api/ingest/complete")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert not_strings.status_code == 422 and not_a_list.status_code == 422
+    assert empty.status_code == 200 and empty.json()["volumes_refreshed"] == 0
+    assert calls == []
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from app.jobs import AnalysisJobManager
+
+# 1. TEST: COALESCING OF CONCURRENT TRIGGERS
+@pytest.mark.asyncio
+async def test_concurrent_triggers_coalesce():
+    """Automates verification that duplicate /analyze triggers share one run."""
+    release = asyncio.Event()
+    runs = []
+
+    async def runner(job):
+        runs.append((job.mode, job.addresses))
+        job.enter_stage("score")
+        await release.wait()
+        return {"nodes_processed": 3}
+
+    manager = AnalysisJobManager(runner)
+    first, coalesced = manager.submit("full")
+    await asyncio.sleep(0)
+    assert coalesced is False and first.status == "RUNNING"
+
+    # A full run in flight covers every other request
+    again, coalesced = manager.submit("incremental", ["0xa"])
+    assert again is first and coalesced is True
+
+    release.set()
+    await manager._task
+    assert first.status == "COMPLETED"
+    assert first.summary == {"nodes_processed": 3}
+    assert [s["name"] for s in first.stages] == ["score"]
+    assert first.stages[0]["duration_ms"] is not None
+    assert runs == [("full", None)]
+
+# 2. TEST: PENDING FOLLOW-UP JOB
+@pytest.mark.asyncio
+async def test_pending_job_absorbs_requests():
+    """Automates verification that requests queued behind a run fold into one job."""
+    release = asyncio.Event()
+
+    async def runner(job):
+        await release.wait()
+        return {}
+
+    manager = AnalysisJobManager(runner)
+    running, _ = manager.submit("incremental", ["0xa"])
+    pending, coalesced = manager.submit("incremental", ["0xb"])
+    assert coalesced is False and pending.status == "QUEUED"
+
+    merged, coalesced = manager.submit("incremental", ["0xc"])
+    assert merged is pending and coalesced is True
+    assert pending.addresses == ["0xb", "0xc"]
+
+    manager.submit("full")
+    assert pending.mode == "full" and pending.addresses is None
+
+    release.set()
+    await manager._task
+    await manager._task
+    assert running.status == "COMPLETED" and pending.status == "COMPLETED"
+
+# 3. TEST: FAILURE REPORTING
+@pytest.mark.asyncio
+async def test_failed_job_reports_error():
+    """Automates verification that runner exceptions surface on the job."""
+    async def runner(job):
+        raise RuntimeError("neo4j unavailable")
+
+    manager = AnalysisJobManager(runner)
+    job, _ = manager.submit("full")
+    await manager._task
+    assert job.status == "FAILED"
+    assert job.to_dict()["error"] == "neo4j unavailable"
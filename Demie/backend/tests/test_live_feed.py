@@ -0,0 +1,80 @@
+import asyncio
+import json
+import pytest
+from app.live_feed import LiveFeedBroadcaster, format_event
+
+def _entry(address, risk):
+    return {"address": address, "risk_raw": risk, "status": "HIGH_ANOMALY"}
+
+class FakeAggregates:
+    def __init__(self, feed):
+        self.feed = feed
+        self.version = 0
+        self.reads = 0
+
+    async def get(self):
+        self.reads += 1
+        return {"live_feed": self.feed}
+
+# 1. TEST: ONLY CHANGED DETECTIONS ARE PUSHED
+@pytest.mark.asyncio
+async def test_live_feed_diffs_after_change():
+    """Automates verification that subscribers get a snapshot, then diffs, from one feed read per change."""
+    aggregates = FakeAggregates([_entry("0xa", 0.9), _entry("0xb", 0.8)])
+    broadcaster = LiveFeedBroadcaster(aggregates)
+    clients = [broadcaster.subscribe() for _ in range(5)]
+    try:
+        first = [await asyncio.wait_for(q.get(), 1) for q in clients]
+        assert all(e["type"] == "snapshot" and len(e["entries"]) == 2 for e in first)
+
+        # 0xb rescored, 0xa dropped out, 0xc detected
+        aggregates.feed = [_entry("0xc", 0.95), _entry("0xb", 0.7)]
+        aggregates.version = 1
+        broadcaster.notify(1)
+        events = [await asyncio.wait_for(q.get(), 1) for q in clients]
+        assert aggregates.reads == 2
+        assert events[0]["type"] == "diff" and events[0]["version"] == 1
+        assert [e["address"] for e in events[0]["upserts"]] == ["0xc", "0xb"]
+        assert events[0]["removed"] == ["0xa"] and events[0]["order"] == ["0xc", "0xb"]
+
+        # A late subscriber starts from the current state
+        late = broadcaster.subscribe()
+        assert late.get_nowait()["entries"] == aggregates.feed
+
+        frame = format_event(events[0])
+        assert frame.startswith("event: diff\nid: 1\n") and frame.endswith("\n\n")
+        assert json.loads(frame.split("data: ", 1)[1])["removed"] == ["0xa"]
+    finally:
+        await broadcaster.stop()
+
+# 2. TEST: BACKPRESSURE ON A SLOW CLIENT
+def test_live_feed_slow_client_resync():
+    """Automates verification that a full client queue is collapsed into one snapshot."""
+    broadcaster = LiveFeedBroadcaster(FakeAggregates([]), queue_size=2)
+    slow = asyncio.Queue(maxsize=2)
+    broadcaster.subscribers.add(slow)
+
+    broadcaster.publish([_entry("0xa", 0.9)], 1)
+    for version in range(2, 6):
+        broadcaster.publish([_entry("0xa", 0.9), _entry(f"0x{version}", 0.7)], version)
+
+    assert broadcaster.resyncs >= 1 and slow.qsize() <= 2
+    pending = [slow.get_nowait() for _ in range(slow.qsize())]
+    assert pending[0]["type"] == "snapshot"
+    assert pending[-1]["version"] == 5
+
+# 3. TEST: STOP ENDS THE PRODUCER AND EVERY STREAM
+@pytest.mark.asyncio
+async def test_live_feed_stop_releases_subscribers():
+    """Automates verification that stop() cancels the producer and hands every open stream its end marker."""
+    broadcaster = LiveFeedBroadcaster(FakeAggregates([_entry("0xa", 0.9)]))
+    clients = [broadcaster.subscribe() for _ in range(3)]
+    assert (await asyncio.wait_for(clients[0].get(), 1))["type"] == "snapshot"
+    task = broadcaster._task
+
+    await broadcaster.stop()
+    assert task.cancelled() and broadcaster._task is None
+    assert broadcaster.subscribers == set()
+    assert all(q.get_nowait() is None and q.empty() for q in clients)
+    # A stopped broadcaster ignores version bumps
+    broadcaster.notify(2)
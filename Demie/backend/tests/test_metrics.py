@@ -0,0 +1,108 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.metrics import MetricsRegistry, InstrumentedSession, QUERY_LATENCY, QUERY_ROWS, statement_label
+from app.database import get_db_session
+from app.main import app
+
+# 1. TEST: PROMETHEUS TEXT EXPOSITION
+def test_registry_render():
+    """Automates verification that counters, gauges and histograms render in the Prometheus text format."""
+    registry = MetricsRegistry()
+    hits = registry.counter("demo_hits_total", "Hits.", ("route",))
+    latency = registry.histogram("demo_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    pool = registry.gauge("demo_pool", "Pool.")
+    registry.add_collector(lambda: pool.set(value=3))
+
+    hits.inc("/a")
+    hits.inc("/a")
+    latency.observe("/a", value=0.05)
+    latency.observe("/a", value=5.0)
+    text = registry.render()
+
+    assert "# TYPE demo_hits_total counter" in text
+    assert 'demo_hits_total{route="/a"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{route="/a"} 2' in text
+    assert "demo_pool 3" in text
+
+# 2. TEST: STATEMENT TIMING AND ROUTE METRICS
+@pytest.mark.asyncio
+async def test_instrumented_session_and_endpoint():
+    """Automates verification that Cypher runs are timed per statement and routes appear on /metrics."""
+    class FakeResult:
+        async def data(self):
+            return [{"timestamp": 2, "tx_id": "0x2"}, {"timestamp": 1, "tx_id": "0x1"}]
+
+    class FakeSession:
+        async def run(self, query, parameters=None, **kwargs):
+            return FakeResult()
+
+    query = "MATCH (n)\n  RETURN n"
+    label = statement_label(query)
+    assert label == statement_label("MATCH (n) RETURN n")
+
+    session = InstrumentedSession(FakeSession())
+    rows = await (await session.run(query, {"x": 1})).data()
+    assert len(rows) == 2
+    assert QUERY_LATENCY.values[(label,)][2] >= 1
+    assert QUERY_ROWS.values[(label,)][1] >= 2
+
+    async def fake_session():
+        yield session
+
+    app.dependency_overrides[get_db_session] = fake_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/api/address/" + "0x" + "a" * 40 + "/history")
+            await client.get("/api/does-not-exist")
+            res = await client.get("/metrics")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert res.status_code == 200 and res.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/api/address/{address}/history",status="2xx"}' in res.text
+    assert 'route="unmatched",status="4xx"' in res.text
+    assert f'neo4j_query_info{{statement="{label}",query="MATCH (n) RETURN n"}} 1' in res.text
+
+# 3. TEST: UNREAD WRITES ARE RECORDED
+@pytest.mark.asyncio
+async def test_unread_results_recorded():
+    """Automates verification that statements whose results are never read are recorded on the next run and on close."""
+    from app.metrics import QUERY_OBSERVERS, cypher
+
+    class FakeResult:
+        def __init__(self):
+            self.consumed = False
+
+        async def consume(self):
+            self.consumed = True
+
+        async def data(self):
+            return []
+
+    class FakeSession:
+        def __init__(self):
+            self.closed = False
+
+        async def run(self, query, parameters=None, **kwargs):
+            return FakeResult()
+
+        async def close(self):
+            self.closed = True
+
+    observed = []
+    observer = lambda name, query, parameters, seconds, rows: observed.append(name)
+    QUERY_OBSERVERS.append(observer)
+    try:
+        raw = FakeSession()
+        session = InstrumentedSession(raw)
+        first = await session.run(cypher("test.write_one", "MERGE (n:A)"))
+        assert observed == []
+        # The next statement settles the unread one first
+        await session.run(cypher("test.write_two", "MERGE (n:B)"))
+        assert first._result.consumed and observed == ["test.write_one"]
+        await session.close()
+        assert raw.closed and observed == ["test.write_one", "test.write_two"]
+    finally:
+        QUERY_OBSERVERS.remove(observer)
@@ -0,0 +1,50 @@
+import numpy as np
+from app.graph_extract import ExtractedGraph
+from app.projection import NetworkProjection, force_layout
+
+def _graph(n, edges, scores):
+    return ExtractedGraph(
+        node_ids=np.arange(100, 100 + n, dtype=np.int64),
+        addresses=np.array([f"0x{i:02d}" for i in range(n)], dtype=object),
+        features=np.zeros((n, 5)),
+        scores=np.array(scores, dtype=float),
+        src=np.array([100 + e[0] for e in edges], dtype=np.int64),
+        dst=np.array([100 + e[1] for e in edges], dtype=np.int64),
+        edge_types=np.array([e[2] if len(e) > 2 else 0 for e in edges], dtype=np.int16),
+        edge_type_names=["SENT_FUNDS", "SENT"],
+        fused_counts=np.full(n, np.nan),
+    )
+
+# 1. TEST: NESTED LEVELS OF A CONSISTENT INDUCED SUBGRAPH
+def test_projection_levels_are_induced():
+    """Automates verification that every level only links nodes it returns, with shared coordinates."""
+    scores = [0.9, 0.8, 0.7, 0.6, 0.5, np.nan]
+    edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (0, 5), (1, 1), (0, 1), (0, 2, 1)]
+    projection = NetworkProjection(levels=(2, 4), iterations=20).build(_graph(6, edges, scores), version=7)
+
+    coarse, coarse_links, level = projection.view(0)
+    assert level == 0 and [n["address"] for n in coarse] == ["0x00", "0x01"]
+    assert coarse_links == [{"source": "0x00", "target": "0x01", "relationship_type": "SENT_FUNDS"}]
+
+    fine, fine_links, _ = projection.view(1)
+    kept = {n["address"] for n in fine}
+    assert kept == {"0x00", "0x01", "0x02", "0x03"}
+    assert all(l["source"] in kept and l["target"] in kept for l in fine_links)
+    # Unscored 0x05, the self-loop, the duplicate edge and the non-map SENT edge are not projected
+    assert len(fine_links) == 3
+    # A node keeps its position across levels
+    assert coarse[0]["x"] == fine[0]["x"] and coarse[0]["y"] == fine[0]["y"]
+    assert projection.version == 7 and projection.level_for_zoom(1.0) == 1
+
+    # Viewport: only nodes (and links) inside the box
+    x, y = fine[2]["x"], fine[2]["y"]
+    boxed, boxed_links, _ = projection.view(1, (x - 1e-4, y - 1e-4, x + 1e-4, y + 1e-4))
+    assert [n["address"] for n in boxed] == ["0x02"] and boxed_links == []
+
+# 2. TEST: DETERMINISTIC LAYOUT
+def test_force_layout_deterministic():
+    """Automates verification that the vectorized layout is reproducible and normalized."""
+    src, dst = np.array([0, 1, 2]), np.array([1, 2, 0])
+    first = force_layout(10, src, dst, iterations=30)
+    assert np.array_equal(first, force_layout(10, src, dst, iterations=30))
+    assert first.shape == (10, 2) and first.min() >= 0 and first.max() <= 1
@@ -0,0 +1,83 @@
+import pytest
+from app.metrics import InstrumentedSession, QUERY_OBSERVERS, cypher, statement_label
+from app.query_log import SlowQueryLog, parameter_shapes, read_entries, top_offenders
+from app.fusion import CREATE_FUSED_QUERY
+
+PLAN = {"operatorType": "ProduceResults@neo4j", "dbHits": 0, "rows": 2, "children": [
+    {"operatorType": "NodeIndexSeek@neo4j", "dbHits": 12, "rows": 2, "children": []},
+]}
+
+class FakeSummary:
+    profile = PLAN
+
+class FakeResult:
+    async def data(self):
+        return [{"n": 1}]
+
+    async def consume(self):
+        return FakeSummary()
+
+class FakeTransaction:
+    def __init__(self, log):
+        self.log = log
+
+    async def run(self, query, parameters=None, **kwargs):
+        self.log.append(query)
+        return FakeResult()
+
+    async def rollback(self):
+        self.log.append("ROLLBACK")
+
+class FakeSession:
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, parameters=None, **kwargs):
+        self.log.append(query)
+        return FakeResult()
+
+    async def begin_transaction(self):
+        return FakeTransaction(self.log)
+
+# 1. TEST: STABLE NAMES AND SHAPES WITHOUT VALUES
+def test_statement_names_and_shapes():
+    """Automates verification that named statements keep their name and parameters are logged by shape only."""
+    assert statement_label(CREATE_FUSED_QUERY) == "fusion.create_fused"
+    assert statement_label(cypher("x.y", "MATCH (n) RETURN n")) == "x.y"
+    assert parameter_shapes({"ids": [1, 2, 3], "addr": "0xsecret", "row": {"b": 1, "a": 2}}) == {
+        "ids": "list[3]<int>", "addr": "str", "row": "map{a,b}",
+    }
+
+# 2. TEST: SLOW EXECUTIONS LOGGED AND PROFILED
+@pytest.mark.asyncio
+async def test_slow_queries_logged_and_profiled(tmp_path):
+    """Automates verification that slow statements are logged, profiled in a rolled-back transaction and ranked."""
+    log = []
+    path = str(tmp_path / "slow.jsonl")
+    slow_log = SlowQueryLog(path, threshold_ms=0.0, profile_rate=1.0, session_factory=lambda: FakeSession(log))
+    QUERY_OBSERVERS.append(slow_log.observe)
+    try:
+        session = InstrumentedSession(FakeSession(log))
+        query = cypher("test.lookup", "MATCH (n:Address {address: $addr}) RETURN n")
+        await (await session.run(query, {"addr": "0xsecret"})).data()
+        await slow_log._profiling
+    finally:
+        QUERY_OBSERVERS.remove(slow_log.observe)
+
+    assert log[-2].startswith("PROFILE MATCH") and log[-1] == "ROLLBACK"
+    entries = read_entries(path)
+    assert [e["kind"] for e in entries] == ["slow", "profile"]
+    assert "0xsecret" not in open(path).read()
+    assert entries[1]["db_hits"] == 12 and entries[1]["write"] is False
+
+    # Below the threshold nothing is logged
+    SlowQueryLog(path, threshold_ms=1e9).observe("test.lookup", query, {}, 0.5, 1)
+    top = top_offenders(read_entries(path))
+    assert top[0]["name"] == "test.lookup" and top[0]["count"] == 1
+    assert top[0]["params"] == {"addr": "str"} and top[0]["plan"]["children"][0]["operator"] == "NodeIndexSeek"
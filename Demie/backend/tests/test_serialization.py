@@ -0,0 +1,58 @@
+import gzip
+import json
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.database import get_db_session
+from app.main import app
+from app.serialization import columnar_graph, dumps
+
+NODES = [{"address": f"0x{i:040x}", "integrity_risk_score": i / 100, "fused_count": 1} for i in range(60)]
+LINKS = [{"source": f"0x{i:040x}", "target": f"0x{i + 100:040x}", "relationship_type": "SENT_FUNDS"} for i in range(60)]
+
+# 1. TEST: COLUMNAR LAYOUT IS LOSSLESS
+def test_columnar_graph_roundtrip():
+    """Automates verification that the columnar graph decodes back to the record layout."""
+    body = json.loads(dumps(columnar_graph(NODES, LINKS)))
+    addresses = body["addresses"]
+    nodes = [
+        {"address": addresses[a], "integrity_risk_score": s, "fused_count": f}
+        for a, s, f in zip(body["nodes"]["address"], body["nodes"]["integrity_risk_score"], body["nodes"]["fused_count"])
+    ]
+    links = [
+        {"source": addresses[s], "target": addresses[t], "relationship_type": body["relationship_types"][r]}
+        for s, t, r in zip(body["links"]["source"], body["links"]["target"], body["links"]["relationship_type"])
+    ]
+    assert nodes == NODES and links == LINKS
+    assert len(dumps(columnar_graph(NODES, LINKS))) < len(dumps({"nodes": NODES, "links": LINKS}))
+
+# 2. TEST: NEGOTIATED COMPRESSION
+@pytest.mark.asyncio
+async def test_graph_endpoint_compressed():
+    """Automates verification that large graph payloads are gzip-encoded when the client accepts it."""
+    class FakeResult:
+        def __init__(self, records):
+            self.records = records
+
+        async def data(self):
+            return self.records
+
+    class FakeSession:
+        async def run(self, query, params=None, **kwargs):
+            return FakeResult(NODES if "fused_count" in query else LINKS)
+
+    async def fake_session():
+        yield FakeSession()
+
+    app.dependency_overrides[get_db_session] = fake_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            plain = await ac.get("/api/network/graph", headers={"Accept-Encoding": "identity"})
+            packed = await ac.get("/api/network/graph", params={"layout": "columnar"}, headers={"Accept-Encoding": "gzip"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert plain.headers.get("content-encoding") is None
+    assert plain.json()["nodes"] == NODES
+    assert packed.headers["content-encoding"] == "gzip"
+    assert int(packed.headers["content-length"]) < len(plain.content)
+    assert packed.json()["layout"] == "columnar"
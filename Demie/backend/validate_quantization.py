@@ -0,0 +1,76 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.metrics import roc_auc_score
+from app.prediction_service import PredictionService
+from app.core.inference import build_inference_model, QUANTIZATION_MODES
+
+# Labeled sample: nodes_final.csv flags are row-aligned with processed_graph_data.pt
+LABELS_PATH = 'data/nodes_final.csv'
+GRAPH_PATH = 'data/processed_graph_data.pt'
+
+
+def score(forward, x, edge_index, repeats):
+    """Returns (risk scores, mean seconds per forward pass)."""
+    with torch.no_grad():
+        forward(x, edge_index)  # warm-up
+        start = time.perf_counter()
+        for _ in range(repeats):
+            logits = forward(x, edge_index)
+        elapsed = (time.perf_counter() - start) / repeats
+    # Same temperature-scaled softmax as PredictionService
+    return torch.softmax(logits.float() / 0.7, dim=1)[:, 1].numpy(), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare reduced-precision GATv2 scoring against float32.")
+    parser.add_argument('--modes', nargs='+', default=['int8', 'bf16'], choices=[m for m in QUANTIZATION_MODES if m != 'none'])
+    parser.add_argument('--backend', default='fused', choices=['eager', 'fused'])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--max-drift', type=float, default=0.02, help="Largest acceptable mean |score drift|")
+    parser.add_argument('--max-auc-drop', type=float, default=0.005)
+    args = parser.parse_args()
+
+    # 1. Load weights exactly as the service does
+    model = PredictionService().model
+
+    # 2. Load the labeled graph sample
+    graph = torch.load(GRAPH_PATH, map_location=torch.device('cpu'), weights_only=False)
+    labels = pd.read_csv(LABELS_PATH)['flag'].values
+    if len(labels) != graph.num_nodes:
+        print(f"[!] Error: {LABELS_PATH} has {len(labels)} rows but the graph has {graph.num_nodes} nodes.")
+        return 1
+
+    x = graph.x.float()
+    edge_index = graph.edge_index.long()
+    print(f"[*] Scoring {graph.num_nodes} labeled nodes / {edge_index.shape[1]} edges ({args.backend} backend)")
+
+    # 3. Float32 baseline
+    base, base_t = score(build_inference_model(model, args.backend), x, edge_index, args.repeats)
+    base_auc = roc_auc_score(labels, base)
+    print(f"[*] float32 : AUC={base_auc:.4f}  {base_t * 1000:.1f} ms/pass")
+
+    # 4. Reduced-precision candidates
+    safe = True
+    for mode in args.modes:
+        scores, t = score(build_inference_model(model, args.backend, mode), x, edge_index, args.repeats)
+        drift = np.abs(scores - base)
+        auc = roc_auc_score(labels, scores)
+        flips = int(((scores > 0.6) != (base > 0.6)).sum())
+        ok = drift.mean() <= args.max_drift and base_auc - auc <= args.max_auc_drop
+        safe &= ok
+
+        print(
+            f"[{'+' if ok else '!'}] {mode:<7} : AUC={auc:.4f} ({auc - base_auc:+.4f})  "
+            f"drift mean={drift.mean():.5f} p99={np.percentile(drift, 99):.5f} max={drift.max():.5f}  "
+            f"risk-flag flips@0.6={flips}  {t * 1000:.1f} ms/pass (x{base_t / t:.2f})"
+        )
+
+    print("[*] SAFE to enable" if safe else "[!] Drift/AUC guard exceeded - keep INFERENCE_QUANTIZATION=none")
+    return 0 if safe else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
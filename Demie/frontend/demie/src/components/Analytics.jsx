@@ -3,6 +3,7 @@ import jsPDF from 'jspdf';
 import html2canvas from 'html2canvas';
 import { Download, Fingerprint, TrendingUp, ShieldAlert, RefreshCw, AlertTriangle } from 'lucide-react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Radar, RadarChart, PolarGrid, PolarAngleAxis } from 'recharts';
+import { runAnalysis } from '../services/analysis';
 
 const Analytics = () => {
     const [data, setData] = useState({
@@ -38,8 +39,8 @@ const Analytics = () => {
     const triggerAnalysis = async () => {
         setIsScanning(true);
         try {
-            const res = await fetch('http://127.0.0.1:8000/api/analyze', { method: 'POST' });
-            if (res.ok) {
+            const job = await runAnalysis();
+            if (job.status === 'COMPLETED') {
                 // Refresh the data once the AI finishes writing to Neo4j
                 await fetchData();
             }
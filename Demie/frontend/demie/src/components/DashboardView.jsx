@@ -10,6 +10,9 @@ import {
     Radar, RadarChart, PolarGrid, PolarAngleAxis, PolarRadiusAxis, ResponsiveContainer,
     BarChart, Bar, XAxis, YAxis, Tooltip, Cell
 } from 'recharts';
+import { runAnalysis } from '../services/analysis';
+import { subscribeLiveFeed } from '../services/liveFeed';
+import { decodeRecords } from '../services/columnar';
 
 
 // --- 1. HeaderStat Definition ---
@@ -81,11 +84,11 @@ const AnalyticsView = () => {
         }
     }, []);
 
-    const runAnalysis = async () => {
+    const handleRunAnalysis = async () => {
         setIsAnalyzing(true);
         try {
-            const response = await fetch('http://127.0.0.1:8000/api/analyze', { method: 'POST' });
-            if (response.ok) {
+            const job = await runAnalysis();
+            if (job.status === 'COMPLETED') {
                 await fetchForensics(); // Refresh data after analysis
             }
         } catch (error) {
@@ -105,7 +108,7 @@ const AnalyticsView = () => {
             <header className="bg-slate-900/30 p-8 rounded-[2.5rem] border border-slate-800/50 backdrop-blur-md relative overflow-hidden">
                 <div className="absolute top-0 right-0 p-8 flex gap-4 items-center">
                     <button
-                        onClick={runAnalysis}
+                        onClick={handleRunAnalysis}
                         disabled={isAnalyzing}
                         className={`flex items-center gap-2 px-4 py-2 rounded-full border border-blue-500/30 bg-blue-500/10 text-[10px] font-black uppercase tracking-tighter transition-all hover:bg-blue-500/20 ${isAnalyzing ? 'opacity-50 cursor-not-allowed' : ''}`}
                     >
@@ -340,6 +343,9 @@ const SuperEntitiesView = ({
     isAuditing,
     onOpenAudit,
     onAuditAll,
+    // Keyset paging: more clusters are fetched on demand
+    hasMore,
+    onLoadMore,
     // Lifted search props from parent
     searchQuery,
     setSearchQuery,
@@ -511,6 +517,17 @@ const SuperEntitiesView = ({
                     </div>
                 )}
             </div>
+
+            {hasMore && (
+                <div className="flex justify-center">
+                    <button
+                        onClick={onLoadMore}
+                        className="px-6 py-2.5 rounded-xl text-xs font-black uppercase tracking-widest text-blue-400 border border-slate-800 hover:border-blue-500/40 bg-slate-900/30 transition-all"
+                    >
+                        Load More Clusters
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
@@ -987,6 +1004,8 @@ const LiveInterceptView = ({ feed = [] }) => {
     );
 };
 // --- MAIN DASHBOARD VIEW ---
+const CLUSTER_PAGE_SIZE = 200;
+
 const DashboardView = ({ onLogout }) => {
     const [activeTab, setActiveTab] = useState('explorer');
     const [isCollapsed, setIsCollapsed] = useState(false);
@@ -997,64 +1016,100 @@ const DashboardView = ({ onLogout }) => {
 
     const [searchQuery, setSearchQuery] = useState("");
     const [searchType, setSearchType] = useState("ADDRESS");
+    // Debounced search sent to /clusters; the ref is what in-flight requests compare against
+    const [appliedSearch, setAppliedSearch] = useState({ query: "", type: "ADDRESS" });
+    const searchRef = useRef(appliedSearch);
 
     const [selectedEntity, setSelectedEntity] = useState(null);
     const [isModalOpen, setIsModalOpen] = useState(false);
     const [stats, setStats] = useState({ valueAtRisk: "0.00 ETH", total_nodes: 0, avgRiskScore: 0 });
+    const [clusterCursor, setClusterCursor] = useState(null);
+    const [clusterTotal, setClusterTotal] = useState(null);
+    const [serverDistribution, setServerDistribution] = useState(null);
 
     // --- 1. DATA SYNC (Optimized Fetching) ---
-    const fetchLiveFeed = useCallback(async () => {
+    const fetchStats = useCallback(async () => {
         try {
-            const response = await fetch('http://127.0.0.1:8000/api/live-feed');
-            if (response.ok) {
-                const data = await response.json();
-                setLiveFeed(data);
+            const statsRes = await fetch('http://127.0.0.1:8000/api/stats');
+            if (statsRes.ok) {
+                setStats(await statsRes.json());
             }
         } catch (err) {
-            console.error("Live Feed Interruption:", err);
+            console.error("Connection Failed:", err);
         }
     }, []);
 
+    // Cluster pages are keyset-paginated: constant cost per page. The search
+    // is applied server-side, so clusters on pages not loaded yet are found too.
+    const fetchClusterPage = useCallback(async (cursor = null) => {
+        const search = searchRef.current;
+        const params = new URLSearchParams({ limit: CLUSTER_PAGE_SIZE, include_total: 'true', layout: 'columnar' });
+        if (cursor) params.set('cursor', cursor);
+        if (search.query) {
+            params.set('search', search.query);
+            params.set('search_type', search.type);
+        }
+        const clusterRes = await fetch(`http://127.0.0.1:8000/api/clusters?${params}`);
+        if (!clusterRes.ok) return null;
+        const c = await clusterRes.json();
+        // A newer search replaced this one while the request was in flight
+        if (search !== searchRef.current) return null;
+        setClusterCursor(c.next_cursor || null);
+        setClusterTotal(c.total ?? null);
+        if (c.distribution) setServerDistribution(c.distribution);
+        // Ensure we handle both array and object responses safely
+        if (Array.isArray(c)) return c;
+        return c.layout === 'columnar' ? decodeRecords(c.nodes) : (c.nodes || []);
+    }, []);
+
     const fetchData = useCallback(async () => {
         try {
-            const [statsRes, clusterRes] = await Promise.all([
-                fetch('http://127.0.0.1:8000/api/stats'),
-                fetch('http://127.0.0.1:8000/api/clusters')
-            ]);
-
-            if (statsRes?.ok) {
-                const s = await statsRes.json();
-                setStats(s);
-            }
-
-            if (clusterRes?.ok) {
-                const c = await clusterRes.json();
-                // Ensure we handle both array and object responses safely
-                setEntities(Array.isArray(c) ? c : (c.nodes || []));
-            }
+            const [, firstPage] = await Promise.all([fetchStats(), fetchClusterPage()]);
+            if (firstPage) setEntities(firstPage);
         } catch (err) {
             console.error("Connection Failed:", err);
         } finally {
             setLoading(false);
         }
-    }, []);
+    }, [fetchStats, fetchClusterPage]);
+
+    const loadMoreEntities = useCallback(async () => {
+        if (!clusterCursor) return;
+        try {
+            const page = await fetchClusterPage(clusterCursor);
+            if (page) setEntities(prev => [...prev, ...page]);
+        } catch (err) {
+            console.error("Cluster Paging Failed:", err);
+        }
+    }, [clusterCursor, fetchClusterPage]);
 
     useEffect(() => {
+        const timer = setTimeout(() => setAppliedSearch({ query: searchQuery.trim(), type: searchType }), 300);
+        return () => clearTimeout(timer);
+    }, [searchQuery, searchType]);
+
+    // First page of the current search (also the initial load)
+    useEffect(() => {
+        searchRef.current = appliedSearch;
         fetchData();
-        fetchLiveFeed();
+    }, [appliedSearch, fetchData]);
 
-        // 3s for Live Feed (Reactive), 10s for Stats (Consistency)
+    useEffect(() => {
+        // Live Feed is pushed by the server (diffs only); stats and the first
+        // cluster page every 10s (unchanged data is a 304 revalidation)
         const globalInterval = setInterval(fetchData, 10000);
-        const liveInterval = setInterval(fetchLiveFeed, 3000);
+        const unsubscribe = subscribeLiveFeed(setLiveFeed, (err) => console.error("Live Feed Interruption:", err));
 
         return () => {
             clearInterval(globalInterval);
-            clearInterval(liveInterval);
+            unsubscribe();
         };
-    }, [fetchData, fetchLiveFeed]);
+    }, [fetchData]);
 
-    // --- 2. COMPUTED STATE (Risk & Search) ---
+    // --- 2. COMPUTED STATE (Risk) ---
     const riskDistribution = useMemo(() => {
+        // Server totals cover every page, not only the loaded ones
+        if (serverDistribution) return serverDistribution;
         const counts = { critical: 0, moderate: 0, stable: 0 };
         entities.forEach(entity => {
             const score = parseFloat(entity.integrity_risk_score || 0);
@@ -1063,17 +1118,7 @@ const DashboardView = ({ onLogout }) => {
             else counts.stable++;
         });
         return counts;
-    }, [entities]);
-
-    const filteredEntities = useMemo(() => {
-        return entities.filter((entity) => {
-            if (!searchQuery) return true;
-            const query = searchQuery.toLowerCase().trim();
-            return searchType === "ID"
-                ? (entity.community_id || "").toString().toLowerCase().includes(query)
-                : entity.address?.toLowerCase().includes(query);
-        });
-    }, [entities, searchQuery, searchType]);
+    }, [entities, serverDistribution]);
 
     // --- 3. FORENSIC ACTIONS ---
     const handleOpenAudit = useCallback(async (entity) => {
@@ -1098,8 +1143,8 @@ const DashboardView = ({ onLogout }) => {
     const handleAuditAll = useCallback(async () => {
         setIsAuditing(true);
         try {
-            const response = await fetch('http://127.0.0.1:8000/api/analyze', { method: 'POST' });
-            if (response.ok) fetchData();
+            const job = await runAnalysis();
+            if (job.status === 'COMPLETED') fetchData();
         } catch (err) {
             console.error("Inference Pipeline Failed:", err);
         } finally {
@@ -1120,7 +1165,7 @@ const DashboardView = ({ onLogout }) => {
                         <HeaderStat label="Mean IRS" value={`${(stats.avgRiskScore * 100).toFixed(1)}%`} icon={<ShieldAlert size={14} className="text-red-500" />} />
                         <div className="ml-4 pl-4 border-l border-slate-800 flex flex-col justify-center">
                             <span className="text-[9px] text-slate-500 uppercase font-black tracking-widest">Global Filter</span>
-                            <span className="text-xs font-mono text-blue-400">{filteredEntities.length} Clusters</span>
+                            <span className="text-xs font-mono text-blue-400">{entities.length}{clusterTotal !== null ? ` / ${clusterTotal}` : ''} Clusters</span>
                         </div>
                     </div>
                 </header>
@@ -1139,8 +1184,9 @@ const DashboardView = ({ onLogout }) => {
                         <div className="animate-in fade-in duration-700 slide-in-from-bottom-2">
                             {activeTab === 'explorer' && (
                                 <SuperEntitiesView
-                                    entities={filteredEntities} loading={loading} isAuditing={isAuditing}
+                                    entities={entities} loading={loading} isAuditing={isAuditing}
                                     onOpenAudit={handleOpenAudit} onAuditAll={handleAuditAll}
+                                    hasMore={Boolean(clusterCursor)} onLoadMore={loadMoreEntities}
                                     searchQuery={searchQuery} setSearchQuery={setSearchQuery}
                                     searchType={searchType} setSearchType={setSearchType}
                                 />
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Activity, ShieldCheck, ShieldAlert, Database, WifiOff } from 'lucide-react';
+import { subscribeLiveFeed } from '../services/liveFeed';
 
 const LiveFeed = () => {
     const [events, setEvents] = useState([]);
@@ -7,28 +8,19 @@ const LiveFeed = () => {
     const [error, setError] = useState(null);
 
     useEffect(() => {
-        const fetchFeed = async () => {
-            try {
-                const response = await fetch('http://127.0.0.1:8000/api/live-feed');
-                if (!response.ok) throw new Error(`HTTP_ERROR_${response.status}`);
-
-                const data = await response.json();
-
-                // Normalizing various backend response patterns
-                const eventList = Array.isArray(data) ? data : (data?.data || []);
+        // Server-pushed: snapshot on connect, then diffs after each analysis/ingest
+        return subscribeLiveFeed(
+            (eventList) => {
                 setEvents(eventList);
                 setError(null);
-            } catch (err) {
+                setLoading(false);
+            },
+            (err) => {
                 console.error("Live Feed Sync Error:", err);
-                setError(err.message);
-            } finally {
+                setError("STREAM_INTERRUPTED");
                 setLoading(false);
             }
-        };
-
-        fetchFeed();
-        const interval = setInterval(fetchFeed, 5000);
-        return () => clearInterval(interval);
+        );
     }, []);
 
     if (loading && events.length === 0) {
@@ -1,30 +1,54 @@
 import React, { useState, useEffect, useRef } from 'react';
 import ForceGraph2D from 'react-force-graph-2d';
 import { X, ShieldAlert, Activity, ArrowUpRight, ArrowDownLeft } from 'lucide-react';
+import { decodeGraph } from '../services/columnar';
+
+// Server layout coordinates are in [0, 1]; spread them over the canvas
+const LAYOUT_SCALE = 1000;
+
+// Coarse level when zoomed out, finer levels as the user zooms in
+const levelForZoom = (k, levels) => Math.min(levels - 1, Math.max(0, Math.floor(Math.log2(Math.max(k, 1)))));
 
 const NetworkMap = () => {
     const [graphData, setGraphData] = useState({ nodes: [], links: [] });
+    const [level, setLevel] = useState(0);
+    const [levelCount, setLevelCount] = useState(1);
     const [selectedNode, setSelectedNode] = useState(null); // The wallet being investigated
     const [history, setHistory] = useState([]); // Transaction history for the panel
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
         const fetchGraph = async () => {
-            const res = await fetch('http://127.0.0.1:8000/api/network/graph');
-            const data = await res.json();
-            setGraphData(data);
+            const res = await fetch(`http://127.0.0.1:8000/api/network/graph?layout=columnar&level=${level}`);
+            const data = decodeGraph(await res.json());
+            setLevelCount(data.metadata?.levels?.length || 1);
+            // Precomputed positions are pinned (fx/fy): no client-side force simulation
+            setGraphData({
+                nodes: data.nodes.map((n) => ({
+                    ...n,
+                    id: n.address,
+                    score: n.integrity_risk_score,
+                    ...(n.x !== undefined && { fx: n.x * LAYOUT_SCALE, fy: n.y * LAYOUT_SCALE }),
+                })),
+                links: data.links,
+            });
             setLoading(false);
         };
         fetchGraph();
-    }, []);
+    }, [level]);
+
+    const handleZoomEnd = ({ k }) => {
+        const next = levelForZoom(k, levelCount);
+        if (next !== level) setLevel(next);
+    };
 
     const handleNodeClick = async (node) => {
         setSelectedNode(node);
         // Fetch detailed transaction history for this specific address
         try {
-            const res = await fetch(`http://127.0.0.1:8000/api/address/${node.id}/history`);
+            const res = await fetch(`http://127.0.0.1:8000/api/address/${node.id}/history?limit=25`);
             const data = await res.json();
-            setHistory(data);
+            setHistory(data.items || []);
         } catch (e) {
             setHistory([]);
         }
@@ -37,6 +61,8 @@ const NetworkMap = () => {
                 nodeColor={n => n.score > 0.4 ? '#ef4444' : '#3b82f6'}
                 nodeRelSize={6}
                 onNodeClick={handleNodeClick}
+                onZoomEnd={handleZoomEnd}
+                cooldownTicks={graphData.nodes.some((n) => n.fx !== undefined) ? 0 : Infinity}
                 linkColor={() => '#1e293b'}
                 linkDirectionalParticles={2}
                 backgroundColor="#020617"
@@ -0,0 +1,23 @@
+const API_BASE = 'http://127.0.0.1:8000/api';
+
+// Queues a GAT analysis and resolves once the background job has finished.
+// Resolves with the final job state (status COMPLETED or FAILED).
+export const runAnalysis = async (mode = 'full', pollMs = 1500) => {
+    const response = await fetch(`${API_BASE}/analyze?mode=${mode}`, { method: 'POST' });
+    if (!response.ok) {
+        throw new Error(`Analysis trigger failed: ${response.status}`);
+    }
+    const { job_id } = await response.json();
+
+    while (true) {
+        await new Promise((resolve) => setTimeout(resolve, pollMs));
+        const res = await fetch(`${API_BASE}/analyze/jobs/${job_id}`);
+        if (!res.ok) {
+            throw new Error(`Analysis job lookup failed: ${res.status}`);
+        }
+        const job = await res.json();
+        if (job.status === 'COMPLETED' || job.status === 'FAILED') {
+            return job;
+        }
+    }
+};
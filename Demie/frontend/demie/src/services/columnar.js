@@ -0,0 +1,24 @@
+// Decoders for the backend's `layout=columnar` responses (one array per
+// field instead of repeated keys per record).
+
+// { field: [..], ... } -> [{ field, ... }, ...]
+export const decodeRecords = (columns) => {
+    const fields = Object.keys(columns);
+    const length = fields.length ? columns[fields[0]].length : 0;
+    return Array.from({ length }, (_, i) =>
+        Object.fromEntries(fields.map((field) => [field, columns[field][i]]))
+    );
+};
+
+// Columnar /network/graph -> { nodes, links, metadata } in the record layout
+export const decodeGraph = (body) => {
+    if (body.layout !== 'columnar') return body;
+    const { addresses, relationship_types: types } = body;
+    const nodes = decodeRecords(body.nodes).map((node) => ({ ...node, address: addresses[node.address] }));
+    const links = decodeRecords(body.links).map((link) => ({
+        source: addresses[link.source],
+        target: addresses[link.target],
+        relationship_type: types[link.relationship_type],
+    }));
+    return { nodes, links, metadata: body.metadata };
+};
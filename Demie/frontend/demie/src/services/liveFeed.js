@@ -0,0 +1,32 @@
+const API_BASE = 'http://127.0.0.1:8000/api';
+
+// Subscribes to the server-pushed live feed (SSE). The server sends a
+// snapshot on connect and then only diffs after each analysis/ingest;
+// onFeed receives the full, ordered list every time it changes.
+// Returns an unsubscribe function.
+export const subscribeLiveFeed = (onFeed, onError) => {
+    let entries = {};
+    let order = [];
+    const source = new EventSource(`${API_BASE}/live-feed/stream`);
+    const emit = () => onFeed(order.map((address) => entries[address]).filter(Boolean));
+
+    source.addEventListener('snapshot', (e) => {
+        const { entries: list } = JSON.parse(e.data);
+        entries = Object.fromEntries(list.map((entry) => [entry.address, entry]));
+        order = list.map((entry) => entry.address);
+        emit();
+    });
+
+    source.addEventListener('diff', (e) => {
+        const { upserts, removed, order: nextOrder } = JSON.parse(e.data);
+        removed.forEach((address) => delete entries[address]);
+        upserts.forEach((entry) => { entries[entry.address] = entry; });
+        order = nextOrder;
+        emit();
+    });
+
+    // EventSource reconnects on its own; the server resends a snapshot
+    source.onerror = (err) => onError && onError(err);
+
+    return () => source.close();
+};